@@ -0,0 +1,5 @@
+from dotenv import load_dotenv
+
+# Carga las variables del archivo .env una sola vez, antes de que cualquier
+# módulo de la aplicación lea su configuración
+load_dotenv()
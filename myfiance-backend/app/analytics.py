@@ -0,0 +1,299 @@
+"""
+Analítica de las transacciones de un usuario sobre arrays columnares de NumPy.
+
+Las transacciones se cargan una vez en columnas compactas (fechas como días
+desde 1970-01-01 en int32, importes en céntimos en int64, categoría en int32
+y tipo en int8) y los cálculos son operaciones vectorizadas sobre esas
+columnas, sin bucles por fila en Python. Los importes se mantienen en
+céntimos enteros, así que los saldos y totales son exactos.
+"""
+import os
+from dataclasses import dataclass
+from datetime import date, timedelta
+from operator import itemgetter
+from typing import List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.cache import TTLCache
+
+# --- Configuración ---
+# Arrays de usuarios que se mantienen en memoria (unos 20 MB por millón de
+# transacciones). Se invalidan con la versión de los datos del usuario
+ANALYTICS_CACHE_SIZE = int(os.getenv("ANALYTICS_CACHE_SIZE", "16"))
+ANALYTICS_CACHE_TTL_SECONDS = float(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "600"))
+
+EPOCH = date(1970, 1, 1)
+INCOME, EXPENSE = 0, 1
+
+# Periodos que se reconocen como recurrentes: (nombre, días de media)
+RECURRING_PERIODS = (("weekly", 7.0), ("biweekly", 14.0), ("monthly", 30.44),
+                     ("quarterly", 91.31), ("yearly", 365.25))
+# Desviación relativa admitida entre el intervalo medio y el periodo, la
+# dispersión de los intervalos y la variación de los importes
+PERIOD_TOLERANCE = 0.15
+AMOUNT_TOLERANCE = 0.25
+
+
+@dataclass(frozen=True)
+class TransactionArrays:
+    """Transacciones de un usuario en columnas, ordenadas por fecha e ID."""
+    days: np.ndarray               # int32: días desde 1970-01-01
+    cents: np.ndarray              # int64: importe en céntimos (positivo)
+    category_ids: np.ndarray       # int32 (el mismo rango que la columna)
+    types: np.ndarray              # int8: INCOME o EXPENSE
+    description_codes: np.ndarray  # int32: posición en 'descriptions'
+    descriptions: List[str]
+    opening_cents: int = 0         # Saldo anterior a la primera transacción (años archivados)
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    @property
+    def signed_cents(self) -> np.ndarray:
+        """Importes con signo: positivos los ingresos y negativos los gastos."""
+        return np.where(self.types == INCOME, self.cents, -self.cents)
+
+
+def to_day(value: date) -> int:
+    return (value - EPOCH).days
+
+
+def to_date(day) -> date:
+    return EPOCH + timedelta(days=int(day))
+
+
+def format_cents(cents) -> str:
+    """Céntimos como cadena decimal con dos decimales, igual que los importes del API."""
+    cents = int(cents)
+    sign = "-" if cents < 0 else ""
+    return f"{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}"
+
+
+def from_rows(rows, opening_cents: int = 0) -> TransactionArrays:
+    """
+    Construye los arrays a partir de las tuplas de crud.get_transaction_columns.
+    'opening_cents' es el saldo previo, el de las transacciones archivadas.
+    """
+    def column(index, dtype):
+        return np.fromiter(map(itemgetter(index), rows), dtype=dtype, count=len(rows))
+
+    # Las descripciones se codifican como enteros (la primera aparición fija el código)
+    codes = {}
+    description_codes = np.fromiter((codes.setdefault(d or "", len(codes)) for d in map(itemgetter(4), rows)),
+                                    dtype=np.int32, count=len(rows))
+    return TransactionArrays(
+        days=column(0, np.int32),
+        cents=column(1, np.int64),
+        category_ids=column(2, np.int32),
+        types=column(3, np.int8),
+        description_codes=description_codes,
+        descriptions=list(codes),
+        opening_cents=opening_cents,
+    )
+
+
+_cache = TTLCache(max_size=ANALYTICS_CACHE_SIZE, ttl_seconds=ANALYTICS_CACHE_TTL_SECONDS)
+
+
+def load(db: Session, user_id: int) -> TransactionArrays:
+    """
+    Devuelve los arrays del usuario, desde la caché si su versión de datos no
+    ha cambiado. La versión se lee antes que las transacciones: si una
+    escritura se cuela entre ambas lecturas, la siguiente petición recarga.
+    """
+    version, _ = crud.get_data_version(db, user_id)
+    cached = _cache.get(user_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    arrays = from_rows(crud.get_transaction_columns(db, user_id), crud.get_archived_balance_cents(db, user_id))
+    _cache.set(user_id, (version, arrays))
+    return arrays
+
+
+# --- Saldo acumulado ---
+
+def running_balance(arrays: TransactionArrays, start_day: Optional[int] = None, end_day: Optional[int] = None):
+    """
+    Saldo al final de cada día con transacciones, acumulado desde la primera
+    transacción (también las anteriores a 'start_day') sobre el saldo de los
+    años archivados.
+
+    Returns:
+        (days, balance_cents): dos arrays de la misma longitud.
+    """
+    if not len(arrays):
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int64)
+    balance = arrays.opening_cents + np.cumsum(arrays.signed_cents)
+    # Última transacción de cada día (los días vienen ordenados)
+    last_of_day = np.flatnonzero(np.append(np.diff(arrays.days) != 0, True))
+    days, balance = arrays.days[last_of_day], balance[last_of_day]
+    mask = np.ones(len(days), dtype=bool)
+    if start_day is not None:
+        mask &= days >= start_day
+    if end_day is not None:
+        mask &= days <= end_day
+    return days[mask], balance[mask]
+
+
+# --- Gasto móvil por categoría ---
+
+def rolling_spend(arrays: TransactionArrays, window_days: int, start_day: int, end_day: int):
+    """
+    Gasto de los últimos 'window_days' días (incluido el propio día) por
+    categoría, para cada día entre 'start_day' y 'end_day'.
+
+    Suma los gastos por día y categoría en una matriz, la acumula por días y
+    obtiene cada ventana como diferencia de dos filas de la suma acumulada.
+
+    Returns:
+        (category_ids, matrix): matrix[día, categoría] en céntimos, con una
+        fila por día del intervalo y una columna por categoría con gastos.
+    """
+    first_day = start_day - window_days + 1
+    n_days = end_day - first_day + 1
+    expense = arrays.types == EXPENSE
+    category_ids = np.unique(arrays.category_ids[expense])
+    if n_days <= 0 or end_day < start_day:
+        return category_ids, np.zeros((0, len(category_ids)), dtype=np.int64)
+
+    selected = expense & (arrays.days >= first_day) & (arrays.days <= end_day)
+    daily = np.zeros((n_days, len(category_ids)), dtype=np.int64)
+    np.add.at(daily,
+              (arrays.days[selected] - first_day, np.searchsorted(category_ids, arrays.category_ids[selected])),
+              arrays.cents[selected])
+    cumulative = np.vstack([np.zeros((1, len(category_ids)), dtype=np.int64), np.cumsum(daily, axis=0)])
+    return category_ids, cumulative[window_days:] - cumulative[:-window_days]
+
+
+# --- Transacciones recurrentes ---
+
+# Bits de las claves de grupo: tipo en el bit 0, category_id (entero positivo
+# de 31 bits) en los bits 1-31 y el código de la descripción desde el bit 32
+_CATEGORY_SHIFT = 1
+_DESCRIPTION_SHIFT = 32
+_CATEGORY_MASK = (1 << (_DESCRIPTION_SHIFT - _CATEGORY_SHIFT)) - 1
+
+
+def _group_keys(arrays: TransactionArrays) -> np.ndarray:
+    """Clave por fila que agrupa las transacciones con misma descripción, categoría y tipo."""
+    return ((arrays.description_codes.astype(np.int64) << _DESCRIPTION_SHIFT)
+            | (arrays.category_ids.astype(np.int64) << _CATEGORY_SHIFT)
+            | arrays.types.astype(np.int64))
+
+
+def detect_recurring(arrays: TransactionArrays, as_of_day: int, min_occurrences: int = 3):
+    """
+    Detecta transacciones recurrentes: grupos con la misma descripción,
+    categoría y tipo cuyos intervalos entre fechas se ajustan a un periodo
+    conocido (semanal, mensual...) con poca dispersión y cuyos importes
+    apenas varían. Solo se devuelven las que siguen activas: la última no
+    tiene más de un periodo y medio de antigüedad respecto a 'as_of_day'.
+
+    Returns:
+        list[dict]: Una entrada por grupo, con 'key' (ver _group_keys),
+        'period', 'interval_days', 'occurrences', 'average_cents',
+        'last_day' y 'next_day'; ordenadas por importe medio descendente.
+    """
+    if len(arrays) < min_occurrences:
+        return []
+    keys = _group_keys(arrays)
+    order = np.lexsort((arrays.days, keys))
+    keys, days, cents = keys[order], arrays.days[order].astype(np.int64), arrays.cents[order]
+
+    starts = np.append(True, keys[1:] != keys[:-1])
+    group = np.cumsum(starts) - 1
+    n_groups = group[-1] + 1
+    counts = np.bincount(group, minlength=n_groups)
+
+    # Intervalos entre transacciones consecutivas del mismo grupo
+    same = ~starts[1:]
+    intervals = np.diff(days)[same].astype(np.float64)
+    interval_group = group[1:][same]
+    n_intervals = np.bincount(interval_group, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_interval = np.bincount(interval_group, weights=intervals, minlength=n_groups) / n_intervals
+        interval_std = np.sqrt(np.maximum(
+            np.bincount(interval_group, weights=intervals ** 2, minlength=n_groups) / n_intervals
+            - mean_interval ** 2, 0))
+        mean_cents = np.bincount(group, weights=cents, minlength=n_groups) / counts
+        cents_std = np.sqrt(np.maximum(
+            np.bincount(group, weights=cents.astype(np.float64) ** 2, minlength=n_groups) / counts
+            - mean_cents ** 2, 0))
+
+    periods = np.array([days_ for _, days_ in RECURRING_PERIODS])
+    nearest = np.argmin(np.abs(mean_interval[:, None] - periods[None, :]), axis=1)
+    period = periods[nearest]
+    last_day = days[np.append(np.flatnonzero(starts)[1:] - 1, len(days) - 1)]
+    recurring = (
+        (counts >= min_occurrences)
+        & (np.abs(mean_interval - period) <= PERIOD_TOLERANCE * period)
+        & (interval_std <= PERIOD_TOLERANCE * period)
+        & (cents_std <= AMOUNT_TOLERANCE * mean_cents)
+        & (last_day + 1.5 * period >= as_of_day)
+    )
+
+    first_index = np.flatnonzero(starts)
+    result = []
+    for g in np.flatnonzero(recurring):
+        interval = float(mean_interval[g])
+        result.append({
+            "key": int(keys[first_index[g]]),
+            "period": RECURRING_PERIODS[nearest[g]][0],
+            "interval_days": round(interval, 1),
+            "occurrences": int(counts[g]),
+            "average_cents": int(round(mean_cents[g])),
+            "last_day": int(last_day[g]),
+            "next_day": int(last_day[g] + round(interval)),
+        })
+    result.sort(key=lambda item: item["average_cents"], reverse=True)
+    return result
+
+
+def describe_group(arrays: TransactionArrays, key: int):
+    """(descripción, category_id, tipo) de una clave de _group_keys."""
+    return (arrays.descriptions[key >> _DESCRIPTION_SHIFT], (key >> _CATEGORY_SHIFT) & _CATEGORY_MASK,
+            "income" if key & 1 == INCOME else "expense")
+
+
+# --- Proyección de flujo de caja ---
+
+def project_cash_flow(arrays: TransactionArrays, as_of_day: int, horizon_days: int, lookback_days: int = 90):
+    """
+    Proyección sencilla del saldo para los próximos 'horizon_days' días: el
+    saldo actual (incluidos los años archivados), más las transacciones recurrentes en sus fechas previstas,
+    más la media diaria de los últimos 'lookback_days' días del resto de
+    movimientos (los no recurrentes).
+
+    Returns:
+        dict: 'starting_cents', 'baseline_daily_cents', 'recurring' (como
+        detect_recurring), 'days' y 'balance_cents' (arrays de 'horizon_days').
+    """
+    signed = arrays.signed_cents
+    starting = arrays.opening_cents + int(signed[arrays.days <= as_of_day].sum())
+    recurring = detect_recurring(arrays, as_of_day)
+
+    in_lookback = (arrays.days > as_of_day - lookback_days) & (arrays.days <= as_of_day)
+    not_recurring = ~np.isin(_group_keys(arrays), [item["key"] for item in recurring])
+    baseline = signed[in_lookback & not_recurring].sum() / lookback_days
+
+    days = np.arange(as_of_day + 1, as_of_day + horizon_days + 1, dtype=np.int64)
+    delta = np.full(horizon_days, baseline, dtype=np.float64)
+    for item in recurring:
+        step = max(1, round(item["interval_days"]))
+        first = item["next_day"]
+        if first <= as_of_day:  # Atrasada: se lleva a la siguiente fecha del periodo
+            first += -(-(as_of_day + 1 - first) // step) * step
+        occurrences = np.arange(first, as_of_day + horizon_days + 1, step) - (as_of_day + 1)
+        sign = 1 if item["key"] & 1 == INCOME else -1
+        np.add.at(delta, occurrences, sign * item["average_cents"])
+
+    return {
+        "starting_cents": starting,
+        "baseline_daily_cents": int(round(baseline)),
+        "recurring": recurring,
+        "days": days,
+        "balance_cents": np.rint(starting + np.cumsum(delta)).astype(np.int64),
+    }
@@ -1,19 +1,17 @@
 import os
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-from dotenv import load_dotenv
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
-from app import models
-from .database import get_db
-
-# Cargar variables de entorno
-load_dotenv()
+from app import crud, models, schemas
+from .cache import TTLCache
+from .hashing import password_hasher
+from .database import get_db, read_session
 
 # --- Configuración de Seguridad ---
 SECRET_KEY = os.getenv("SECRET_KEY")
@@ -22,21 +20,45 @@ if SECRET_KEY is None:
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Contexto para el hash de contraseñas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Caché de tokens ya validados -> identidad del usuario. USER_CACHE_ENABLED=false
+# (o un TTL o tamaño 0) la desactiva: cada petición decodifica el JWT y consulta el usuario
+USER_CACHE_ENABLED = os.getenv("USER_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "10000")) if USER_CACHE_ENABLED else 0
+user_cache = TTLCache(max_size=USER_CACHE_MAX_SIZE, ttl_seconds=USER_CACHE_TTL_SECONDS)
 
 # Esquema de autenticación que FastAPI usará para obtener el token de la petición
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="users/token")
 
 # --- Funciones de Utilidad de Seguridad ---
 
+# bcrypt se ejecuta en el pool acotado de app.hashing, que responde 429 si está saturado
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifica que la contraseña en texto plano coincida con el hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.verify_and_update(plain_password, hashed_password)[0]
+
+def verify_and_update_password(plain_password: str, hashed_password: str):
+    """
+    Verifica la contraseña y, si el hash usa un esquema o coste obsoleto,
+    devuelve también un hash nuevo para guardarlo.
+
+    Returns:
+        tuple[bool, str | None]: (es válida, hash nuevo o None)
+    """
+    return password_hasher.verify_and_update(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Genera el hash de una contraseña en texto plano."""
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str):
+    """Versión asíncrona de verify_and_update_password."""
+    return await password_hasher.verify_and_update_async(plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Versión asíncrona de get_password_hash."""
+    return await password_hasher.hash_async(password)
 
 def get_user_by_email(db: Session, email: str):
     """
@@ -62,13 +84,17 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-# --- Dependencia de Autenticación ---
-
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def invalidate_user_cache(user_id: int):
     """
-    Decodifica el token, valida las credenciales y devuelve el usuario.
-    Esta es la dependencia principal para proteger endpoints.
+    Descarta las identidades cacheadas de un usuario.
+    Debe llamarse siempre que se modifique o elimine un usuario.
     """
+    user_cache.delete_where(lambda token, user: user.user_id == user_id)
+
+# --- Dependencia de Autenticación ---
+
+def decode_token(token: str) -> dict:
+    """Decodifica y valida el JWT. Lanza 401 si no es válido."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -76,13 +102,58 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     )
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
+        if payload.get("sub") is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    
-    user = get_user_by_email(db, email=email)
-    if user is None:
-        raise credentials_exception
-    return user
\ No newline at end of file
+    return payload
+
+def load_authenticated_user(db: Session, token: str, payload: dict):
+    """
+    Busca el usuario del token (por 'uid' si está presente, si no por email),
+    lo cachea y lo devuelve como schemas.AuthenticatedUser. Lanza 401 si no existe.
+    """
+    email = payload["sub"]
+    user_id = payload.get("uid")
+    if user_id is not None:
+        user = crud.get_user(db, user_id=user_id)
+    else:
+        user = get_user_by_email(db, email=email)
+    if user is None or user.email != email:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    current_user = schemas.AuthenticatedUser(user_id=user.user_id, email=user.email, username=user.username)
+    user_cache.set(token, current_user, ttl_seconds=payload["exp"] - time.time())
+    return current_user
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    """
+    Decodifica el token, valida las credenciales y devuelve el usuario.
+    Esta es la dependencia principal para proteger endpoints.
+
+    Los tokens ya validados se cachean hasta su expiración (como mucho
+    USER_CACHE_TTL_SECONDS), así que el camino habitual no decodifica el JWT
+    ni consulta la base de datos. Si el token incluye el claim 'uid', la
+    búsqueda en caso de fallo de caché es por clave primaria.
+    """
+    cached_user = user_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+    return load_authenticated_user(db, token, decode_token(token))
+
+
+def get_read_db(current_user: schemas.AuthenticatedUser = Depends(get_current_user)):
+    """
+    Sesión de solo lectura para los endpoints autenticados: va a una réplica
+    si las hay, salvo que el usuario haya escrito hace menos de
+    REPLICA_STICKY_SECONDS (ver database.read_session).
+    """
+    db = read_session(current_user.user_id)
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app import crud, schemas
+
+# Un ID desconocido recarga la tabla como mucho una vez en este intervalo (por
+# si otro proceso ha creado la categoría); el resto de fallos no consultan
+CATEGORY_MISS_RELOAD_SECONDS = float(os.getenv("CATEGORY_MISS_RELOAD_SECONDS", "60"))
+
+
+class CategoryCache:
+    """
+    Caché de categorías del proceso.
+
+    La tabla de categorías es pequeña y prácticamente estática (la puebla la
+    migración inicial), así que se carga al arrancar (ver main.lifespan) y se
+    guarda tanto indexada por ID como ya serializada en JSON, con su ETag. Se
+    recarga en el siguiente acceso después de llamar a invalidate() (cambio de
+    versión, p. ej. tras 'python -m app.cli init-db') y, como mucho una vez
+    cada 'miss_reload_seconds', al pedir un ID que no conoce.
+    """
+
+    def __init__(self, miss_reload_seconds: float = CATEGORY_MISS_RELOAD_SECONDS):
+        self.miss_reload_seconds = miss_reload_seconds
+        self._lock = threading.Lock()
+        self._version = 0
+        self._loaded_version: Optional[int] = None
+        self._loaded_at = float("-inf")
+        self._by_id: Dict[int, schemas.CategoryRead] = {}
+        self._dict_by_id: Dict[int, dict] = {}
+        self.body = b"[]"
+        self.etag = ""
+
+    def load(self, db: Session):
+        """Carga (o recarga) las categorías desde la base de datos."""
+        with self._lock:
+            version = self._version
+        categories = [schemas.CategoryRead.model_validate(c) for c in crud.get_categories(db)]
+        categories.sort(key=lambda c: c.category_id)
+        # Mismo formato que la serialización JSON por defecto de FastAPI
+        dicts = [c.model_dump() for c in categories]
+        body = json.dumps(dicts, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            self._by_id = {c.category_id: c for c in categories}
+            self._dict_by_id = {d["category_id"]: d for d in dicts}
+            self.body = body
+            self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+            self._loaded_version = version
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        """Marca la caché como obsoleta; se recargará en el siguiente acceso."""
+        with self._lock:
+            self._version += 1
+
+    @property
+    def is_stale(self) -> bool:
+        return self._loaded_version != self._version
+
+    def ensure_loaded(self, db: Session):
+        if self.is_stale:
+            self.load(db)
+
+    def snapshot(self):
+        """Devuelve (JSON de todas las categorías, ETag) de la versión cargada."""
+        with self._lock:
+            return self.body, self.etag
+
+    def serialized(self, db: Session):
+        """Como snapshot(), cargando antes las categorías si la caché está obsoleta."""
+        self.ensure_loaded(db)
+        return self.snapshot()
+
+    def resolve(self, db: Session, category_id: int) -> Optional[schemas.CategoryRead]:
+        """
+        Devuelve la categoría con ese ID, o None si no existe. Si no se conoce,
+        recarga la tabla solo si la última carga tiene más de
+        'miss_reload_seconds': un ID inexistente no cuesta una consulta por petición.
+        """
+        self.ensure_loaded(db)
+        category = self._by_id.get(category_id)
+        if category is None and time.monotonic() - self._loaded_at >= self.miss_reload_seconds:
+            self.load(db)
+            category = self._by_id.get(category_id)
+        return category
+
+    def resolve_dict(self, db: Session, category_id: int) -> Optional[dict]:
+        """Como resolve(), pero devuelve el dict ya serializable (compartido, no modificar)."""
+        category = self._dict_by_id.get(category_id)
+        if category is None or self.is_stale:
+            self.resolve(db, category_id)
+            category = self._dict_by_id.get(category_id)
+        return category
+
+
+category_cache = CategoryCache()
@@ -0,0 +1,165 @@
+"""
+Comandos de mantenimiento del backend.
+
+Uso (desde la carpeta del backend):
+    python -m app.cli init-db
+    python -m app.cli rollups-verify [--user-id ID]
+    python -m app.cli rollups-rebuild [--user-id ID]
+    python -m app.cli demo-reset
+    python -m app.cli tombstones-prune [--days 90]
+    python -m app.cli archive-years [--before AÑO] [--user-id ID]
+    python -m app.cli partitions-ensure [--years-ahead 1]
+"""
+import argparse
+import os
+import sys
+from datetime import date
+
+from app import crud, demo, partitioning
+from app.category_cache import category_cache
+from app.database import SessionLocal
+
+
+def init_db() -> int:
+    """
+    Crea o actualiza el esquema y las categorías iniciales aplicando las
+    migraciones de Alembic (equivale a 'alembic upgrade head'). Es idempotente.
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    command.upgrade(Config(os.path.join(os.path.dirname(os.path.dirname(__file__)), "alembic.ini")), "head")
+    # Las migraciones pueden añadir categorías: la caché de este proceso se recarga
+    category_cache.invalidate()
+    print("Base de datos al día.")
+    return 0
+
+
+def rollups_verify(user_id=None) -> int:
+    """Informa de las desviaciones entre los totales mensuales y las transacciones."""
+    db = SessionLocal()
+    try:
+        drift = crud.verify_rollups(db, user_id=user_id)
+    finally:
+        db.close()
+
+    for entry in drift:
+        print(
+            f"user={entry['user_id']} mes={entry['year_month']} categoría={entry['category_id']} "
+            f"tipo={entry['type']}: esperado {entry['expected_total']} ({entry['expected_count']}), "
+            f"almacenado {entry['stored_total']} ({entry['stored_count']})"
+        )
+    print(f"{len(drift)} totales con desviación.")
+    return 1 if drift else 0
+
+
+def rollups_rebuild(user_id=None) -> int:
+    """Recalcula desde cero los totales mensuales."""
+    db = SessionLocal()
+    try:
+        crud.rebuild_rollups(db, user_id=user_id)
+        db.commit()
+    finally:
+        db.close()
+    print("Totales mensuales recalculados.")
+    return 0
+
+
+def demo_reset() -> int:
+    """Restaura los datos del usuario de demostración (pensado para un cron)."""
+    from app import auth
+
+    db = SessionLocal()
+    try:
+        user = auth.get_user_by_email(db, email=demo.DEMO_EMAIL)
+        if user is None:
+            print("El usuario de demostración no existe todavía.")
+            return 0
+        crud.reset_demo_user_data(db=db, user_id=user.user_id)
+    finally:
+        db.close()
+    print("Datos de demostración restaurados.")
+    return 0
+
+
+def tombstones_prune(days: int) -> int:
+    """Purga los tombstones antiguos de los cambios incrementales."""
+    db = SessionLocal()
+    try:
+        pruned = crud.prune_tombstones(db, older_than_days=days)
+    finally:
+        db.close()
+    print(f"{pruned} tombstones de más de {days} días eliminados.")
+    return 0
+
+
+def archive_years(before_year: int, user_id=None) -> int:
+    """Archiva las transacciones de los años cerrados anteriores a 'before_year'."""
+    if before_year > date.today().year:
+        print(f"Solo se pueden archivar años cerrados (--before {date.today().year} como mucho).")
+        return 2
+    db = SessionLocal()
+    try:
+        result = crud.archive_transactions(db, before_year=before_year, user_id=user_id)
+    finally:
+        db.close()
+    for name in result["dropped_partitions"]:
+        print(f"Partición {name} eliminada.")
+    print(f"{result['transactions']} transacciones anteriores a {before_year} archivadas "
+          f"({result['users']} usuarios).")
+    return 0
+
+
+def partitions_ensure(years_ahead: int) -> int:
+    """Crea las particiones anuales que falten (tabla particionada por fecha)."""
+    db = SessionLocal()
+    try:
+        if partitioning.partition_method(db.connection()) != "range":
+            print("La tabla 'transactions' no está particionada por fecha.")
+            return 0
+        created = partitioning.ensure_year_partitions(db.connection(), years_ahead=years_ahead)
+        db.commit()
+    finally:
+        db.close()
+    for name in created:
+        print(f"Partición {name} creada.")
+    print(f"{len(created)} particiones creadas.")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Mantenimiento de MyFiance")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("rollups-verify", "rollups-rebuild"):
+        subparser = subparsers.add_parser(name)
+        subparser.add_argument("--user-id", type=int, default=None)
+    subparsers.add_parser("demo-reset")
+    subparsers.add_parser("init-db")
+    prune_parser = subparsers.add_parser("tombstones-prune")
+    prune_parser.add_argument("--days", type=int, default=90)
+    archive_parser = subparsers.add_parser("archive-years")
+    archive_parser.add_argument("--before", type=int, default=date.today().year - 1,
+                                help="Primer año que no se archiva (por defecto, el anterior al actual)")
+    archive_parser.add_argument("--user-id", type=int, default=None)
+    partitions_parser = subparsers.add_parser("partitions-ensure")
+    partitions_parser.add_argument("--years-ahead", type=int, default=1)
+
+    args = parser.parse_args(argv)
+    if args.command == "init-db":
+        return init_db()
+    if args.command == "demo-reset":
+        return demo_reset()
+    if args.command == "tombstones-prune":
+        return tombstones_prune(args.days)
+    if args.command == "archive-years":
+        return archive_years(args.before, args.user_id)
+    if args.command == "partitions-ensure":
+        return partitions_ensure(args.years_ahead)
+    if args.command == "rollups-verify":
+        return rollups_verify(args.user_id)
+    return rollups_rebuild(args.user_id)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
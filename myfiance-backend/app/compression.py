@@ -0,0 +1,153 @@
+import os
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se negocia gzip
+    brotli = None
+
+# --- Configuración ---
+# Tamaño mínimo (bytes) de una respuesta para comprimirla; por debajo no compensa
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+# Calidad 4: buena relación compresión/CPU para contenido dinámico (11 es para estáticos)
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+# Tipos de contenido que se comprimen (JSON del API, NDJSON y CSV de la exportación)
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+class _GzipEncoder:
+    def __init__(self):
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        output = self._compressor.compress(data)
+        return output + self._compressor.flush(zlib.Z_SYNC_FLUSH) if flush else output
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliEncoder:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        output = self._compressor.process(data)
+        return output + self._compressor.flush() if flush else output
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+# Por orden de preferencia
+ENCODERS = {"br": _BrotliEncoder, "gzip": _GzipEncoder} if brotli is not None else {"gzip": _GzipEncoder}
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Elige la codificación según la cabecera Accept-Encoding: la de mayor 'q'
+    entre las disponibles y, a igual 'q', la preferida (brotli antes que gzip).
+    """
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().lower().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            accepted[coding.strip()] = q
+
+    best, best_q = None, 0.0
+    for coding in ENCODERS:
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def _is_compressible(headers: Headers, status_code: int) -> bool:
+    if status_code < 200 or status_code in (204, 304) or "content-encoding" in headers:
+        return False
+    return headers.get("content-type", "").lower().startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI que comprime las respuestas con brotli (si está instalado)
+    o gzip, según lo que acepte el cliente. Las respuestas completas solo se
+    comprimen a partir de COMPRESSION_MIN_SIZE bytes; las de streaming (la
+    exportación) se comprimen trozo a trozo, sin acumularlas.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        start_message = None
+        encoder = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, encoder, passthrough
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message.setdefault("headers", []))
+                if not _is_compressible(headers, message["status"]):
+                    passthrough = True
+                    await send(message)
+                    return
+                headers.add_vary_header("Accept-Encoding")
+                if encoding is None:
+                    passthrough = True
+                    await send(message)
+                    return
+                # Las cabeceras se envían con el primer trozo del cuerpo, cuando ya se sabe si se comprime
+                start_message = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                encoder = ENCODERS[encoding]()
+                headers = MutableHeaders(raw=start_message["headers"])
+                headers["Content-Encoding"] = encoding
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    body = encoder.compress(body, flush=False) + encoder.finish()
+                    headers["Content-Length"] = str(len(body))
+                    await send(start_message)
+                    await send({**message, "body": body})
+                    return
+                await send(start_message)
+
+            # Streaming: cada trozo se vacía del compresor para que el cliente lo reciba ya
+            data = encoder.compress(body, flush=more_body)
+            if not more_body:
+                data += encoder.finish()
+            await send({**message, "body": data})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,52 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response, status
+
+from app.cache import etag_matches
+
+# Peticiones condicionales (ETag / Last-Modified) sobre los datos de un usuario.
+# Los validadores salen de users.data_version, que incrementan las escrituras de
+# crud.py, así que comprobar si algo ha cambiado cuesta una lectura por clave
+# primaria y no la consulta del listado.
+
+# El navegador guarda la respuesta, pero debe revalidarla antes de cada uso
+CACHE_CONTROL = "private, no-cache"
+
+
+def validators(user_id: int, data_version: int, data_updated_at: Optional[datetime]) -> Dict[str, str]:
+    """
+    Cabeceras ETag, Last-Modified y Cache-Control para la versión de los datos de un usuario.
+    El ETag es débil: la misma versión puede enviarse comprimida o sin comprimir.
+    """
+    headers = {"ETag": f'W/"{user_id}-{data_version}"', "Cache-Control": CACHE_CONTROL}
+    if data_updated_at is not None:
+        if data_updated_at.tzinfo is None:  # SQLite devuelve fechas sin zona (UTC)
+            data_updated_at = data_updated_at.replace(tzinfo=timezone.utc)
+        headers["Last-Modified"] = format_datetime(data_updated_at.astimezone(timezone.utc), usegmt=True)
+    return headers
+
+
+def is_not_modified(request: Request, headers: Dict[str, str]) -> bool:
+    """
+    Indica si la copia del cliente sigue siendo válida. Como indica el RFC 9110,
+    If-None-Match (comparación débil) tiene prioridad sobre If-Modified-Since.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, headers["ETag"])
+
+    if_modified_since = request.headers.get("if-modified-since")
+    last_modified = headers.get("Last-Modified")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        # Last-Modified tiene resolución de segundos: se comparan ya formateadas
+        return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
@@ -1,5 +1,18 @@
-from sqlalchemy.orm import Session
-from app import models, schemas
+import re
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import islice
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from pydantic import ValidationError
+
+from sqlalchemy import (BigInteger, Integer, bindparam, case, cast, column, delete, func, insert, literal_column,
+                        select, table, tuple_, type_coerce, union_all, update)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
+from app import models, partitioning, schemas
+from app.database import stick_to_primary
 from fastapi import HTTPException, status
 
 
@@ -26,18 +39,664 @@ def create_user(db: Session, user: schemas.UserCreate, hashed_password: str):
     return db_user
 
 
-def get_transactions_by_user(db: Session, user_id: int):
+def get_or_create_user(db: Session, user: schemas.UserCreate, hashed_password: str):
+    """
+    Como create_user, pero si otra petición acaba de crear un usuario con el
+    mismo email (p. ej. varios primeros logins simultáneos de la demo),
+    devuelve ese usuario en lugar de fallar por la restricción UNIQUE.
+
+    Returns:
+        models.User: El usuario creado o el que ya existía.
+    """
+    try:
+        return create_user(db, user, hashed_password)
+    except IntegrityError:
+        db.rollback()
+        return db.execute(select(models.User).where(models.User.email == user.email)).scalar_one()
+
+
+def get_user(db: Session, user_id: int):
+    """
+    Busca y devuelve un usuario por su ID.
+
+    Args:
+        db: La sesión de la base de datos.
+        user_id (int): El ID del usuario.
+
+    Returns:
+        models.User: El usuario si se encuentra, de lo contrario None.
+    """
+    return db.get(models.User, user_id)
+
+
+# --- Versión de los datos del usuario ---
+
+def _bump_data_version(db: Session, user_id: int) -> int:
+    """
+    Marca que los datos del usuario han cambiado: incrementa su versión y
+    actualiza la fecha de modificación. Invalida el ETag/Last-Modified del listado.
+    No hace commit: se ejecuta dentro de la transacción de la escritura que lo provoca.
+
+    Las escrituras lo llaman antes de tocar las transacciones: el UPDATE bloquea
+    la fila del usuario hasta el commit, así que las escrituras de un mismo
+    usuario se serializan y sus versiones se confirman en orden. Por eso la
+    versión sirve de cursor para GET /transactions/changes.
+
+    También deja las lecturas del usuario en el primario durante un tiempo tras
+    el commit, si hay réplicas de lectura (ver database.stick_to_primary).
+
+    Returns:
+        int: La nueva versión, que se guarda en transactions.change_version.
+    """
+    stick_to_primary(db, user_id)
+    return db.execute(
+        update(models.User)
+        .where(models.User.user_id == user_id)
+        .values(data_version=models.User.data_version + 1, data_updated_at=func.now())
+        .returning(models.User.data_version)
+        .execution_options(synchronize_session=False)
+    ).scalar_one()
+
+
+def _record_tombstones(db: Session, user_id: int, transaction_ids: Iterable[int], version: int):
+    """
+    Registra el borrado de transacciones para los cambios incrementales. Es un
+    upsert porque SQLite puede reutilizar el ID de la última fila borrada; la
+    clave es (transaction_id, user_id), así que el borrado de un ID reutilizado
+    por otro usuario no pisa el tombstone del primero. No hace commit.
+    """
+    rows = [{"transaction_id": transaction_id, "user_id": user_id, "change_version": version}
+            for transaction_id in transaction_ids]
+    if not rows:
+        return
+    dialect_insert = sqlite.insert if db.get_bind().dialect.name == "sqlite" else postgresql.insert
+    stmt = dialect_insert(models.TransactionTombstone)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["transaction_id", "user_id"],
+        set_={"change_version": stmt.excluded.change_version, "deleted_at": func.now()}
+    )
+    db.execute(stmt, rows)
+
+
+def get_data_version(db: Session, user_id: int):
+    """
+    Devuelve (data_version, data_updated_at) del usuario con una lectura por
+    clave primaria, para responder a peticiones condicionales sin consultar
+    sus transacciones.
+    """
+    return db.execute(
+        select(models.User.data_version, models.User.data_updated_at).where(models.User.user_id == user_id)
+    ).one()
+
+
+def get_transaction_changes(db: Session, user_id: int, since: Optional[int], max_changes: int = 1000):
+    """
+    Devuelve los cambios en las transacciones de un usuario desde un cursor.
+
+    El cursor es la versión de los datos del usuario (users.data_version). Se
+    lee antes que los cambios: si una escritura se confirma entre ambas
+    lecturas, su fila puede llegar ya en esta respuesta y volverá a llegar en
+    la siguiente, lo que no importa porque aplicar un cambio es idempotente.
+
+    Args:
+        db (Session): La sesión de la base de datos.
+        user_id (int): El ID del usuario.
+        since (int, opcional): El cursor de la sincronización anterior. Sin él
+            solo se devuelve el cursor actual, con 'reset' a True.
+        max_changes (int): Número máximo de filas y de borrados. Si hay más, se
+            pide al cliente que resincronice con el listado.
+
+    Returns:
+        dict: {"cursor", "reset", "changed" (tuplas como las de
+        get_transactions_by_user con as_rows=True), "deleted" (IDs)}. Con
+        'reset' a True el cliente debe descartar su copia, volver a cargar el
+        listado y seguir desde 'cursor'.
+    """
+    T, Tombstone = models.Transaction, models.TransactionTombstone
+    version, floor = db.execute(
+        select(models.User.data_version, models.User.sync_floor_version).where(models.User.user_id == user_id)
+    ).one()
+    reset = {"cursor": version, "reset": True, "changed": [], "deleted": []}
+    # Un cursor anterior al suelo ha perdido borrados; uno posterior a la versión
+    # actual no es de esta base de datos (p. ej. tras restaurar una copia)
+    if since is None or since < floor or since > version:
+        return reset
+    if since == version:
+        return {"cursor": version, "reset": False, "changed": [], "deleted": []}
+
+    changed = db.execute(
+        select(*_transaction_columns())
+        .where(T.user_id == user_id, T.change_version > since)
+        .order_by(T.change_version, T.transaction_id)
+        .limit(max_changes + 1)
+    ).all()
+    deleted = db.execute(
+        select(Tombstone.transaction_id)
+        .where(Tombstone.user_id == user_id, Tombstone.change_version > since)
+        .limit(max_changes + 1)
+    ).scalars().all()
+    if len(changed) > max_changes or len(deleted) > max_changes:
+        return reset
+
+    # Un ID reutilizado (SQLite) que vuelve a existir no se da por borrado
+    changed_ids = {row.transaction_id for row in changed}
+    return {"cursor": version, "reset": False, "changed": changed,
+            "deleted": [transaction_id for transaction_id in deleted if transaction_id not in changed_ids]}
+
+
+def prune_tombstones(db: Session, older_than_days: int) -> int:
+    """
+    Borra los tombstones con más de 'older_than_days' días y sube el suelo de
+    sincronización de los usuarios afectados, para que los clientes con un
+    cursor anterior resincronicen en lugar de perder esos borrados.
+    Hace commit.
+
+    Returns:
+        int: Número de tombstones borrados.
+    """
+    Tombstone = models.TransactionTombstone
+    if db.get_bind().dialect.name == "sqlite":
+        cutoff_expr = func.datetime("now", f"-{int(older_than_days)} days")
+    else:
+        cutoff_expr = func.now() - timedelta(days=older_than_days)
+    # Se calcula una vez: las dos sentencias siguientes deben usar el mismo corte
+    cutoff = db.execute(select(cutoff_expr)).scalar()
+    floors = db.execute(
+        select(Tombstone.user_id, func.max(Tombstone.change_version))
+        .where(Tombstone.deleted_at < cutoff)
+        .group_by(Tombstone.user_id)
+    ).all()
+    for user_id, max_version in floors:
+        db.execute(
+            update(models.User)
+            .where(models.User.user_id == user_id, models.User.sync_floor_version < max_version)
+            .values(sync_floor_version=max_version)
+            .execution_options(synchronize_session=False)
+        )
+    pruned = db.execute(
+        delete(Tombstone).where(Tombstone.deleted_at < cutoff),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+    db.commit()
+    return pruned
+
+
+# --- Totales mensuales materializados ---
+
+def _year_month_expr(db: Session, column):
+    """Expresión SQL que formatea una fecha como 'YYYY-MM' según el dialecto."""
+    if db.get_bind().dialect.name == "sqlite":
+        return func.strftime("%Y-%m", column)
+    return func.to_char(column, "YYYY-MM")
+
+
+def _apply_rollup_delta(db: Session, user_id: int, transaction_date: date, category_id: int,
+                        type: str, amount: Decimal, count: int):
+    """
+    Suma (o resta) un importe y un número de transacciones al total mensual
+    correspondiente, con un único upsert atómico. Los totales que se quedan
+    sin transacciones se eliminan.
+    No hace commit: se ejecuta dentro de la transacción de la escritura que lo provoca.
+    """
+    dialect_insert = sqlite.insert if db.get_bind().dialect.name == "sqlite" else postgresql.insert
+    key = {
+        "user_id": user_id,
+        "year_month": transaction_date.strftime("%Y-%m"),
+        "category_id": category_id,
+        "type": getattr(type, "value", type),
+    }
+    stmt = dialect_insert(models.MonthlyRollup).values(**key, total=amount, count=count)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(key),
+        set_={
+            "total": models.MonthlyRollup.total + stmt.excluded.total,
+            "count": models.MonthlyRollup.count + stmt.excluded.count,
+        }
+    )
+    db.execute(stmt)
+
+    if count < 0:
+        db.query(models.MonthlyRollup).filter_by(**key).filter(
+            models.MonthlyRollup.count <= 0
+        ).delete(synchronize_session=False)
+
+
+def _rollup_source(db: Session, user_id: Optional[int] = None,
+                   date_from: Optional[date] = None, date_to: Optional[date] = None):
+    """SELECT que recalcula los totales mensuales desde la tabla de transacciones (o de un intervalo)."""
+    year_month = _year_month_expr(db, models.Transaction.transaction_date)
+    query = select(
+        models.Transaction.user_id,
+        year_month.label("year_month"),
+        models.Transaction.category_id,
+        models.Transaction.type,
+        func.sum(models.Transaction.amount).label("total"),
+        func.count(models.Transaction.transaction_id).label("count"),
+    ).group_by(
+        models.Transaction.user_id, year_month,
+        models.Transaction.category_id, models.Transaction.type
+    )
+    if user_id is not None:
+        query = query.where(models.Transaction.user_id == user_id)
+    if date_from is not None:
+        query = query.where(models.Transaction.transaction_date >= date_from)
+    if date_to is not None:
+        query = query.where(models.Transaction.transaction_date <= date_to)
+    return query
+
+
+def rebuild_rollups(db: Session, user_id: Optional[int] = None):
+    """
+    Recalcula desde cero los totales mensuales de un usuario (o de todos).
+    No hace commit.
+
+    Args:
+        db (Session): La sesión de la base de datos.
+        user_id (int, opcional): El ID del usuario. Si es None, se recalculan todos.
+    """
+    delete_query = db.query(models.MonthlyRollup)
+    if user_id is not None:
+        delete_query = delete_query.filter(models.MonthlyRollup.user_id == user_id)
+    delete_query.delete(synchronize_session=False)
+
+    db.execute(insert(models.MonthlyRollup).from_select(
+        ["user_id", "year_month", "category_id", "type", "total", "count"],
+        _rollup_source(db, user_id)
+    ))
+
+
+def verify_rollups(db: Session, user_id: Optional[int] = None):
+    """
+    Compara los totales mensuales materializados con los recalculados desde
+    las transacciones.
+
+    Args:
+        db (Session): La sesión de la base de datos.
+        user_id (int, opcional): El ID del usuario. Si es None, se verifican todos.
+
+    Returns:
+        list[dict]: Una entrada por cada total con desviación (vacía si no hay ninguna).
+    """
+    expected = {
+        (row.user_id, row.year_month, row.category_id, row.type): (row.total, row.count)
+        for row in db.execute(_rollup_source(db, user_id))
+    }
+    stored_query = db.query(models.MonthlyRollup)
+    if user_id is not None:
+        stored_query = stored_query.filter(models.MonthlyRollup.user_id == user_id)
+    stored = {
+        (row.user_id, row.year_month, row.category_id, row.type): (row.total, row.count)
+        for row in stored_query
+    }
+
+    drift = []
+    for key in sorted(expected.keys() | stored.keys()):
+        exp_total, exp_count = expected.get(key, (Decimal(0), 0))
+        got_total, got_count = stored.get(key, (Decimal(0), 0))
+        if Decimal(exp_total) != Decimal(got_total) or exp_count != got_count:
+            drift.append({
+                "user_id": key[0], "year_month": key[1], "category_id": key[2], "type": key[3],
+                "expected_total": exp_total, "expected_count": exp_count,
+                "stored_total": got_total, "stored_count": got_count,
+            })
+    return drift
+
+
+# --- Archivo de años cerrados ---
+
+def archive_transactions(db: Session, before_year: int, user_id: Optional[int] = None):
+    """
+    Archiva las transacciones anteriores al 1 de enero de 'before_year': suma
+    sus totales por mes, categoría y tipo a archived_monthly_totals y borra
+    las filas (y sus totales de monthly_rollups). El resumen sigue contando
+    esos totales y el saldo de la analítica parte de su neto (ver
+    get_archived_balance_cents); el listado, la búsqueda y la exportación
+    dejan de ver las transacciones archivadas.
+
+    Si la tabla está particionada por fecha (ver app/partitioning.py) y se
+    archivan todos los usuarios, los años completos se borran eliminando su
+    partición en lugar de fila a fila.
+
+    Los usuarios afectados cambian de versión y su cursor de cambios
+    incrementales se invalida (resincronizan), como en el reinicio de la demo.
+    Hace commit.
+
+    Args:
+        db (Session): La sesión de la base de datos.
+        before_year (int): Primer año que no se archiva.
+        user_id (int, opcional): El ID del usuario. Si es None, se archivan todos.
+
+    Returns:
+        dict: Usuarios y transacciones archivadas y particiones borradas.
+    """
+    T = models.Transaction
+    cutoff = date(before_year, 1, 1)
+    filters = [T.transaction_date < cutoff]
+    if user_id is not None:
+        filters.append(T.user_id == user_id)
+
+    # Primero los usuarios: el UPDATE los bloquea hasta el commit, en el mismo
+    # orden que las escrituras (ver _bump_data_version)
+    affected_users = select(T.user_id).where(*filters).distinct()
+    users = db.execute(
+        update(models.User)
+        .where(models.User.user_id.in_(affected_users))
+        .values(data_version=models.User.data_version + 1, sync_floor_version=models.User.data_version + 1,
+                data_updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not users:
+        db.rollback()
+        return {"users": 0, "transactions": 0, "dropped_partitions": []}
+
+    transactions = db.execute(select(func.count()).select_from(T).where(*filters)).scalar()
+    dialect_insert = sqlite.insert if db.get_bind().dialect.name == "sqlite" else postgresql.insert
+    stmt = dialect_insert(models.ArchivedMonthlyTotal).from_select(
+        ["user_id", "year_month", "category_id", "type", "total", "count"],
+        _rollup_source(db, user_id, date_to=cutoff - timedelta(days=1))
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "year_month", "category_id", "type"],
+        set_={
+            "total": models.ArchivedMonthlyTotal.total + stmt.excluded.total,
+            "count": models.ArchivedMonthlyTotal.count + stmt.excluded.count,
+        }
+    )
+    db.execute(stmt)
+
+    dropped = []
+    if user_id is None and partitioning.partition_method(db.connection()) == "range":
+        dropped = partitioning.drop_year_partitions(db.connection(), before_year)
+    db.execute(delete(T).where(*filters), execution_options={"synchronize_session": False})
+
+    rollups = db.query(models.MonthlyRollup).filter(models.MonthlyRollup.year_month < cutoff.strftime("%Y-%m"))
+    if user_id is not None:
+        rollups = rollups.filter(models.MonthlyRollup.user_id == user_id)
+    rollups.delete(synchronize_session=False)
+    db.commit()
+    return {"users": users, "transactions": transactions, "dropped_partitions": dropped}
+
+
+def get_transactions_by_user(
+    db: Session,
+    user_id: int,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[date, int]] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    type: Optional[schemas.TransactionType] = None,
+    category_id: Optional[int] = None,
+    as_rows: bool = False,
+):
     """
-    Obtiene todas las transacciones de un usuario específico.
+    Obtiene las transacciones de un usuario específico, de la más reciente a la más antigua.
+
+    La paginación es por cursor (keyset) sobre (transaction_date, transaction_id),
+    de modo que cada página se resuelve con un recorrido del índice compuesto
+    (user_id, transaction_date, transaction_id) sin importar cuántas filas tenga el usuario.
 
     Args:
         db (Session): La sesión de la base de datos.
         user_id (int): El ID el usuario propietario de la transacción.
+        limit (int, opcional): Número máximo de transacciones a devolver.
+        after (tuple, opcional): Clave (transaction_date, transaction_id) de la última
+            transacción de la página anterior.
+        date_from (date, opcional): Fecha mínima (inclusive).
+        date_to (date, opcional): Fecha máxima (inclusive).
+        type (schemas.TransactionType, opcional): Filtra por ingreso o gasto.
+        category_id (int, opcional): Filtra por categoría.
+        as_rows (bool): Si es True devuelve tuplas de columnas (transaction_id, amount,
+            transaction_date, description, type, category_id) en lugar de objetos ORM,
+            sin cargar la categoría. Es la vía rápida del listado.
+
+    Returns:
+        list[models.Transaction] | list[Row]: Una lista de las transacciones del usuario.
+    """
+    if as_rows:
+        query = db.query(
+            models.Transaction.transaction_id,
+            models.Transaction.amount,
+            models.Transaction.transaction_date,
+            models.Transaction.description,
+            models.Transaction.type,
+            models.Transaction.category_id,
+        )
+    else:
+        # La categoría se carga en el mismo SELECT para evitar una consulta extra por fila al serializar
+        query = db.query(models.Transaction).options(joinedload(models.Transaction.category))
+    query = query.filter(models.Transaction.user_id == user_id)
+
+    if date_from is not None:
+        query = query.filter(models.Transaction.transaction_date >= date_from)
+    if date_to is not None:
+        query = query.filter(models.Transaction.transaction_date <= date_to)
+    if type is not None:
+        query = query.filter(models.Transaction.type == type.value)
+    if category_id is not None:
+        query = query.filter(models.Transaction.category_id == category_id)
+    if after is not None:
+        query = query.filter(
+            tuple_(models.Transaction.transaction_date, models.Transaction.transaction_id) < tuple_(*after)
+        )
+
+    query = query.order_by(
+        models.Transaction.transaction_date.desc(),
+        models.Transaction.transaction_id.desc()
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+
+# --- Búsqueda de texto en las descripciones ---
+
+# Configuración de texto de PostgreSQL. Debe coincidir con la del índice GIN de
+# la migración 0002: si la expresión difiere, el planificador no usa el índice
+SEARCH_TS_CONFIG = literal_column("'spanish'::regconfig")
+_SEARCH_TERM_RE = re.compile(r"\w+")
+# Tabla FTS5 de la migración 0002 (solo SQLite); no forma parte de los modelos
+_transactions_fts = table("transactions_fts", column("rowid"))
+
+
+def search_terms(query: str):
+    """
+    Palabras de la búsqueda, en minúsculas. Se descarta todo lo demás, así que
+    los operadores de tsquery/FTS5 que escriba el usuario no llegan a la consulta.
+    """
+    return [term.lower() for term in _SEARCH_TERM_RE.findall(query or "")]
+
+
+def search_transactions(
+    db: Session,
+    user_id: int,
+    query: str,
+    limit: int = 50,
+    offset: int = 0,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    type: Optional[schemas.TransactionType] = None,
+    category_id: Optional[int] = None,
+):
+    """
+    Busca transacciones de un usuario por su descripción, ordenadas por relevancia.
+
+    Todas las palabras deben aparecer y cada una se compara por prefijo
+    ('super' encuentra 'Supermercado'). En PostgreSQL usa el índice GIN sobre
+    to_tsvector('spanish', description) y ts_rank; en SQLite, la tabla FTS5
+    transactions_fts (que además ignora los acentos) y bm25. A igual
+    relevancia, la más reciente primero.
+
+    Args:
+        db (Session): La sesión de la base de datos.
+        user_id (int): El ID del usuario.
+        query (str): El texto buscado.
+        limit (int): Número máximo de transacciones a devolver.
+        offset (int): Número de resultados que se saltan (paginación).
+        date_from (date, opcional): Fecha mínima (inclusive).
+        date_to (date, opcional): Fecha máxima (inclusive).
+        type (schemas.TransactionType, opcional): Filtra por ingreso o gasto.
+        category_id (int, opcional): Filtra por categoría.
 
     Returns:
-        lsit[models.Transaction]: Una lista de las transacciones del usuario.
+        list[Row]: Tuplas (transaction_id, amount, transaction_date, description, type,
+            category_id), como las de get_transactions_by_user con as_rows=True.
+
+    Raises:
+        HTTPException: 400 si la búsqueda no contiene ninguna palabra.
     """
-    return db.query(models.Transaction).filter(models.Transaction.user_id == user_id).all()
+    terms = search_terms(query)
+    if not terms:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="La búsqueda debe contener al menos una palabra")
+
+    if db.get_bind().dialect.name == "sqlite":
+        # Cada término entre comillas es una cadena literal de FTS5; '*' la convierte en prefijo
+        match = " ".join(f'"{term}"*' for term in terms)
+        fts = literal_column(_transactions_fts.name)
+        stmt = select(*_transaction_columns()) \
+            .join(_transactions_fts, _transactions_fts.c.rowid == models.Transaction.transaction_id) \
+            .where(fts.op("MATCH")(match))
+        order = func.bm25(fts).asc()  # bm25: cuanto menor, más relevante
+    else:
+        document = func.to_tsvector(SEARCH_TS_CONFIG, func.coalesce(models.Transaction.description, literal_column("''")))
+        ts_query = func.to_tsquery(SEARCH_TS_CONFIG, " & ".join(f"{term}:*" for term in terms))
+        stmt = select(*_transaction_columns()).where(document.op("@@")(ts_query))
+        order = func.ts_rank(document, ts_query).desc()
+
+    stmt = stmt.where(models.Transaction.user_id == user_id)
+    if date_from is not None:
+        stmt = stmt.where(models.Transaction.transaction_date >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(models.Transaction.transaction_date <= date_to)
+    if type is not None:
+        stmt = stmt.where(models.Transaction.type == type.value)
+    if category_id is not None:
+        stmt = stmt.where(models.Transaction.category_id == category_id)
+
+    stmt = stmt.order_by(
+        order,
+        models.Transaction.transaction_date.desc(),
+        models.Transaction.transaction_id.desc(),
+    ).limit(limit).offset(offset)
+    return db.execute(stmt).all()
+
+
+def get_transaction_columns(db: Session, user_id: int):
+    """
+    Devuelve todas las transacciones de un usuario como tuplas ya convertidas
+    a enteros en la base de datos, para cargarlas en arrays (ver app.analytics):
+    (días desde 1970-01-01, importe en céntimos, category_id, tipo (0 = ingreso,
+    1 = gasto), descripción), ordenadas por fecha e ID.
+
+    Args:
+        db (Session): La sesión de la base de datos.
+        user_id (int): El ID del usuario.
+
+    Returns:
+        list[Row]: (day, cents, category_id, type_code, description)
+    """
+    T = models.Transaction
+    if db.get_bind().dialect.name == "sqlite":
+        day = cast(func.julianday(T.transaction_date) - 2440587.5, Integer)  # julianday('1970-01-01')
+        cents = cast(func.round(T.amount * 100), Integer)
+    else:
+        day = type_coerce(T.transaction_date - literal_column("DATE '1970-01-01'"), Integer)
+        cents = cast(T.amount * 100, BigInteger)
+    return db.execute(
+        select(day, cents, T.category_id, case((T.type == "income", 0), else_=1), T.description)
+        .where(T.user_id == user_id)
+        .order_by(T.transaction_date, T.transaction_id)
+    ).all()
+
+
+def get_archived_balance_cents(db: Session, user_id: int) -> int:
+    """
+    Neto (ingresos menos gastos) de las transacciones archivadas del usuario,
+    en céntimos: el saldo con el que empiezan sus transacciones vivas (ver
+    archive_transactions).
+    """
+    archived = models.ArchivedMonthlyTotal
+    net = db.execute(
+        select(_sum_by_type(archived.type, archived.total, schemas.TransactionType.INCOME)
+               - _sum_by_type(archived.type, archived.total, schemas.TransactionType.EXPENSE))
+        .where(archived.user_id == user_id)
+    ).scalar()
+    return int((Decimal(str(net)) * 100).to_integral_value()) if net else 0
+
+
+def iter_transactions_for_export(
+    db: Session,
+    user_id: int,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    batch_size: int = 1000,
+):
+    """
+    Recorre las transacciones de un usuario con un cursor del lado del servidor.
+
+    Devuelve tuplas (no objetos ORM) en lotes de 'batch_size', de modo que la
+    memoria usada no depende del número de transacciones exportadas.
+
+    Args:
+        db (Session): La sesión de la base de datos.
+        user_id (int): El ID del usuario.
+        date_from (date, opcional): Fecha mínima (inclusive).
+        date_to (date, opcional): Fecha máxima (inclusive).
+        batch_size (int): Número de filas que se leen del cursor en cada viaje.
+
+    Yields:
+        Row: (transaction_id, transaction_date, amount, description, type, category_id, category_name)
+    """
+    query = select(
+        models.Transaction.transaction_id,
+        models.Transaction.transaction_date,
+        models.Transaction.amount,
+        models.Transaction.description,
+        models.Transaction.type,
+        models.Category.category_id,
+        models.Category.category_name,
+    ).join(models.Category, models.Transaction.category_id == models.Category.category_id) \
+        .where(models.Transaction.user_id == user_id)
+    if date_from is not None:
+        query = query.where(models.Transaction.transaction_date >= date_from)
+    if date_to is not None:
+        query = query.where(models.Transaction.transaction_date <= date_to)
+    query = query.order_by(models.Transaction.transaction_date, models.Transaction.transaction_id)
+
+    result = db.execute(query.execution_options(stream_results=True, yield_per=batch_size))
+    for partition in result.partitions():
+        yield from partition
+
+
+def get_transaction_with_category(db: Session, transaction_id: int):
+    """
+    Obtiene una transacción junto con su categoría en una sola consulta.
+    Se usa tras crear o actualizar para devolver la respuesta sin cargas perezosas.
+
+    Args:
+        db (Session): La sesión de la base de datos.
+        transaction_id (int): El ID de la transacción.
+
+    Returns:
+        models.Transaction: La transacción con su categoría ya cargada.
+    """
+    # populate_existing: devuelve los valores guardados aunque el objeto ya esté en la sesión
+    return db.query(models.Transaction).options(
+        joinedload(models.Transaction.category)
+    ).populate_existing().filter(models.Transaction.transaction_id == transaction_id).first()
+
+
+def _check_category_exists(db: Session, category_id: int):
+    """
+    Lanza 422 si la categoría no existe, antes de escribir nada: en SQLite la
+    clave ajena no se comprueba y en PostgreSQL fallaría con un 500. Se
+    consulta la caché de categorías (recarga una vez si no la conoce).
+    """
+    from app.category_cache import category_cache  # category_cache importa crud
+
+    if category_cache.resolve(db, category_id) is None:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                            detail=f"category_id: la categoría {category_id} no existe")
 
 
 def create_user_transaction(db: Session, transaction: schemas.TransactionCreate, user_id: int):
@@ -52,14 +711,125 @@ def create_user_transaction(db: Session, transaction: schemas.TransactionCreate,
     Return:
         models.Transaction: La transacción recién creada.
     """
+    _check_category_exists(db, transaction.category_id)
+    version = _bump_data_version(db, user_id)
     db_transaction = models.Transaction(
-        **transaction.dict(),  # Desempaqueta el Pydantic model
-        user_id=user_id
+        **transaction.model_dump(),  # Desempaqueta el Pydantic model
+        user_id=user_id,
+        change_version=version
     )
     db.add(db_transaction)
+    db.flush()
+    _apply_rollup_delta(db, user_id, transaction.transaction_date, transaction.category_id,
+                        transaction.type, transaction.amount, 1)
+    transaction_id = db_transaction.transaction_id  # Se lee antes de que el commit expire el objeto
     db.commit()
-    db.refresh(db_transaction)
-    return db_transaction
+    return get_transaction_with_category(db, transaction_id)
+
+
+def bulk_create_user_transactions(
+    db: Session,
+    rows: Iterable[Dict[str, Any]],
+    user_id: int,
+    batch_size: int = 1000,
+    max_reported_errors: int = 1000,
+):
+    """
+    Crea transacciones en bloque a partir de un iterable de filas sin validar.
+
+    Las filas se consumen por lotes de 'batch_size', de modo que la memoria no
+    depende del tamaño total de la importación. Cada lote se valida contra
+    schemas.TransactionCreate, se inserta con un INSERT multi-fila, actualiza los
+    totales mensuales con un upsert por mes/categoría/tipo y se confirma con un
+    único commit. Las filas inválidas se informan y no interrumpen el lote.
+
+    Args:
+        db (Session): La sesión de la base de datos.
+        rows (Iterable[dict]): Las filas a importar (por ejemplo, de un csv.DictReader).
+        user_id (int): El ID del usuario propietario de las transacciones.
+        batch_size (int): Número de filas por lote y por commit.
+        max_reported_errors (int): Número máximo de errores detallados en la respuesta.
+
+    Returns:
+        dict: Un diccionario con la forma de schemas.BulkImportResult.
+    """
+    valid_category_ids = {category_id for (category_id,) in db.query(models.Category.category_id)}
+    inserted = 0
+    failed = 0
+    errors = []
+
+    def report(row_number: int, detail: str):
+        nonlocal failed
+        failed += 1
+        if len(errors) < max_reported_errors:
+            errors.append({"row": row_number, "detail": detail})
+
+    iterator = enumerate(rows, start=1)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            break
+
+        values = []
+        buckets: Dict[tuple, list] = {}
+        for row_number, row in batch:
+            # csv.DictReader guarda los campos que sobran en una fila bajo la clave None
+            if None in row:
+                report(row_number, "la fila tiene más campos que la cabecera")
+                continue
+            try:
+                transaction = schemas.TransactionCreate(**row)
+            except ValidationError as exc:
+                report(row_number, "; ".join(
+                    f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}" for error in exc.errors()
+                ))
+                continue
+            except (TypeError, ValueError) as exc:
+                report(row_number, f"fila no válida: {exc}")
+                continue
+            if transaction.category_id not in valid_category_ids:
+                report(row_number, f"category_id: la categoría {transaction.category_id} no existe")
+                continue
+
+            values.append({**transaction.model_dump(), "type": transaction.type.value, "user_id": user_id})
+            bucket = buckets.setdefault(
+                (transaction.transaction_date.replace(day=1), transaction.category_id, transaction.type.value),
+                [Decimal(0), 0]
+            )
+            bucket[0] += transaction.amount
+            bucket[1] += 1
+
+        if values:
+            version = _bump_data_version(db, user_id)
+            db.execute(insert(models.Transaction), [{**row, "change_version": version} for row in values])
+            for (month, category_id, type_), (total, count) in buckets.items():
+                _apply_rollup_delta(db, user_id, month, category_id, type_, total, count)
+            db.commit()
+            inserted += len(values)
+
+    return {"inserted": inserted, "failed": failed, "errors": errors}
+
+
+# Columnas devueltas por las escrituras con RETURNING; mismo formato que el listado (as_rows)
+def _transaction_columns():
+    T = models.Transaction
+    return (T.transaction_id, T.amount, T.transaction_date, T.description, T.type, T.category_id)
+
+
+def _raise_not_found_or_forbidden(db: Session, transaction_id: int, forbidden_detail: str):
+    """
+    Se llama cuando una escritura acotada al dueño no ha afectado a ninguna fila,
+    para distinguir entre transacción inexistente (404) y de otro usuario (403).
+    Deshace la transacción en curso (y con ella el incremento de versión del usuario).
+    """
+    owner_id = db.execute(
+        select(models.Transaction.user_id).where(models.Transaction.transaction_id == transaction_id)
+    ).scalar()
+    db.rollback()
+    if owner_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Transacción no encontrada")
+    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=forbidden_detail)
 
 
 def delete_transaction(db: Session, transaction_id: int, user_id: int):
@@ -67,6 +837,10 @@ def delete_transaction(db: Session, transaction_id: int, user_id: int):
     Elimina una transacción.
     Verifica que la transacción pertenezca al usuario antes de eliminarla.
 
+    El borrado es una única sentencia DELETE acotada al dueño que devuelve
+    (RETURNING) los datos necesarios para actualizar los totales mensuales;
+    solo si no borra nada se consulta la transacción para responder 404 o 403.
+
     Args:
         db (Session): La sesión de la base de datos.
         transaction_id (int): El ID de la transacción a eliminar.
@@ -75,30 +849,84 @@ def delete_transaction(db: Session, transaction_id: int, user_id: int):
     Returns:
         dic: Un diccionario confirmando la operación.
     """
-    db_transaction = db.query(models.Transaction).filter(
-        models.Transaction.transaction_id == transaction_id
+    T = models.Transaction
+    version = _bump_data_version(db, user_id)
+    deleted = db.execute(
+        delete(T)
+        .where(T.transaction_id == transaction_id, T.user_id == user_id)
+        .returning(T.amount, T.transaction_date, T.category_id, T.type),
+        execution_options={"synchronize_session": False},
     ).first()
 
-    # Si no se encuentra la transacción, devuelve un error 404
-    if not db_transaction:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                            detail="Transacción no encontrada")
+    if deleted is None:
+        _raise_not_found_or_forbidden(db, transaction_id,
+                                      "No tienes permiso para eliminar esta transacción")
 
-    # Si el ID del dueño de la transacción no coincide con el del usuario actual, deuelve un error 403
-    if db_transaction.user_id != user_id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
-                            detail="No tienes permiso para eliminar esta transacción")
-
-    db.delete(db_transaction)
+    _apply_rollup_delta(db, user_id, deleted.transaction_date, deleted.category_id,
+                        deleted.type, -deleted.amount, -1)
+    _record_tombstones(db, user_id, [transaction_id], version)
     db.commit()
     return {"ok": True}
 
 
+def _update_owned_transaction(db: Session, transaction_id: int, user_id: int, values: dict):
+    """
+    Actualiza la transacción solo si pertenece al usuario.
+
+    Devuelve (fila nueva, valores anteriores) o (None, None) si no se ha
+    actualizado nada. Los valores anteriores (old_amount, old_transaction_date,
+    old_category_id, old_type) hacen falta para mover el importe entre los
+    totales mensuales.
+    """
+    T = models.Transaction
+    old_columns = (T.amount.label("old_amount"), T.transaction_date.label("old_transaction_date"),
+                   T.category_id.label("old_category_id"), T.type.label("old_type"))
+
+    if db.get_bind().dialect.name == "postgresql":
+        # Una sola sentencia: el CTE bloquea la fila (FOR UPDATE) y captura los
+        # valores anteriores, que el UPDATE ... FROM devuelve junto a los nuevos
+        old = (
+            select(T.transaction_id, *old_columns)
+            .where(T.transaction_id == transaction_id, T.user_id == user_id)
+            .with_for_update()
+            .cte("old")
+        )
+        row = db.execute(
+            update(T)
+            .where(T.transaction_id == old.c.transaction_id)
+            .values(**values)
+            .returning(*_transaction_columns(), old.c.old_amount, old.c.old_transaction_date,
+                       old.c.old_category_id, old.c.old_type),
+            execution_options={"synchronize_session": False},
+        ).first()
+        return row, row
+
+    # SQLite no permite devolver columnas del FROM en RETURNING; como serializa
+    # las escrituras, basta con leer los valores anteriores en la misma transacción
+    old = db.execute(
+        select(*old_columns).where(T.transaction_id == transaction_id, T.user_id == user_id)
+    ).first()
+    if old is None:
+        return None, None
+    row = db.execute(
+        update(T)
+        .where(T.transaction_id == transaction_id, T.user_id == user_id)
+        .values(**values)
+        .returning(*_transaction_columns()),
+        execution_options={"synchronize_session": False},
+    ).first()
+    return row, old
+
+
 def update_transaction(db: Session, transaction_id: int, transaction_data: schemas.TransactionCreate, user_id: int):
     """
     Actualiza una transacción existente.
     Verifica que la transacción pertenezca al usuario antes de actualizar.
 
+    La actualización va acotada al dueño (WHERE transaction_id = ? AND user_id = ?)
+    y devuelve la fila con RETURNING; solo si no actualiza nada se consulta la
+    transacción para responder 404 o 403.
+
     Args:
         db (Session): La sesión de la base de datos.
         transaction_id (int): El ID de la transacción a actualizar.
@@ -106,27 +934,278 @@ def update_transaction(db: Session, transaction_id: int, transaction_data: schem
         user_id (int): El ID del usuario que solicita la actualización.
 
     Returns:
-        models.Transaction: La transacción actualizada.
+        Row: La transacción actualizada, como tupla de columnas
+        (transaction_id, amount, transaction_date, description, type, category_id).
     """
-    db_transaction = db.query(models.Transaction).filter(
-        models.Transaction.transaction_id == transaction_id
-    ).first()
+    _check_category_exists(db, transaction_data.category_id)
+    values = transaction_data.model_dump()
+    values["type"] = transaction_data.type.value
+    values["change_version"] = _bump_data_version(db, user_id)
+    row, old = _update_owned_transaction(db, transaction_id, user_id, values)
 
-    if not db_transaction:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                            detail="Transacción no encontrada")
+    if row is None:
+        _raise_not_found_or_forbidden(db, transaction_id,
+                                      "No tienes permisos para editar esta transacción")
+
+    # Saca el importe anterior de su total mensual y lo suma al nuevo (pueden ser el mismo)
+    _apply_rollup_delta(db, user_id, old.old_transaction_date, old.old_category_id,
+                        old.old_type, -old.old_amount, -1)
+    _apply_rollup_delta(db, user_id, row.transaction_date, row.category_id,
+                        row.type, row.amount, 1)
+
+    db.commit()
+    return row
+
+
+def apply_transaction_batch(db: Session, operations: Iterable[schemas.BatchOperation], user_id: int):
+    """
+    Aplica un lote de altas, modificaciones y borrados en una única transacción
+    de base de datos.
+
+    Las transacciones afectadas se leen (y bloquean) con una sola consulta y la
+    propiedad se comprueba sobre ese resultado; después se lanza un DELETE, un
+    UPDATE por lotes y un INSERT multi-fila, y los totales mensuales se ajustan
+    con un upsert por mes/categoría/tipo. Las operaciones se evalúan en orden
+    (borrar una transacción y luego editarla da 404); las que fallan se
+    informan con el código HTTP que habrían devuelto y no impiden el resto.
+
+    Args:
+        db (Session): La sesión de la base de datos.
+        operations (Iterable[schemas.BatchOperation]): Las operaciones, en orden.
+        user_id (int): El ID del usuario que envía el lote.
+
+    Returns:
+        dict: Un diccionario con la forma de schemas.BatchResult, donde
+        'transaction' es la tupla de columnas de la transacción (o None).
+    """
+    T = models.Transaction
+    operations = list(operations)
+    referenced_ids = {op.transaction_id for op in operations if op.op != schemas.BatchOperationType.CREATE}
+    # Antes de bloquear las transacciones, como el resto de escrituras; si no se
+    # aplica ninguna operación, el rollback final deshace el incremento
+    version = _bump_data_version(db, user_id)
+
+    # Estado actual de cada transacción referenciada; None si el lote la borra
+    current: Dict[int, Optional[dict]] = {}
+    owners: Dict[int, int] = {}
+    if referenced_ids:
+        existing = db.execute(
+            select(T.transaction_id, T.user_id, T.amount, T.transaction_date, T.category_id, T.type)
+            .where(T.transaction_id.in_(referenced_ids))
+            .with_for_update()
+        )
+        for row in existing:
+            owners[row.transaction_id] = row.user_id
+            current[row.transaction_id] = {"amount": row.amount, "transaction_date": row.transaction_date,
+                                           "category_id": row.category_id, "type": row.type}
+
+    valid_category_ids = {category_id for (category_id,) in db.query(models.Category.category_id)}
+    buckets: Dict[tuple, list] = {}
+
+    def add_to_bucket(values: dict, sign: int):
+        bucket = buckets.setdefault(
+            (values["transaction_date"].replace(day=1), values["category_id"], values["type"]),
+            [Decimal(0), 0]
+        )
+        bucket[0] += sign * values["amount"]
+        bucket[1] += sign
+
+    results = []
+    creates = []                    # (posición en results, valores)
+    updates: Dict[int, dict] = {}   # transaction_id -> valores finales
+    deleted_ids = set()
+
+    for index, op in enumerate(operations):
+        result = {"index": index, "op": op.op, "status": status.HTTP_200_OK,
+                  "transaction_id": op.transaction_id, "transaction": None, "detail": None}
+        results.append(result)
 
-    if db_transaction.user_id != user_id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
-                            detail="No tienes permisos para editar esta transacción")
+        if op.data is not None:
+            values = {**op.data.model_dump(), "type": op.data.type.value}
+            if op.data.category_id not in valid_category_ids:
+                result["status"] = status.HTTP_422_UNPROCESSABLE_CONTENT
+                result["detail"] = f"category_id: la categoría {op.data.category_id} no existe"
+                continue
 
-    # Itera sobre los datos recibidos y actualiza el objeto de la base de datos
-    for key, value in transaction_data.dict().items():
-        setattr(db_transaction, key, value)
+        if op.op == schemas.BatchOperationType.CREATE:
+            result["status"] = status.HTTP_201_CREATED
+            creates.append((index, values))
+            add_to_bucket(values, 1)
+            continue
 
+        if current.get(op.transaction_id) is None:
+            result["status"] = status.HTTP_404_NOT_FOUND
+            result["detail"] = "Transacción no encontrada"
+            continue
+        if owners[op.transaction_id] != user_id:
+            result["status"] = status.HTTP_403_FORBIDDEN
+            result["detail"] = ("No tienes permisos para editar esta transacción"
+                                if op.op == schemas.BatchOperationType.UPDATE
+                                else "No tienes permiso para eliminar esta transacción")
+            continue
+
+        add_to_bucket(current[op.transaction_id], -1)
+        if op.op == schemas.BatchOperationType.UPDATE:
+            add_to_bucket(values, 1)
+            current[op.transaction_id] = values
+            updates[op.transaction_id] = values
+        else:
+            result["status"] = status.HTTP_204_NO_CONTENT
+            current[op.transaction_id] = None
+            updates.pop(op.transaction_id, None)
+            deleted_ids.add(op.transaction_id)
+
+    if not any(result["status"] < 400 for result in results):
+        db.rollback()
+        return {"applied": 0, "failed": len(results), "results": results}
+
+    if deleted_ids:
+        db.execute(delete(T).where(T.transaction_id.in_(deleted_ids)),
+                   execution_options={"synchronize_session": False})
+        _record_tombstones(db, user_id, deleted_ids, version)
+    if updates:
+        # UPDATE por transaction_id con executemany. Es un UPDATE de Core y no el
+        # UPDATE por clave primaria del ORM porque, con la tabla particionada, la
+        # clave primaria incluye la clave de partición (ver app/partitioning.py)
+        transactions_table = T.__table__
+        db.execute(update(transactions_table)
+                   .where(transactions_table.c.transaction_id == bindparam("b_transaction_id")),
+                   [{"b_transaction_id": transaction_id, **values, "change_version": version}
+                    for transaction_id, values in updates.items()])
+
+    rows_by_id = {}
+    if creates:
+        params = [{**values, "user_id": user_id, "change_version": version} for _, values in creates]
+        if db.get_bind().dialect.name == "sqlite":
+            # SQLite no garantiza el orden de RETURNING y, para respetar el de los
+            # parámetros, SQLAlchemy insertaría fila a fila. Los IDs sí se asignan
+            # crecientes en el orden de VALUES: basta con ordenar por transaction_id
+            created = sorted(db.execute(insert(T).returning(*_transaction_columns()), params).all(),
+                             key=lambda row: row.transaction_id)
+        else:
+            created = db.execute(
+                insert(T).returning(*_transaction_columns(), sort_by_parameter_order=True), params
+            ).all()
+        for (index, _), row in zip(creates, created):
+            results[index]["transaction_id"] = row.transaction_id
+            rows_by_id[row.transaction_id] = row
+    if updates:
+        rows_by_id.update(
+            (row.transaction_id, row)
+            for row in db.execute(select(*_transaction_columns()).where(T.transaction_id.in_(updates)))
+        )
+
+    for (month, category_id, type_), (total, count) in buckets.items():
+        if total or count:
+            _apply_rollup_delta(db, user_id, month, category_id, type_, total, count)
     db.commit()
-    db.refresh(db_transaction)
-    return db_transaction
+
+    for result in results:
+        if result["status"] in (status.HTTP_200_OK, status.HTTP_201_CREATED):
+            result["transaction"] = rows_by_id.get(result["transaction_id"])
+    failed = sum(1 for result in results if result["status"] >= 400)
+    return {"applied": len(results) - failed, "failed": failed, "results": results}
+
+
+def _sum_by_type(type_column, amount_column, type: schemas.TransactionType):
+    """SUM condicional del importe para un tipo de transacción."""
+    return func.coalesce(func.sum(case((type_column == type.value, amount_column), else_=0)), 0)
+
+
+def _summary_source(db: Session, user_id: int, date_from: Optional[date], date_to: Optional[date]):
+    """
+    Subconsulta con los totales por mes, categoría y tipo del usuario: los de
+    las transacciones vivas (de monthly_rollups o, con filtro de fechas,
+    agregando las del rango) más los archivados. Los archivados solo se
+    conocen por meses: con filtro de fechas se incluyen los meses que se
+    solapan con el rango.
+    """
+    archived = models.ArchivedMonthlyTotal
+    archived_query = select(archived.user_id, archived.year_month, archived.category_id, archived.type,
+                            archived.total, archived.count).where(archived.user_id == user_id)
+    if date_from is None and date_to is None:
+        # Sin filtro de fechas basta con leer los totales mensuales materializados
+        rollup = models.MonthlyRollup
+        live_query = select(rollup.user_id, rollup.year_month, rollup.category_id, rollup.type,
+                            rollup.total, rollup.count).where(rollup.user_id == user_id)
+    else:
+        live_query = _rollup_source(db, user_id, date_from, date_to)
+        if date_from is not None:
+            archived_query = archived_query.where(archived.year_month >= date_from.strftime("%Y-%m"))
+        if date_to is not None:
+            archived_query = archived_query.where(archived.year_month <= date_to.strftime("%Y-%m"))
+    return union_all(live_query, archived_query).subquery("totals")
+
+
+def _summary_rows(db: Session, source):
+    """Totales mensuales y por categoría a partir de la subconsulta de _summary_source."""
+    income = _sum_by_type(source.c.type, source.c.total, schemas.TransactionType.INCOME)
+    expense = _sum_by_type(source.c.type, source.c.total, schemas.TransactionType.EXPENSE)
+
+    monthly_rows = [
+        (*year_month.split("-"), inc, exp)
+        for year_month, inc, exp in db.execute(
+            select(source.c.year_month, income, expense)
+            .group_by(source.c.year_month).order_by(source.c.year_month)
+        )
+    ]
+
+    category_rows = db.execute(
+        select(
+            models.Category.category_id,
+            models.Category.category_name,
+            source.c.type,
+            func.sum(source.c.total),
+            func.sum(source.c["count"])
+        ).join(models.Category, source.c.category_id == models.Category.category_id)
+        .group_by(models.Category.category_id, models.Category.category_name, source.c.type)
+        .order_by(models.Category.category_id, source.c.type)
+    ).all()
+
+    return monthly_rows, category_rows
+
+
+def get_transaction_summary(
+    db: Session,
+    user_id: int,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+):
+    """
+    Calcula en la base de datos el balance, los totales por mes y los totales
+    por categoría y tipo de las transacciones de un usuario.
+    Sin filtro de fechas se leen los totales mensuales materializados (O(meses));
+    con filtro se agregan las transacciones del rango. En ambos casos se suman
+    los totales de los años archivados (ver archive_transactions).
+
+    Args:
+        db (Session): La sesión de la base de datos.
+        user_id (int): El ID del usuario.
+        date_from (date, opcional): Fecha mínima (inclusive).
+        date_to (date, opcional): Fecha máxima (inclusive).
+
+    Returns:
+        dict: Un diccionario con la forma de schemas.TransactionSummary.
+    """
+    monthly_rows, category_rows = _summary_rows(db, _summary_source(db, user_id, date_from, date_to))
+
+    monthly = [
+        {"year": int(y), "month": int(m), "income": inc, "expense": exp}
+        for y, m, inc, exp in monthly_rows
+    ]
+    total_income = sum((row["income"] for row in monthly), Decimal(0))
+    total_expense = sum((row["expense"] for row in monthly), Decimal(0))
+
+    return {
+        "total_income": total_income,
+        "total_expense": total_expense,
+        "balance": total_income - total_expense,
+        "monthly": monthly,
+        "by_category": [
+            {"category_id": cid, "category_name": name, "type": type_, "total": total, "count": count}
+            for cid, name, type_, total, count in category_rows
+        ],
+    }
 
 
 def get_categories(db: Session):
@@ -152,18 +1231,29 @@ def reset_demo_user_data(db: Session, user_id: int):
         db: La sesión de base de datos
         user_id: El ID del usuario de demostración
     """
+    version = _bump_data_version(db, user_id)
+    # Sin tombstones: los clientes con un cursor anterior tendrán que resincronizar
+    db.execute(update(models.User).where(models.User.user_id == user_id)
+               .values(sync_floor_version=version).execution_options(synchronize_session=False))
+    db.query(models.TransactionTombstone).filter(
+        models.TransactionTombstone.user_id == user_id).delete(synchronize_session=False)
+    db.query(models.ArchivedMonthlyTotal).filter(
+        models.ArchivedMonthlyTotal.user_id == user_id).delete(synchronize_session=False)
+
     # Elimina las transacciones existentes
     db.query(models.Transaction).filter(
         models.Transaction.user_id == user_id).delete()
 
     # Crea nuevos datos de ejemplo
     seed_transactions = [
-        models.Transaction(user_id=user_id, amount=1500.00, transaction_date="2025-08-01",
-                           description="Salario de Agosto", category_id=1, type="income"),
-        models.Transaction(user_id=user_id, amount=55.40, transaction_date="2025-08-03",
-                           description="Compra semanal", category_id=3, type="expense"),
-        models.Transaction(user_id=user_id, amount=12.00, transaction_date="2025-08-05",
-                           description="Café con amigos", category_id=6, type="expense"),
+        models.Transaction(user_id=user_id, amount=Decimal("1500.00"), transaction_date=date(2025, 8, 1),
+                           description="Salario de Agosto", category_id=1, type="income", change_version=version),
+        models.Transaction(user_id=user_id, amount=Decimal("55.40"), transaction_date=date(2025, 8, 3),
+                           description="Compra semanal", category_id=3, type="expense", change_version=version),
+        models.Transaction(user_id=user_id, amount=Decimal("12.00"), transaction_date=date(2025, 8, 5),
+                           description="Café con amigos", category_id=6, type="expense", change_version=version),
     ]
     db.add_all(seed_transactions)
+    db.flush()
+    rebuild_rollups(db, user_id=user_id)
     db.commit()
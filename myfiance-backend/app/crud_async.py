@@ -0,0 +1,37 @@
+"""
+Versiones asíncronas de las funciones de crud.py para el modo DATABASE_ASYNC.
+
+Cada función ejecuta la implementación síncrona con AsyncSession.run_sync, que
+reutiliza el mismo código ORM sobre la conexión asíncrona (las esperas de red
+ceden el event loop) sin duplicar la lógica ni ocupar hilos del threadpool.
+"""
+import functools
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import auth, crud
+
+
+def _run_sync(fn):
+    @functools.wraps(fn)
+    async def wrapper(db: AsyncSession, *args, **kwargs):
+        return await db.run_sync(fn, *args, **kwargs)
+    return wrapper
+
+
+create_user = _run_sync(crud.create_user)
+get_or_create_user = _run_sync(crud.get_or_create_user)
+get_user = _run_sync(crud.get_user)
+get_user_by_email = _run_sync(auth.get_user_by_email)
+get_data_version = _run_sync(crud.get_data_version)
+get_transactions_by_user = _run_sync(crud.get_transactions_by_user)
+get_transaction_changes = _run_sync(crud.get_transaction_changes)
+search_transactions = _run_sync(crud.search_transactions)
+create_user_transaction = _run_sync(crud.create_user_transaction)
+bulk_create_user_transactions = _run_sync(crud.bulk_create_user_transactions)
+delete_transaction = _run_sync(crud.delete_transaction)
+update_transaction = _run_sync(crud.update_transaction)
+apply_transaction_batch = _run_sync(crud.apply_transaction_batch)
+get_transaction_summary = _run_sync(crud.get_transaction_summary)
+get_categories = _run_sync(crud.get_categories)
+reset_demo_user_data = _run_sync(crud.reset_demo_user_data)
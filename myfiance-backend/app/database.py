@@ -1,11 +1,15 @@
+import itertools
 import os
-from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import threading
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 
-# Carga las variables del archivo .env
-load_dotenv()
+from .cache import TTLCache
+from .pooling import PoolMetrics, instrumented_pool_class
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
@@ -21,15 +25,211 @@ if DATABASE_URL is None:
 if not DATABASE_URL:
     raise ValueError("No se pudo configurar la URL de la base de datos. Asegúrate de que las variables de entorno están definidas.")
 
+
+def _env_flag(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes")
+
+
+# --- Configuración del pool de conexiones ---
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # Segundos esperando una conexión libre
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # Segundos antes de renovar una conexión
+DB_POOL_PRE_PING = _env_flag("DB_POOL_PRE_PING", True)  # Descarta conexiones caídas antes de usarlas
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))  # 0 = sin límite
+# Detrás de PgBouncer (modo transacción) el pool lo gestiona PgBouncer:
+# sin pool local (NullPool) y sin sentencias preparadas en asyncpg
+DB_PGBOUNCER = _env_flag("DB_PGBOUNCER", False)
+
+# --- Réplicas de lectura (opcional) ---
+# URLs separadas por comas. Sin ellas, todas las consultas van a DATABASE_URL
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+# Segundos que las lecturas de un usuario siguen yendo al primario después de
+# que escriba, para que vea sus propios cambios aunque la réplica vaya con retraso
+REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+REPLICA_STICKY_MAX_USERS = int(os.getenv("REPLICA_STICKY_MAX_USERS", "100000"))
+
+# --- Particionado de 'transactions' (opcional, solo PostgreSQL) ---
+# "range": una partición por año de transaction_date; "hash": particiones por user_id.
+# Lo aplica la migración 0005 (ver app/partitioning.py) y el modelo lo refleja
+TRANSACTIONS_PARTITION_BY = os.getenv("TRANSACTIONS_PARTITION_BY", "").strip().lower()
+TRANSACTIONS_HASH_PARTITIONS = int(os.getenv("TRANSACTIONS_HASH_PARTITIONS", "16"))
+PARTITION_KEYS = {"range": "transaction_date", "hash": "user_id"}
+if TRANSACTIONS_PARTITION_BY and TRANSACTIONS_PARTITION_BY not in PARTITION_KEYS:
+    raise ValueError("TRANSACTIONS_PARTITION_BY debe ser 'range', 'hash' o estar vacío.")
+
+# Telemetría de los pools (la expone el router de métricas)
+pool_metrics = PoolMetrics("sync")
+async_pool_metrics = PoolMetrics("async")
+replica_pool_metrics = [PoolMetrics(f"replica-{i}") for i in range(len(DATABASE_REPLICA_URLS))]
+async_replica_pool_metrics = [PoolMetrics(f"async-replica-{i}") for i in range(len(DATABASE_REPLICA_URLS))]
+
+
+def _engine_options(url: str, is_async: bool, metrics: PoolMetrics) -> dict:
+    """Argumentos de create_engine según la configuración del pool y el dialecto."""
+    backend = make_url(url).get_backend_name()
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+    connect_args = {}
+
+    if DB_PGBOUNCER:
+        options["poolclass"] = NullPool
+        if is_async:
+            connect_args["statement_cache_size"] = 0
+    elif backend != "sqlite":
+        # SQLite conserva el pool por defecto de SQLAlchemy
+        options.update(
+            poolclass=instrumented_pool_class(AsyncAdaptedQueuePool if is_async else QueuePool, metrics),
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+
+    if DB_STATEMENT_TIMEOUT_MS > 0 and backend == "postgresql":
+        if is_async:
+            connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+        else:
+            connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
 # --- Configuración de SQLALchemy ---
 
 # El 'engine' es el punto de entrada a la base de datos.
-# Gestiona el dialecto de la BD y el pool de conexiones.
-engine = create_engine(DATABASE_URL)
+# Gestiona el dialecto de la BD y el pool de conexiones. Se crea en el primer
+# uso (get_engine), no al importar, para que arrancar un worker no cargue el
+# driver ni abra conexiones antes de recibir la primera petición.
+_engine = None
+_async_engine = None
+_async_sessionmaker = None
+_replica_engines_list = None
+_async_replica_sessionmakers = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """Devuelve el engine síncrono, creándolo en la primera llamada."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL, False, pool_metrics))
+                SessionLocal.configure(bind=_engine)
+    return _engine
+
+
+def _replica_engines():
+    """Engines síncronos de las réplicas, creados en la primera llamada."""
+    global _replica_engines_list
+    if _replica_engines_list is None:
+        with _engine_lock:
+            if _replica_engines_list is None:
+                _replica_engines_list = [
+                    create_engine(url, **_engine_options(url, False, metrics))
+                    for url, metrics in zip(DATABASE_REPLICA_URLS, replica_pool_metrics)
+                ]
+    return _replica_engines_list
+
+
+class _LazySessionmaker(sessionmaker):
+    """sessionmaker que crea el engine al abrir la primera sesión."""
+
+    def __call__(self, **local_kw):
+        if _engine is None:
+            get_engine()
+        return super().__call__(**local_kw)
+
 
 # 'SessionLocal' es una "fábrica" de sesiones de bases de datos.
 # Cada instancia de SessionLocal será una sesión de base de datos.
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = _LazySessionmaker(autocommit=False, autoflush=False)
+
+# --- Modo asíncrono (opcional) ---
+# Con DATABASE_ASYNC=true los endpoints principales usan un engine asíncrono
+# (asyncpg para PostgreSQL, aiosqlite para SQLite) en lugar de ocupar un hilo
+# del threadpool durante cada consulta.
+DATABASE_ASYNC = _env_flag("DATABASE_ASYNC", False)
+
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def get_async_database_url(url: str) -> str:
+    """Convierte la URL síncrona en su equivalente con driver asíncrono."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No hay driver asíncrono configurado para '{parsed.get_backend_name()}'.")
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+def get_async_engine():
+    """Devuelve el engine asíncrono (modo DATABASE_ASYNC), creándolo en la primera llamada."""
+    global _async_engine, _async_sessionmaker
+    if _async_engine is None:
+        with _engine_lock:
+            if _async_engine is None:
+                # Import diferido: el modo asíncrono requiere 'sqlalchemy[asyncio]' y el driver asíncrono
+                from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+                url = os.getenv("ASYNC_DATABASE_URL") or get_async_database_url(DATABASE_URL)
+                if DB_PGBOUNCER and make_url(url).get_backend_name() == "postgresql":
+                    url = make_url(url).update_query_dict(
+                        {"prepared_statement_cache_size": "0"}
+                    ).render_as_string(hide_password=False)
+                engine = create_async_engine(url, **_engine_options(url, True, async_pool_metrics))
+                # Sin expirar al hacer commit: los objetos devueltos se serializan fuera del contexto asíncrono
+                _async_sessionmaker = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+                _async_engine = engine
+    return _async_engine
+
+
+def _get_async_replica_sessionmakers():
+    """async_sessionmaker de cada réplica (modo DATABASE_ASYNC), creados en la primera llamada."""
+    global _async_replica_sessionmakers
+    if _async_replica_sessionmakers is None:
+        with _engine_lock:
+            if _async_replica_sessionmakers is None:
+                from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+                explicit = [url.strip() for url in os.getenv("ASYNC_DATABASE_REPLICA_URLS", "").split(",")
+                            if url.strip()]
+                urls = explicit or [get_async_database_url(url) for url in DATABASE_REPLICA_URLS]
+                _async_replica_sessionmakers = [
+                    async_sessionmaker(bind=create_async_engine(url, **_engine_options(url, True, metrics)),
+                                       autoflush=False, expire_on_commit=False)
+                    for url, metrics in zip(urls, async_replica_pool_metrics)
+                ]
+    return _async_replica_sessionmakers
+
+
+async def dispose_engines():
+    """Cierra las conexiones de los engines que se hayan llegado a crear."""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    for factory in _async_replica_sessionmakers or []:
+        await factory.kw["bind"].dispose()
+    if _engine is not None:
+        _engine.dispose()
+    for engine in _replica_engines_list or []:
+        engine.dispose()
+
+
+def all_pool_metrics():
+    """Telemetría de los pools en uso: primario y réplicas, síncronos y, en modo DATABASE_ASYNC, asíncronos."""
+    metrics = [pool_metrics, *replica_pool_metrics]
+    if DATABASE_ASYNC:
+        metrics += [async_pool_metrics, *async_replica_pool_metrics]
+    return metrics
+
+
+def __getattr__(name):
+    # Compatibilidad con 'from app.database import engine': crea el engine al pedirlo
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # 'Base' es una clase base que nuestros modelos de ORM (tablas) heredarán.
 Base = declarative_base()
@@ -46,4 +246,90 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    """
+    Equivalente asíncrono de get_db para el modo DATABASE_ASYNC.
+    """
+    if _async_sessionmaker is None:
+        get_async_engine()
+    async with _async_sessionmaker() as db:
+        yield db
+
+
+# --- Enrutado de lecturas a las réplicas ---
+# Las escrituras de datos de un usuario (crud._bump_data_version) lo anotan en
+# la sesión con stick_to_primary; al confirmarse, sus lecturas se quedan en el
+# primario durante REPLICA_STICKY_SECONDS. El registro es de cada proceso: con
+# varios workers, REPLICA_STICKY_SECONDS debe cubrir el retraso de las réplicas
+# para que la siguiente petición, llegue al worker que llegue, vea la escritura.
+_recent_writers = TTLCache(max_size=REPLICA_STICKY_MAX_USERS, ttl_seconds=REPLICA_STICKY_SECONDS)
+_replica_counter = itertools.count()
+_PENDING_WRITERS = "replica_sticky_user_ids"
+
+
+def stick_to_primary(db: Session, user_id: int):
+    """Anota que la sesión escribe datos del usuario; cuenta a partir del commit."""
+    if DATABASE_REPLICA_URLS:
+        db.info.setdefault(_PENDING_WRITERS, set()).add(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _record_writers(session: Session):
+    for user_id in session.info.pop(_PENDING_WRITERS, ()):
+        _recent_writers.set(user_id, True)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_writers(session: Session):
+    session.info.pop(_PENDING_WRITERS, None)
+
+
+def use_replica(user_id=None) -> bool:
+    """Indica si las lecturas (del usuario, si se indica) pueden ir a una réplica."""
+    return bool(DATABASE_REPLICA_URLS) and (user_id is None or _recent_writers.get(user_id) is None)
+
+
+def read_session(user_id=None) -> Session:
+    """
+    Sesión para consultas de solo lectura: en una réplica (por turnos) si hay
+    réplicas configuradas y el usuario no ha escrito hace menos de
+    REPLICA_STICKY_SECONDS; si no, en el primario.
+    """
+    if not use_replica(user_id):
+        return SessionLocal()
+    engines = _replica_engines()
+    return SessionLocal(bind=engines[next(_replica_counter) % len(engines)])
+
+
+def async_read_session(user_id=None):
+    """Equivalente asíncrono de read_session para el modo DATABASE_ASYNC."""
+    if not use_replica(user_id):
+        if _async_sessionmaker is None:
+            get_async_engine()
+        return _async_sessionmaker()
+    factories = _get_async_replica_sessionmakers()
+    return factories[next(_replica_counter) % len(factories)]()
+
+
+def get_read_db():
+    """
+    Variante de get_db para los endpoints de solo lectura sin usuario (ver
+    read_session). Los autenticados usan auth.get_read_db, que tiene en cuenta
+    las escrituras recientes del usuario.
+    """
+    db = read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db():
+    """
+    Equivalente asíncrono de get_read_db para el modo DATABASE_ASYNC.
+    """
+    async with async_read_session() as db:
+        yield db
@@ -0,0 +1,50 @@
+import os
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from app import crud
+
+# --- Usuario de demostración ---
+DEMO_EMAIL = "demo@example.com"
+DEMO_PASSWORD = "demopassword"
+# Cada cuánto se restauran como mucho los datos de la demo (0 = en cada login)
+DEMO_RESET_INTERVAL_SECONDS = float(os.getenv("DEMO_RESET_INTERVAL_SECONDS", "900"))
+
+
+class DemoResetSchedule:
+    """
+    Restaura los datos de la demo de forma perezosa: el primer login de la demo
+    después de que venza el intervalo hace el reinicio y el resto de logins
+    solo emiten el token. Si hay un reinicio en curso, los logins concurrentes
+    no esperan a que termine ni lanzan otro.
+
+    El estado es por proceso; con varios workers cada uno reinicia como mucho
+    una vez por intervalo. Para reiniciar desde fuera (cron), ver
+    'python -m app.cli demo-reset'.
+    """
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self._lock = threading.Lock()
+        self._last_reset = None
+
+    def is_due(self) -> bool:
+        return self._last_reset is None or time.monotonic() - self._last_reset >= self.interval_seconds
+
+    def maybe_reset(self, db: Session, user_id: int) -> bool:
+        """Reinicia los datos de la demo si toca. Devuelve True si lo ha hecho."""
+        if not self.is_due() or not self._lock.acquire(blocking=False):
+            return False
+        try:
+            if not self.is_due():
+                return False
+            crud.reset_demo_user_data(db=db, user_id=user_id)
+            self._last_reset = time.monotonic()
+            return True
+        finally:
+            self._lock.release()
+
+
+demo_reset = DemoResetSchedule(DEMO_RESET_INTERVAL_SECONDS)
@@ -0,0 +1,203 @@
+import bisect
+import contextvars
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# --- Configuración ---
+# Umbral del log de consultas lentas en milisegundos (0 lo desactiva)
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+# Añade la cabecera Server-Timing a las respuestas
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING", "true").lower() in ("1", "true", "yes")
+# Añade los parámetros al log de consultas lentas. Desactivado por defecto: los
+# parámetros pueden contener datos personales (emails, descripciones, importes)
+SLOW_QUERY_LOG_PARAMS = os.getenv("SLOW_QUERY_LOG_PARAMS", "false").lower() in ("1", "true", "yes")
+
+slow_query_logger = logging.getLogger("app.slow_queries")
+
+# Límites superiores de los buckets de los histogramas de tiempo (segundos) y de sentencias
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class RequestStats:
+    """Tiempos y contadores acumulados durante una petición."""
+    __slots__ = ("db_seconds", "statements", "serialization_seconds")
+
+    def __init__(self):
+        self.db_seconds = 0.0
+        self.statements = 0
+        self.serialization_seconds = 0.0
+
+
+# Estadísticas de la petición en curso. Los endpoints síncronos se ejecutan en el
+# threadpool con una copia del contexto, que apunta al mismo objeto RequestStats
+_current_stats: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "request_stats", default=None
+)
+
+
+def record_serialization(seconds: float):
+    """Suma tiempo de serialización de la respuesta a la petición en curso."""
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.serialization_seconds += seconds
+
+
+# --- Eventos de SQLAlchemy ---
+# Se registran sobre la clase Engine, así que cubren también los engines creados
+# de forma perezosa (y el síncrono que hay debajo del engine asíncrono)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.db_seconds += elapsed
+        stats.statements += 1
+    if 0 < SLOW_QUERY_THRESHOLD_MS <= elapsed * 1000:
+        sql = " ".join(statement.split())[:1000]
+        if SLOW_QUERY_LOG_PARAMS:
+            slow_query_logger.warning("Consulta lenta (%.1f ms): %s -- parámetros: %.1000r",
+                                      elapsed * 1000, sql, parameters)
+        else:
+            slow_query_logger.warning("Consulta lenta (%.1f ms): %s", elapsed * 1000, sql)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # Si la sentencia falla no hay after_cursor_execute: se descarta su inicio
+    # para que la pila de la conexión (que vuelve al pool) no crezca
+    conn = exception_context.connection
+    if conn is not None and exception_context.statement is not None:
+        starts = conn.info.get("query_start")
+        if starts:
+            starts.pop()
+
+
+# --- Histogramas al estilo Prometheus ---
+
+class Histogram:
+    """Histograma con etiquetas, acumulativo desde el arranque del proceso."""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], list] = {}  # etiquetas -> [buckets..., +Inf, suma]
+
+    def observe(self, labels: Tuple[str, ...], value: float):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect.bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def render(self) -> str:
+        """Representación en el formato de texto de Prometheus."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        for labels, values in sorted(series.items()):
+            base = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels))
+            prefix = base + "," if base else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), values[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_number(bound)
+                lines.append(f'{self.name}_bucket{{{prefix}le="{le}"}} {cumulative}')
+            suffix = f"{{{base}}}" if base else ""
+            lines.append(f"{self.name}_sum{suffix} {_format_number(values[-1])}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return "\n".join(lines)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+REQUEST_LABELS = ("method", "route", "status")
+request_duration = Histogram("http_request_duration_seconds",
+                             "Tiempo total de la petición, hasta el último byte de la respuesta.",
+                             REQUEST_LABELS, DURATION_BUCKETS)
+request_db_duration = Histogram("http_request_db_duration_seconds",
+                                "Tiempo de la petición dentro de la base de datos.",
+                                REQUEST_LABELS, DURATION_BUCKETS)
+request_db_statements = Histogram("http_request_db_statements",
+                                  "Sentencias SQL ejecutadas por petición.",
+                                  REQUEST_LABELS, STATEMENT_BUCKETS)
+request_serialization_duration = Histogram("http_request_serialization_duration_seconds",
+                                           "Tiempo de codificación del cuerpo de la respuesta.",
+                                           REQUEST_LABELS, DURATION_BUCKETS)
+REQUEST_HISTOGRAMS = (request_duration, request_db_duration, request_db_statements,
+                      request_serialization_duration)
+
+
+def _route_label(scope) -> str:
+    # Plantilla de la ruta (/transactions/{transaction_id}), no la URL: acota la cardinalidad
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def server_timing_header(stats: RequestStats, app_seconds: float) -> str:
+    return (f"app;dur={app_seconds * 1000:.2f}, db;dur={stats.db_seconds * 1000:.2f}, "
+            f'db-statements;desc="{stats.statements}", '
+            f"serialize;dur={stats.serialization_seconds * 1000:.2f}")
+
+
+class InstrumentationMiddleware:
+    """
+    Middleware ASGI que mide cada petición HTTP: tiempo total, tiempo y número
+    de sentencias en la base de datos y tiempo de serialización. Lo añade a la
+    respuesta en la cabecera Server-Timing (lo medido hasta enviar las
+    cabeceras) y lo acumula en los histogramas que expone GET /metrics.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        start = time.perf_counter()
+        status_code = [500]
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status_code[0] = message["status"]
+                if SERVER_TIMING_ENABLED:
+                    header = server_timing_header(stats, time.perf_counter() - start)
+                    message = {**message, "headers": list(message.get("headers", []))
+                               + [(b"server-timing", header.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            labels = (scope["method"], _route_label(scope), str(status_code[0]))
+            request_duration.observe(labels, time.perf_counter() - start)
+            request_db_duration.observe(labels, stats.db_seconds)
+            request_db_statements.observe(labels, stats.statements)
+            request_serialization_duration.observe(labels, stats.serialization_seconds)
@@ -1,16 +1,30 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
 
-from app.database import Base, engine, SessionLocal
-from app.routers import users, transactions, categories
-from app import models
-import time
+from app import auth
+from app.category_cache import category_cache
+from app.compression import CompressionMiddleware
+from app.database import DATABASE_ASYNC, dispose_engines, read_session
+from app.hashing import password_hasher
+from app.instrumentation import InstrumentationMiddleware
+from app.ratelimit import analytics_limit, auth_limit, by_ip, by_user, transactions_limit
+from app.responses import TimedJSONResponse
+from app.routers import users, transactions, categories, metrics, analytics
 
-# Crea las tablas en la base de datos si no existen
-# (En un entorno de producción, esto se gestiona con Alembic)
-Base.metadata.create_all(bind=engine)
+# El esquema y las categorías iniciales no se crean al arrancar: se gestionan con
+# las migraciones de Alembic ('alembic upgrade head' o 'python -m app.cli init-db').
+# Al arrancar, cada worker solo lee las categorías para llenar su caché.
+
+
+def _load_category_cache():
+    db = read_session()
+    try:
+        category_cache.load(db)
+    finally:
+        db.close()
 
 
 @asynccontextmanager
@@ -18,51 +32,23 @@ async def lifespan(app: FastAPI):
     """
     Función que se ejecuta al iniciar (startup) y al cerrar (shutdown) la aplicación.
     """
-    print("Aplicación FastAPI iniciando...")
-
-    # Lógica de arranque (startup)
-    # Dar un pequeño respiro para asegurar que la DB esté completamente lista, si fuera necesario
-    # time.sleep(1)
-
-    db: Session = SessionLocal()
+    # Si la base de datos aún no está disponible, la caché se carga en su primer uso
     try:
-        # Comprobar si ya hay categorías
-        if db.query(models.Category).count() == 0:
-            print("Base de datos de categorías vacía. Poblando con datos iniciales...")
-
-            initial_categories = [
-                {'category_name': 'Ingreso - Salario'},
-                {'category_name': 'Ingreso - Inversiones'},
-                {'category_name': 'Gasto - Alimentos'},
-                {'category_name': 'Gasto - Vivienda'},
-                {'category_name': 'Gasto - Transporte'},
-                {'category_name': 'Gasto - Ocio'},
-                {'category_name': 'Gasto - Salud'},
-                {'category_name': 'Gasto - Educación'},
-                {'category_name': 'Gasto - Ahorro'}
-            ]
-
-            for cat_data in initial_categories:
-                db.add(models.Category(**cat_data))
-
-            db.commit()
-            print("Categorías iniciales creadas con éxito.")
-        else:
-            print(
-                "La base de datos de categorías ya contiene datos. No se requiere ninguna acción.")
-
-    finally:
-        db.close()
-
+        await run_in_threadpool(_load_category_cache)
+    except SQLAlchemyError as exc:
+        print(f"No se pudieron cargar las categorías al arrancar: {exc}")
     print("Startup completo. La aplicación está lista para servir peticiones.")
     yield  # Aquí la aplicación empieza a recibir peticiones
     print("Aplicación FastAPI cerrándose...")
+    password_hasher.shutdown()
+    await dispose_engines()
 
 app = FastAPI(
     title="MyFiance API",
     description="Backend para la aplicación de gestión de finanzas personales MyFiance.",
     version="0.1.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=TimedJSONResponse
 )
 
 # Configurar CORS
@@ -77,12 +63,38 @@ app.add_middleware(
     allow_credentials=True, # Permitir cookies
     allow_methods=["*"],    # Permitir todos los métodos (GET, POST, etc.)
     allow_headers=["*"],    # Permitir todos los headers
+    expose_headers=["X-Next-Cursor", "X-Next-Offset", "Server-Timing"],  # Cursor del listado y tiempos de la petición
 )
 
+# Compresión brotli/gzip negociada con Accept-Encoding, a partir de COMPRESSION_MIN_SIZE bytes
+app.add_middleware(CompressionMiddleware)
+
+# Tiempos, sentencias SQL y serialización de cada petición (Server-Timing y GET /metrics).
+# Se añade el último para que envuelva también al middleware de CORS.
+app.add_middleware(InstrumentationMiddleware)
+
+# Límites de peticiones por router (token bucket, ver app.ratelimit): por IP en
+# la autenticación (bcrypt) y por usuario en los datos. Responden 429 con Retry-After.
+auth_rate_limit = [Depends(by_ip(auth_limit))]
+
+# En modo asíncrono, las versiones async se registran primero y tienen prioridad;
+# los endpoints sin versión async (importación y exportación) siguen en los routers síncronos.
+if DATABASE_ASYNC:
+    from app.routers.aio import users as async_users, transactions as async_transactions, \
+        categories as async_categories
+    from app.routers.aio.dependencies import get_current_user as async_get_current_user
+    app.include_router(async_users.router, dependencies=auth_rate_limit)
+    app.include_router(async_transactions.router,
+                       dependencies=[Depends(by_user(transactions_limit, async_get_current_user))])
+    app.include_router(async_categories.router)
+
 # Incluye los routers en la aplicación principal
-app.include_router(users.router)
-app.include_router(transactions.router)
+app.include_router(users.router, dependencies=auth_rate_limit)
+app.include_router(transactions.router, dependencies=[Depends(by_user(transactions_limit, auth.get_current_user))])
 app.include_router(categories.router)
+if metrics.METRICS_ENABLED:
+    app.include_router(metrics.router)
+app.include_router(analytics.router, dependencies=[Depends(by_user(analytics_limit, auth.get_current_user))])
 
 @app.get("/")
 def read_root():
@@ -1,18 +1,28 @@
 from sqlalchemy import (Column, Integer, String, Numeric, Date, ForeignKey,
-                        TIMESTAMP, Text)
+                        TIMESTAMP, Text, Index, CheckConstraint)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from .database import Base
+from .database import Base, PARTITION_KEYS, TRANSACTIONS_PARTITION_BY
+
+# Columna por la que se particiona 'transactions' (None si no se particiona)
+TRANSACTIONS_PARTITION_KEY = PARTITION_KEYS.get(TRANSACTIONS_PARTITION_BY)
 
 
 class User(Base):
     __tablename__ = "users"
 
-    user_id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, primary_key=True)
     username = Column(String(50), unique=True, nullable=False)
-    email = Column(String(100), unique=True, nullable=False, index=True)
+    email = Column(String(100), unique=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    # Versión de los datos del usuario: la incrementa cada escritura de sus transacciones
+    # (crud._bump_data_version). De ella salen el ETag y el Last-Modified del listado
+    data_version = Column(Integer, nullable=False, server_default="0")
+    data_updated_at = Column(TIMESTAMP(timezone=True), default=func.now())
+    # Los cambios hasta esta versión ya no pueden servirse de forma incremental (se han
+    # purgado sus tombstones o se han reiniciado los datos): obliga a una resincronización
+    sync_floor_version = Column(Integer, nullable=False, server_default="0")
 
     transactions = relationship("Transaction", back_populates="owner")
 
@@ -20,23 +30,98 @@ class User(Base):
 class Category(Base):
     __tablename__ = "categories"
 
-    category_id = Column(Integer, primary_key=True, index=True)
+    category_id = Column(Integer, primary_key=True)
     category_name = Column(String(50), unique=True, nullable=False)
 
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Índice para la paginación por cursor del listado de transacciones
+        Index("idx_transactions_user_date_id", "user_id", "transaction_date", "transaction_id"),
+        Index("idx_transactions_date", "transaction_date"),
+        # Índice para los cambios incrementales (GET /transactions/changes)
+        Index("idx_transactions_user_change", "user_id", "change_version"),
+        CheckConstraint("type IN ('income', 'expense')", name="transactions_type_check"),
+    ) + ((
+        # Tabla particionada (PostgreSQL, ver app/partitioning.py): la clave de
+        # partición tiene que formar parte de la clave primaria
+        {"postgresql_partition_by": f"{TRANSACTIONS_PARTITION_BY.upper()} ({TRANSACTIONS_PARTITION_KEY})"},
+    ) if TRANSACTIONS_PARTITION_KEY else ())
 
-    transaction_id = Column(Integer, primary_key=True, index=True)
+    transaction_id = Column(Integer, primary_key=True, autoincrement=True)
     amount = Column(Numeric(10, 2), nullable=False)
-    transaction_date = Column(Date, nullable=False, index=True)
+    transaction_date = Column(Date, nullable=False, primary_key=TRANSACTIONS_PARTITION_KEY == "transaction_date")
     description = Column(Text)
     type = Column(String(10), nullable=False)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    updated_at = Column(TIMESTAMP(timezone=True), default=func.now(), onupdate=func.now())
+    # users.data_version de la última escritura sobre la fila (ver crud._bump_data_version)
+    change_version = Column(Integer, nullable=False, server_default="0")
 
-    user_id = Column(Integer, ForeignKey("users.user_id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False,
+                     primary_key=TRANSACTIONS_PARTITION_KEY == "user_id")
     category_id = Column(Integer, ForeignKey(
         "categories.category_id"), nullable=False)
 
     owner = relationship("User", back_populates="transactions")
     category = relationship("Category")
+
+    # Aunque la tabla esté particionada, transaction_id sigue siendo único e
+    # identifica la transacción para el ORM
+    __mapper_args__ = {"primary_key": [transaction_id]}
+
+
+class MonthlyRollup(Base):
+    """
+    Totales mensuales materializados por usuario, categoría y tipo.
+    Se mantienen con actualizaciones incrementales desde crud.py.
+    """
+    __tablename__ = "monthly_rollups"
+    __table_args__ = (
+        CheckConstraint("type IN ('income', 'expense')", name="monthly_rollups_type_check"),
+    )
+
+    user_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True)
+    year_month = Column(String(7), primary_key=True)  # Formato 'YYYY-MM'
+    category_id = Column(Integer, ForeignKey("categories.category_id"), primary_key=True)
+    type = Column(String(10), primary_key=True)
+    total = Column(Numeric(14, 2), nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class ArchivedMonthlyTotal(Base):
+    """
+    Totales mensuales de las transacciones archivadas (años cerrados), con el
+    mismo formato que monthly_rollups. Los escribe crud.archive_transactions
+    al borrar las transacciones, y el resumen los suma a los de las vivas.
+    """
+    __tablename__ = "archived_monthly_totals"
+    __table_args__ = (
+        CheckConstraint("type IN ('income', 'expense')", name="archived_monthly_totals_type_check"),
+    )
+
+    user_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True)
+    year_month = Column(String(7), primary_key=True)  # Formato 'YYYY-MM'
+    category_id = Column(Integer, ForeignKey("categories.category_id"), primary_key=True)
+    type = Column(String(10), primary_key=True)
+    total = Column(Numeric(14, 2), nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class TransactionTombstone(Base):
+    """
+    Transacciones borradas, para que GET /transactions/changes pueda informar
+    de los borrados. Se escriben en la misma transacción que el DELETE.
+    """
+    __tablename__ = "transaction_tombstones"
+    __table_args__ = (
+        Index("idx_transaction_tombstones_user_change", "user_id", "change_version"),
+    )
+
+    # Sin autoincremento: es el ID de la transacción borrada. La clave incluye al
+    # usuario porque SQLite puede reutilizar el ID para otro usuario
+    transaction_id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True)
+    change_version = Column(Integer, nullable=False)
+    deleted_at = Column(TIMESTAMP(timezone=True), default=func.now())
@@ -0,0 +1,199 @@
+"""
+Particionado opcional de la tabla 'transactions' en PostgreSQL.
+
+Con TRANSACTIONS_PARTITION_BY (ver database.py) la migración 0005 convierte la
+tabla en una tabla particionada:
+
+- "range": una partición por año de transaction_date (transactions_y2025...)
+  y otra por defecto (transactions_default) para las fechas sin partición.
+  Las consultas de un intervalo de fechas solo leen los años que tocan, y
+  archivar un año cerrado es borrar su partición (crud.archive_transactions).
+- "hash": TRANSACTIONS_HASH_PARTITIONS particiones por user_id
+  (transactions_h00...), con índices y VACUUM más pequeños por partición.
+
+La clave primaria pasa a ser (transaction_id, clave de partición), porque
+PostgreSQL exige que incluya la clave de partición; transaction_id sigue
+saliendo de la misma secuencia y el ORM identifica las transacciones solo
+por él (models.Transaction). En SQLite la tabla no se particiona.
+"""
+import re
+from datetime import date
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.database import PARTITION_KEYS
+
+DEFAULT_PARTITION = "transactions_default"
+# Tabla de paso durante la conversión (la original renombrada)
+_OLD_TABLE = "transactions_old"
+_PARTITION_NAME_RE = re.compile(r"transactions_(y(?P<year>\d{4})|h\d+|default)")
+
+
+def is_partition_name(name: str) -> bool:
+    """Indica si 'name' es el nombre de una partición de 'transactions' (ver migrations/env.py)."""
+    return _PARTITION_NAME_RE.fullmatch(name) is not None
+
+
+def year_partition_name(year: int) -> str:
+    return f"transactions_y{year}"
+
+
+def partition_method(connection: Connection) -> Optional[str]:
+    """'range' o 'hash' según cómo esté particionada la tabla en la base de datos, o None."""
+    if connection.dialect.name != "postgresql":
+        return None
+    strategy = connection.execute(text(
+        "SELECT partstrat FROM pg_partitioned_table WHERE partrelid = to_regclass('transactions')"
+    )).scalar()
+    return {"r": "range", "h": "hash"}.get(strategy)
+
+
+def year_partitions(connection: Connection) -> Dict[int, str]:
+    """Particiones anuales de 'transactions': {año: nombre}."""
+    names = connection.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass('transactions')"
+    )).scalars()
+    years = {}
+    for name in names:
+        match = _PARTITION_NAME_RE.fullmatch(name)
+        if match is not None and match["year"]:
+            years[int(match["year"])] = name
+    return years
+
+
+def _year_bounds(year: int) -> str:
+    return f"transaction_date >= DATE '{year}-01-01' AND transaction_date < DATE '{year + 1}-01-01'"
+
+
+def create_year_partition(connection: Connection, year: int) -> bool:
+    """
+    Crea la partición de un año si no existe. Las filas de ese año que hubiera
+    en la partición por defecto se mueven a la nueva (PostgreSQL no permite
+    crearla mientras la partición por defecto tenga filas de su intervalo).
+
+    Returns:
+        bool: True si se ha creado.
+    """
+    name = year_partition_name(year)
+    if connection.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+        return False
+    has_default = connection.execute(text("SELECT to_regclass(:name)"), {"name": DEFAULT_PARTITION}).scalar()
+    if has_default:
+        connection.execute(text(
+            f"CREATE TEMPORARY TABLE transactions_moving AS "
+            f"SELECT * FROM {DEFAULT_PARTITION} WHERE {_year_bounds(year)}"
+        ))
+        connection.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {_year_bounds(year)}"))
+    connection.execute(text(
+        f"CREATE TABLE {name} PARTITION OF transactions "
+        f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+    ))
+    if has_default:
+        connection.execute(text("INSERT INTO transactions SELECT * FROM transactions_moving"))
+        connection.execute(text("DROP TABLE transactions_moving"))
+    return True
+
+
+def ensure_year_partitions(connection: Connection, years_ahead: int = 1) -> List[str]:
+    """
+    Crea las particiones que falten del año en curso, de los 'years_ahead'
+    siguientes y de los años que tengan filas en la partición por defecto, para
+    que esta se quede pequeña (pensado para un cron, ver
+    'python -m app.cli partitions-ensure').
+
+    Returns:
+        list[str]: Los nombres de las particiones creadas.
+    """
+    current = date.today().year
+    years = set(range(current, current + years_ahead + 1))
+    if connection.execute(text("SELECT to_regclass(:name)"), {"name": DEFAULT_PARTITION}).scalar():
+        years |= set(connection.execute(text(
+            f"SELECT DISTINCT CAST(EXTRACT(YEAR FROM transaction_date) AS integer) FROM {DEFAULT_PARTITION}"
+        )).scalars())
+    return [year_partition_name(year) for year in sorted(years) if create_year_partition(connection, year)]
+
+
+def drop_year_partitions(connection: Connection, before_year: int) -> List[str]:
+    """Borra las particiones anuales anteriores a 'before_year' con todas sus filas."""
+    dropped = []
+    for year, name in sorted(year_partitions(connection).items()):
+        if year < before_year:
+            connection.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+    return dropped
+
+
+def _rebuild_table(connection: Connection, partition_clause: str, primary_key: str, create_partitions):
+    """
+    Sustituye 'transactions' por una tabla nueva con el mismo esquema: renombra
+    la actual, crea la nueva con sus columnas, valores por defecto y CHECK,
+    copia las filas y vuelve a crear la clave primaria, las claves ajenas y los
+    índices (incluido el de búsqueda de texto) a partir de los de la original.
+    La secuencia de transaction_id pasa a la nueva tabla.
+    """
+    connection.execute(text(f"ALTER TABLE transactions RENAME TO {_OLD_TABLE}"))
+    sequence = connection.execute(text(f"SELECT pg_get_serial_sequence('{_OLD_TABLE}', 'transaction_id')")).scalar()
+    foreign_keys = connection.execute(text(
+        f"SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        f"WHERE conrelid = '{_OLD_TABLE}'::regclass AND contype = 'f' ORDER BY conname"
+    )).all()
+    indexes = connection.execute(text(
+        f"SELECT pg_get_indexdef(indexrelid) FROM pg_index "
+        f"WHERE indrelid = '{_OLD_TABLE}'::regclass AND NOT indisprimary ORDER BY indexrelid"
+    )).scalars().all()
+
+    connection.execute(text(
+        f"CREATE TABLE transactions (LIKE {_OLD_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS){partition_clause}"
+    ))
+    create_partitions()
+    # LIKE conserva el orden de las columnas
+    connection.execute(text(f"INSERT INTO transactions SELECT * FROM {_OLD_TABLE}"))
+    if sequence:
+        connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY transactions.transaction_id"))
+    connection.execute(text(f"DROP TABLE {_OLD_TABLE}"))
+
+    # Los nombres de los índices y restricciones quedan libres al borrar la original
+    connection.execute(text(f"ALTER TABLE transactions ADD CONSTRAINT transactions_pkey PRIMARY KEY ({primary_key})"))
+    for name, definition in foreign_keys:
+        connection.execute(text(f"ALTER TABLE transactions ADD CONSTRAINT {name} {definition}"))
+    for definition in indexes:
+        connection.execute(text(re.sub(r" ON (ONLY )?\S+ USING ", " ON transactions USING ", definition, count=1)))
+    connection.execute(text("ANALYZE transactions"))
+
+
+def partition_transactions(connection: Connection, method: str, hash_partitions: int = 16):
+    """
+    Convierte 'transactions' en una tabla particionada por 'method' ("range" o
+    "hash"), conservando las filas. Con "range" crea una partición por cada año
+    con transacciones, las del año en curso y el siguiente, y la partición por
+    defecto. Reescribe la tabla entera: conviene hacerlo en una ventana de
+    mantenimiento.
+    """
+    key = PARTITION_KEYS[method]
+
+    def create_partitions():
+        if method == "hash":
+            for remainder in range(hash_partitions):
+                connection.execute(text(
+                    f"CREATE TABLE transactions_h{remainder:02d} PARTITION OF transactions "
+                    f"FOR VALUES WITH (MODULUS {hash_partitions}, REMAINDER {remainder})"
+                ))
+            return
+        connection.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF transactions DEFAULT"))
+        years = set(connection.execute(text(
+            f"SELECT DISTINCT CAST(EXTRACT(YEAR FROM transaction_date) AS integer) FROM {_OLD_TABLE}"
+        )).scalars())
+        years |= {date.today().year, date.today().year + 1}
+        for year in sorted(years):
+            create_year_partition(connection, year)
+
+    _rebuild_table(connection, f" PARTITION BY {method.upper()} ({key})",
+                   f"transaction_id, {key}", create_partitions)
+
+
+def unpartition_transactions(connection: Connection):
+    """Convierte de nuevo 'transactions' en una tabla normal, conservando las filas."""
+    _rebuild_table(connection, "", "transaction_id", lambda: None)
@@ -0,0 +1,82 @@
+import bisect
+import threading
+import time
+
+from sqlalchemy import exc
+
+# Límites superiores (en segundos) de los buckets del histograma de espera
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class PoolMetrics:
+    """
+    Telemetría de un pool de conexiones: histograma del tiempo de espera para
+    obtener una conexión, timeouts y estado actual (en uso, overflow).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self._lock = threading.Lock()
+        self._bucket_counts = [0] * (len(WAIT_BUCKETS) + 1)  # El último es +Inf
+        self._wait_sum = 0.0
+        self._wait_count = 0
+        self._timeouts = 0
+
+    def observe_wait(self, seconds: float):
+        with self._lock:
+            self._bucket_counts[bisect.bisect_left(WAIT_BUCKETS, seconds)] += 1
+            self._wait_sum += seconds
+            self._wait_count += 1
+
+    def observe_timeout(self):
+        with self._lock:
+            self._timeouts += 1
+
+    def snapshot(self) -> dict:
+        """Estado actual del pool y contadores acumulados desde el arranque."""
+        with self._lock:
+            cumulative, buckets = 0, {}
+            for bound, count in zip(WAIT_BUCKETS + (float("inf"),), self._bucket_counts):
+                cumulative += count
+                buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+            data = {
+                "pool": self.name,
+                "wait_seconds": {"buckets": buckets, "sum": self._wait_sum, "count": self._wait_count},
+                "timeouts": self._timeouts,
+            }
+
+        pool = self.pool
+        data["pool_class"] = type(pool).__name__ if pool is not None else None
+        # No todos los pools (NullPool, StaticPool...) exponen estos contadores
+        for key, attr in (("size", "size"), ("checked_out", "checkedout"),
+                          ("checked_in", "checkedin"), ("overflow", "overflow")):
+            getter = getattr(pool, attr, None)
+            data[key] = getter() if callable(getter) else None
+        return data
+
+
+def instrumented_pool_class(pool_class: type, metrics: PoolMetrics) -> type:
+    """
+    Devuelve una subclase de 'pool_class' que mide cuánto espera cada petición
+    hasta obtener una conexión y registra los timeouts en 'metrics'.
+    """
+
+    class InstrumentedPool(pool_class):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            metrics.pool = self  # También al recrearse el pool (p. ej. tras un dispose)
+
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except exc.TimeoutError:
+                metrics.observe_timeout()
+                raise
+            metrics.observe_wait(time.perf_counter() - start)
+            return connection
+
+    InstrumentedPool.__name__ = pool_class.__name__
+    InstrumentedPool.__qualname__ = pool_class.__qualname__
+    return InstrumentedPool
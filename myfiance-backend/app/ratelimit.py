@@ -0,0 +1,222 @@
+import math
+import os
+import threading
+import time
+
+from fastapi import Depends, HTTPException, Request, status
+from starlette.concurrency import run_in_threadpool
+
+from app import schemas
+
+try:
+    import redis
+except ImportError:  # redis es opcional: solo hace falta con RATE_LIMIT_REDIS_URL
+    redis = None
+
+# --- Configuración ---
+# Límites por router con el formato "N/periodo" (second, minute u hour): cubo de N
+# peticiones que se rellena a N por periodo. "0" u "off" desactiva el límite.
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+RATE_LIMIT_AUTH = os.getenv("RATE_LIMIT_AUTH", "10/minute")
+RATE_LIMIT_TRANSACTIONS = os.getenv("RATE_LIMIT_TRANSACTIONS", "600/minute")
+RATE_LIMIT_ANALYTICS = os.getenv("RATE_LIMIT_ANALYTICS", "120/minute")
+# Claves (IPs o usuarios) que se mantienen en memoria como mucho
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+# Con una URL de Redis, los cubos se comparten entre workers y servidores
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL")
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+
+
+def parse_limit(value: str):
+    """
+    Convierte "N/periodo" en (peticiones por segundo, tamaño del cubo), o None
+    si el límite está desactivado. Lanza ValueError si el formato no es válido.
+    """
+    value = value.strip().lower()
+    if value in ("", "0", "off"):
+        return None
+    count, _, period = value.partition("/")
+    if period not in PERIODS or int(count) < 0:
+        raise ValueError(f"Límite no válido: '{value}' (formato 'N/second', 'N/minute' o 'N/hour')")
+    if int(count) == 0:
+        return None
+    return int(count) / PERIODS[period], int(count)
+
+
+class MemoryBackend:
+    """
+    Cubos de tokens en la memoria del proceso (cada worker lleva su cuenta).
+
+    Cada cubo es [tokens, última actualización, momento en que vuelve a estar
+    lleno]. En lugar de un lock global, la clave elige uno de varios locks, así
+    que las peticiones de claves distintas casi nunca se esperan entre sí.
+    """
+    blocking = False  # take() no hace E/S: se puede llamar desde el bucle de eventos
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS, stripes: int = 64):
+        self.max_keys = max_keys
+        self._buckets = {}
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._prune_lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: int) -> float:
+        """Consume un token. Devuelve 0 si había, o los segundos hasta que lo haya."""
+        now = time.monotonic()
+        with self._locks[hash(key) % len(self._locks)]:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._prune(now)
+                tokens = float(burst)
+            else:
+                tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            if not wait:
+                tokens -= 1
+            self._buckets[key] = [tokens, now, now + (burst - tokens) / rate]
+        return wait
+
+    def _prune(self, now: float):
+        """
+        Descarta los cubos que ya se han rellenado (equivalen a uno nuevo) y, si
+        aun así no hay sitio, los más antiguos. Un cubo descartado mientras otra
+        petición lo usa como mucho pierde un token a favor del cliente.
+        """
+        if not self._prune_lock.acquire(blocking=False):
+            return  # Otro hilo ya está limpiando
+        try:
+            for key in [k for k, bucket in list(self._buckets.items()) if bucket[2] <= now]:
+                self._buckets.pop(key, None)
+            excess = len(self._buckets) - self.max_keys + 1
+            for key in list(self._buckets)[:max(0, excess)]:
+                self._buckets.pop(key, None)
+        finally:
+            self._prune_lock.release()
+
+
+class RedisBackend:
+    """
+    Cubos de tokens en Redis, compartidos entre workers y servidores. Cada
+    consulta es un script Lua atómico que usa el reloj de Redis, así que no
+    depende de que los relojes de los servidores estén sincronizados.
+    """
+    blocking = True  # Hace E/S de red: se llama desde el threadpool
+
+    SCRIPT = """
+    local rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+    local clock = redis.call('TIME')
+    local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or burst
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+    local wait = 0
+    if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate * 1000) + 1000)
+    return tostring(wait)
+    """
+
+    def __init__(self, client, prefix: str = "ratelimit:"):
+        self.prefix = prefix
+        self._script = client.register_script(self.SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBackend":
+        if redis is None:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL requiere el paquete 'redis' (pip install redis).")
+        return cls(redis.Redis.from_url(url))
+
+    def take(self, key: str, rate: float, burst: int) -> float:
+        return float(self._script(keys=[self.prefix + key], args=[rate, burst]))
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Backend configurado (Redis si hay RATE_LIMIT_REDIS_URL, si no en memoria), creado en el primer uso."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = RedisBackend.from_url(RATE_LIMIT_REDIS_URL) if RATE_LIMIT_REDIS_URL else MemoryBackend()
+    return _backend
+
+
+def set_backend(backend):
+    """
+    Sustituye el backend de todos los límites. Cualquier objeto con
+    take(key, rate, burst) -> segundos de espera y un atributo 'blocking'
+    sirve (ver MemoryBackend y RedisBackend).
+    """
+    global _backend
+    _backend = backend
+
+
+class RateLimit:
+    """Límite con nombre (uno por router): sus cubos se identifican como 'nombre:clave'."""
+
+    def __init__(self, name: str, limit: str):
+        self.name = name
+        self.limit = limit
+        parsed = parse_limit(limit) if RATE_LIMIT_ENABLED else None
+        self.rate, self.burst = parsed if parsed is not None else (None, None)
+        self.rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate is not None
+
+    async def hit(self, key):
+        """Consume un token del cubo de 'key' o lanza 429 con Retry-After."""
+        if not self.enabled:
+            return
+        backend = get_backend()
+        bucket = f"{self.name}:{key}"
+        if backend.blocking:
+            wait = await run_in_threadpool(backend.take, bucket, self.rate, self.burst)
+        else:
+            wait = backend.take(bucket, self.rate, self.burst)
+        if wait:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Demasiadas peticiones. Inténtalo de nuevo más tarde.",
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+
+
+def client_ip(request: Request) -> str:
+    """
+    IP del cliente. Detrás de un proxy, uvicorn la toma de X-Forwarded-For
+    con --proxy-headers (solo de las IPs de --forwarded-allow-ips).
+    """
+    return request.client.host if request.client is not None else "unknown"
+
+
+def by_ip(limit: RateLimit):
+    """Dependencia que aplica 'limit' por IP (rutas sin autenticar, como el login)."""
+    async def rate_limit_by_ip(request: Request):
+        await limit.hit(client_ip(request))
+    return rate_limit_by_ip
+
+
+def by_user(limit: RateLimit, current_user_dependency):
+    """
+    Dependencia que aplica 'limit' por usuario. Recibe la dependencia de
+    autenticación del router (síncrona o asíncrona) para que FastAPI la
+    resuelva una sola vez por petición.
+    """
+    async def rate_limit_by_user(current_user: schemas.AuthenticatedUser = Depends(current_user_dependency)):
+        await limit.hit(current_user.user_id)
+    return rate_limit_by_user
+
+
+# --- Límites de cada router (ver main.py) ---
+auth_limit = RateLimit("auth", RATE_LIMIT_AUTH)
+transactions_limit = RateLimit("transactions", RATE_LIMIT_TRANSACTIONS)
+analytics_limit = RateLimit("analytics", RATE_LIMIT_ANALYTICS)
+LIMITS = (auth_limit, transactions_limit, analytics_limit)
@@ -0,0 +1,47 @@
+import json
+import time
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from app.instrumentation import record_serialization
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa el módulo json estándar
+    orjson = None
+
+
+class TimedJSONResponse(JSONResponse):
+    """
+    JSONResponse que anota el tiempo de codificación del cuerpo en las métricas
+    de la petición (ver app.instrumentation). Es la clase de respuesta por defecto
+    de la aplicación; produce los mismos bytes que JSONResponse.
+    """
+
+    def render(self, content: Any) -> bytes:
+        start = time.perf_counter()
+        try:
+            return self._encode(content)
+        finally:
+            record_serialization(time.perf_counter() - start)
+
+    def _encode(self, content: Any) -> bytes:
+        return super().render(content)
+
+
+class FastJSONResponse(TimedJSONResponse):
+    """
+    Respuesta JSON para contenido ya preparado (dicts, listas, str, int...).
+
+    Se usa en los endpoints que construyen la respuesta a partir de tuplas de
+    columnas sin pasar por modelos Pydantic. Produce los mismos bytes que la
+    serialización por defecto de FastAPI (UTF-8 sin escapar y separadores
+    compactos), pero con orjson si está instalado.
+    """
+
+    def _encode(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return json.dumps(content, ensure_ascii=False, allow_nan=False,
+                          indent=None, separators=(",", ":")).encode("utf-8")
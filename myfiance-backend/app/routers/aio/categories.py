@@ -0,0 +1,25 @@
+from typing import List
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import schemas
+from app.category_cache import category_cache
+from app.database import get_async_read_db
+from app.routers.categories import categories_response
+
+# Versión asíncrona de app.routers.categories (modo DATABASE_ASYNC)
+router = APIRouter(
+    prefix="/categories",
+    tags=["Categories"],
+    include_in_schema=False  # La documentación es la del router síncrono equivalente
+)
+
+@router.get("/", response_model=List[schemas.CategoryRead])
+async def read_categories(request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    """
+    Obtiene la lista de todas las categorías disponibles desde la caché del proceso.
+    """
+    if category_cache.is_stale:
+        await db.run_sync(category_cache.ensure_loaded)
+    body, etag = category_cache.snapshot()
+    return categories_response(request, body, etag)
@@ -0,0 +1,25 @@
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import auth, schemas
+from app.database import async_read_session, get_async_db
+
+
+async def get_current_user(token: str = Depends(auth.oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    """
+    Equivalente asíncrono de auth.get_current_user para el modo DATABASE_ASYNC.
+    Comparte con él la caché de tokens validados.
+    """
+    cached_user = auth.user_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+    payload = auth.decode_token(token)
+    return await db.run_sync(auth.load_authenticated_user, token, payload)
+
+
+async def get_read_db(current_user: schemas.AuthenticatedUser = Depends(get_current_user)):
+    """
+    Equivalente asíncrono de auth.get_read_db para el modo DATABASE_ASYNC.
+    """
+    async with async_read_session(current_user.user_id) as db:
+        yield db
@@ -0,0 +1,207 @@
+from datetime import date
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import conditional, crud_async, schemas
+from app.database import get_async_db
+from app.responses import FastJSONResponse
+from app.routers.aio.dependencies import get_current_user, get_read_db
+from app.routers.transactions import (DEFAULT_PAGE_SIZE, MAX_BATCH_OPERATIONS, MAX_BULK_ITEMS, MAX_CHANGES,
+                                      MAX_PAGE_SIZE, MAX_SEARCH_QUERY_LENGTH, batch_result_to_dict,
+                                      changes_to_dict, decode_cursor, encode_cursor,
+                                      transaction_rows_to_dicts)
+
+# Versión asíncrona de app.routers.transactions (modo DATABASE_ASYNC).
+# La importación CSV y la exportación siguen sirviéndose desde el router síncrono.
+router = APIRouter(
+    prefix="/transactions",
+    tags=["Transactions"],
+    dependencies=[Depends(get_current_user)],  # Protege todas las rutas de este router
+    include_in_schema=False  # La documentación es la del router síncrono equivalente
+)
+
+@router.post("/", response_model=schemas.TransactionRead)
+async def create_transaction(
+    transaction: schemas.TransactionCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.AuthenticatedUser = Depends(get_current_user)
+):
+    """
+    Crea una nueva transacción para el usuario autenticado.
+    """
+    return await crud_async.create_user_transaction(db, transaction=transaction, user_id=current_user.user_id)
+
+@router.post("/bulk", response_model=schemas.BulkImportResult)
+async def bulk_create_transactions(
+    rows: List[Dict[str, Any]],
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.AuthenticatedUser = Depends(get_current_user)
+):
+    """
+    Crea varias transacciones a partir de un array JSON de objetos con los campos
+    de TransactionCreate.
+    """
+    if len(rows) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"Máximo {MAX_BULK_ITEMS} transacciones por petición. Usa /transactions/import para ficheros grandes.")
+    return await crud_async.bulk_create_user_transactions(db, rows=rows, user_id=current_user.user_id)
+
+@router.post("/batch", response_model=schemas.BatchResult)
+async def batch_transactions(
+    operations: List[schemas.BatchOperation],
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.AuthenticatedUser = Depends(get_current_user)
+):
+    """
+    Aplica una lista de operaciones (create, update, delete) en una única
+    transacción de base de datos.
+    """
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"Máximo {MAX_BATCH_OPERATIONS} operaciones por petición.")
+    result = await crud_async.apply_transaction_batch(db, operations=operations, user_id=current_user.user_id)
+    return FastJSONResponse(await db.run_sync(batch_result_to_dict, result))
+
+@router.get("/", response_model=List[schemas.TransactionRead])
+async def read_transactions(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    type: Optional[schemas.TransactionType] = None,
+    category_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: schemas.AuthenticatedUser = Depends(get_current_user)
+):
+    """
+    Obtiene una página de transacciones del usuario autenticado, de la más reciente
+    a la más antigua. Si hay más resultados, el cursor de la siguiente página se
+    devuelve en la cabecera 'X-Next-Cursor'. Responde 304 si los datos no han
+    cambiado desde la copia del cliente (ETag / Last-Modified).
+    """
+    validators = conditional.validators(
+        current_user.user_id, *await crud_async.get_data_version(db, current_user.user_id)
+    )
+    if conditional.is_not_modified(request, validators):
+        return conditional.not_modified(validators)
+
+    after = decode_cursor(cursor) if cursor else None
+    rows = await crud_async.get_transactions_by_user(
+        db,
+        user_id=current_user.user_id,
+        limit=limit + 1,  # Una fila extra para saber si hay página siguiente
+        after=after,
+        date_from=date_from,
+        date_to=date_to,
+        type=type,
+        category_id=category_id,
+        as_rows=True
+    )
+    headers = dict(validators)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1])
+    return FastJSONResponse(await db.run_sync(transaction_rows_to_dicts, rows), headers=headers)
+
+@router.get("/changes", response_model=schemas.TransactionChanges)
+async def read_transaction_changes(
+    since: Optional[int] = Query(None, ge=0),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: schemas.AuthenticatedUser = Depends(get_current_user)
+):
+    """
+    Devuelve los cambios en las transacciones desde el cursor 'since'
+    (ver el endpoint síncrono equivalente).
+    """
+    changes = await crud_async.get_transaction_changes(db, user_id=current_user.user_id, since=since,
+                                                       max_changes=MAX_CHANGES)
+    return FastJSONResponse(await db.run_sync(changes_to_dict, changes))
+
+@router.get("/search", response_model=List[schemas.TransactionRead])
+async def search_transactions(
+    q: str = Query(..., min_length=1, max_length=MAX_SEARCH_QUERY_LENGTH),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    type: Optional[schemas.TransactionType] = None,
+    category_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: schemas.AuthenticatedUser = Depends(get_current_user)
+):
+    """
+    Busca en las descripciones de las transacciones del usuario autenticado,
+    por relevancia. El offset de la siguiente página va en 'X-Next-Offset'.
+    """
+    rows = await crud_async.search_transactions(
+        db,
+        user_id=current_user.user_id,
+        query=q,
+        limit=limit + 1,  # Una fila extra para saber si hay página siguiente
+        offset=offset,
+        date_from=date_from,
+        date_to=date_to,
+        type=type,
+        category_id=category_id
+    )
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Offset"] = str(offset + limit)
+    return FastJSONResponse(await db.run_sync(transaction_rows_to_dicts, rows), headers=headers)
+
+@router.get("/summary", response_model=schemas.TransactionSummary)
+async def read_transaction_summary(
+    request: Request,
+    response: Response,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: schemas.AuthenticatedUser = Depends(get_current_user)
+):
+    """
+    Obtiene el balance, los totales mensuales y los totales por categoría
+    del usuario autenticado, calculados en la base de datos.
+    Admite peticiones condicionales, como el listado.
+    """
+    validators = conditional.validators(
+        current_user.user_id, *await crud_async.get_data_version(db, current_user.user_id)
+    )
+    if conditional.is_not_modified(request, validators):
+        return conditional.not_modified(validators)
+    response.headers.update(validators)
+    return await crud_async.get_transaction_summary(
+        db, user_id=current_user.user_id, date_from=date_from, date_to=date_to
+    )
+
+@router.delete("/{transaction_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_transaction_endpoint(
+    transaction_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.AuthenticatedUser = Depends(get_current_user)
+):
+    """
+    Elimina una transacción del usuario autenticado
+    """
+    await crud_async.delete_transaction(db, transaction_id=transaction_id, user_id=current_user.user_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.put("/{transaction_id}", response_model=schemas.TransactionRead)
+async def update_transaction_endpoint(
+    transaction_id: int,
+    transaction_data: schemas.TransactionCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.AuthenticatedUser = Depends(get_current_user)
+):
+    """
+    Actualiza una transacción existente del usuario autenticado.
+    """
+    row = await crud_async.update_transaction(
+        db,
+        transaction_id=transaction_id,
+        transaction_data=transaction_data,
+        user_id=current_user.user_id
+    )
+    return FastJSONResponse((await db.run_sync(transaction_rows_to_dicts, [row]))[0])
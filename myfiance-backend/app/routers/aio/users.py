@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import auth, crud_async, demo, schemas
+from app.database import get_async_db
+
+# Versión asíncrona de app.routers.users (modo DATABASE_ASYNC)
+router = APIRouter(
+    prefix="/users",
+    tags=["Users"],
+    include_in_schema=False  # La documentación es la del router síncrono equivalente
+)
+
+@router.post("/register", response_model=schemas.UserRead, status_code=status.HTTP_201_CREATED)
+async def create_user_endpoint(user: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    """
+    Crea un nuevo usuario. El hash de la contraseña se calcula en el pool de
+    hashing sin bloquear el event loop.
+    """
+    db_user = await crud_async.get_user_by_email(db, email=user.email)
+    if db_user:
+        raise HTTPException(status_code=400, detail="El email ya está registrado")
+
+    hashed_password = await auth.get_password_hash_async(user.password)
+
+    return await crud_async.create_user(db, user=user, hashed_password=hashed_password)
+
+
+@router.post("/token", response_model=schemas.Token)
+async def login_for_access_token_endpoint(
+    db: AsyncSession = Depends(get_async_db), form_data: OAuth2PasswordRequestForm = Depends()
+):
+    """
+    Autentica a un usuario y devuelve un token de acceso JWT.
+    Los datos de 'demo@example.com' se reinician como mucho una vez cada
+    DEMO_RESET_INTERVAL_SECONDS (ver app.demo).
+    """
+    user = await crud_async.get_user_by_email(db, email=form_data.username)
+    is_demo = form_data.username == demo.DEMO_EMAIL
+
+    if is_demo and not user:
+        hashed_password = await auth.get_password_hash_async(demo.DEMO_PASSWORD)
+        demo_user_schema = schemas.UserCreate(email=demo.DEMO_EMAIL, password=demo.DEMO_PASSWORD)
+        user = await crud_async.get_or_create_user(db, user=demo_user_schema, hashed_password=hashed_password)
+
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Email o contraseña incorrectos",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    is_valid, new_hash = await auth.verify_and_update_password_async(form_data.password, user.password_hash)
+
+    # Si la contraseña de la demo se ha cambiado, se restaura (solo entonces se hashea de nuevo)
+    if not is_valid and is_demo and form_data.password == demo.DEMO_PASSWORD:
+        is_valid, new_hash = True, await auth.get_password_hash_async(demo.DEMO_PASSWORD)
+
+    if not is_valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Email o contraseña incorrectos",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # Si el hash usa un coste o esquema obsoleto, se guarda el nuevo
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+        auth.invalidate_user_cache(user.user_id)
+
+    if is_demo and demo.demo_reset.is_due():
+        await db.run_sync(demo.demo_reset.maybe_reset, user.user_id)
+
+    access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = auth.create_access_token(
+        data={"sub": user.email, "uid": user.user_id}, expires_delta=access_token_expires
+    )
+
+    return {"access_token": access_token, "token_type": "bearer"}
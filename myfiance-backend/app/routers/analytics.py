@@ -0,0 +1,160 @@
+from datetime import date, timedelta
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app import schemas, auth
+from app.category_cache import category_cache
+from app.responses import FastJSONResponse
+
+# app.analytics (y NumPy) se importa dentro de cada endpoint y no aquí: así
+# no se carga al arrancar, sino con la primera petición de analítica.
+
+router = APIRouter(
+    prefix="/analytics",
+    tags=["Analytics"],
+    dependencies=[Depends(auth.get_current_user)] # Protege todas las rutas de este router
+)
+
+# --- Límites ---
+DEFAULT_ROLLING_DAYS = 90
+MAX_ROLLING_DAYS = 731
+MAX_WINDOW_DAYS = 365
+MAX_HORIZON_DAYS = 365
+
+
+def _category_name(db: Session, category_id: int) -> str:
+    category = category_cache.resolve_dict(db, int(category_id))
+    return category["category_name"] if category is not None else ""
+
+
+def recurring_to_dicts(db: Session, arrays, recurring) -> List[dict]:
+    """Convierte las entradas de analytics.detect_recurring al formato de schemas.RecurringTransaction."""
+    from app import analytics
+
+    result = []
+    for item in recurring:
+        description, category_id, type_ = analytics.describe_group(arrays, item["key"])
+        result.append({
+            "description": description,
+            "category_id": category_id,
+            "category_name": _category_name(db, category_id),
+            "type": type_,
+            "period": item["period"],
+            "interval_days": item["interval_days"],
+            "occurrences": item["occurrences"],
+            "average_amount": analytics.format_cents(item["average_cents"]),
+            "last_date": analytics.to_date(item["last_day"]).isoformat(),
+            "next_date": analytics.to_date(item["next_day"]).isoformat(),
+        })
+    return result
+
+
+@router.get("/balance", response_model=List[schemas.BalancePoint])
+def read_running_balance(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: Session = Depends(auth.get_read_db),
+    current_user: schemas.AuthenticatedUser = Depends(auth.get_current_user)
+):
+    """
+    Obtiene el saldo acumulado al final de cada día con transacciones del usuario
+    autenticado. El saldo incluye las transacciones anteriores a 'date_from'.
+    """
+    from app import analytics
+
+    arrays = analytics.load(db, current_user.user_id)
+    days, balance = analytics.running_balance(
+        arrays,
+        start_day=analytics.to_day(date_from) if date_from else None,
+        end_day=analytics.to_day(date_to) if date_to else None,
+    )
+    return FastJSONResponse([
+        {"date": analytics.to_date(day).isoformat(), "balance": analytics.format_cents(cents)}
+        for day, cents in zip(days.tolist(), balance.tolist())
+    ])
+
+
+@router.get("/rolling-spend", response_model=schemas.RollingSpend)
+def read_rolling_spend(
+    window_days: int = Query(30, ge=1, le=MAX_WINDOW_DAYS),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: Session = Depends(auth.get_read_db),
+    current_user: schemas.AuthenticatedUser = Depends(auth.get_current_user)
+):
+    """
+    Obtiene, por categoría, el gasto de los últimos 'window_days' días (30 por
+    defecto; 90 para la vista trimestral) para cada día entre 'date_from' y
+    'date_to'. Por defecto, los últimos 90 días hasta hoy.
+    """
+    from app import analytics
+
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=DEFAULT_ROLLING_DAYS - 1)
+    if date_from > date_to:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="date_from no puede ser posterior a date_to")
+    if (date_to - date_from).days >= MAX_ROLLING_DAYS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"El intervalo no puede superar {MAX_ROLLING_DAYS} días")
+
+    arrays = analytics.load(db, current_user.user_id)
+    start_day, end_day = analytics.to_day(date_from), analytics.to_day(date_to)
+    category_ids, matrix = analytics.rolling_spend(arrays, window_days, start_day, end_day)
+    return FastJSONResponse({
+        "window_days": window_days,
+        "dates": [analytics.to_date(day).isoformat() for day in range(start_day, end_day + 1)],
+        "categories": [
+            {
+                "category_id": int(category_id),
+                "category_name": _category_name(db, category_id),
+                "values": [analytics.format_cents(cents) for cents in column.tolist()],
+            }
+            for category_id, column in zip(category_ids.tolist(), matrix.T)
+        ],
+    })
+
+
+@router.get("/recurring", response_model=List[schemas.RecurringTransaction])
+def read_recurring_transactions(
+    db: Session = Depends(auth.get_read_db),
+    current_user: schemas.AuthenticatedUser = Depends(auth.get_current_user)
+):
+    """
+    Obtiene las transacciones recurrentes activas del usuario autenticado
+    (suscripciones, nómina, alquiler...), con la fecha prevista de la siguiente.
+    """
+    from app import analytics
+
+    arrays = analytics.load(db, current_user.user_id)
+    recurring = analytics.detect_recurring(arrays, analytics.to_day(date.today()))
+    return FastJSONResponse(recurring_to_dicts(db, arrays, recurring))
+
+
+@router.get("/forecast", response_model=schemas.CashFlowForecast)
+def read_cash_flow_forecast(
+    horizon_days: int = Query(90, ge=1, le=MAX_HORIZON_DAYS),
+    db: Session = Depends(auth.get_read_db),
+    current_user: schemas.AuthenticatedUser = Depends(auth.get_current_user)
+):
+    """
+    Proyecta el saldo del usuario autenticado para los próximos 'horizon_days'
+    días a partir de sus transacciones recurrentes y de la media diaria del
+    resto de movimientos de los últimos 90 días.
+    """
+    from app import analytics
+
+    as_of = date.today()
+    arrays = analytics.load(db, current_user.user_id)
+    forecast = analytics.project_cash_flow(arrays, analytics.to_day(as_of), horizon_days)
+    return FastJSONResponse({
+        "as_of": as_of.isoformat(),
+        "starting_balance": analytics.format_cents(forecast["starting_cents"]),
+        "baseline_daily": analytics.format_cents(forecast["baseline_daily_cents"]),
+        "recurring": recurring_to_dicts(db, arrays, forecast["recurring"]),
+        "projection": [
+            {"date": analytics.to_date(day).isoformat(), "balance": analytics.format_cents(cents)}
+            for day, cents in zip(forecast["days"].tolist(), forecast["balance_cents"].tolist())
+        ],
+    })
@@ -1,18 +1,35 @@
 from typing import List
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response, status
 from sqlalchemy.orm import  Session
 
-from app import crud, schemas
-from ..database import get_db
+from app import schemas
+from app.cache import etag_matches
+from app.category_cache import category_cache
+from ..database import get_read_db
 
 router = APIRouter(
     prefix="/categories",
     tags=["Categories"]
 )
 
+# Las categorías casi nunca cambian: el cliente puede reutilizarlas unos minutos
+CATEGORIES_CACHE_CONTROL = "public, max-age=300"
+
+
+def categories_response(request: Request, body: bytes, etag: str) -> Response:
+    """Respuesta con el JSON precalculado, o 304 si el cliente ya tiene esa versión."""
+    headers = {"ETag": etag, "Cache-Control": CATEGORIES_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.get("/", response_model=List[schemas.CategoryRead])
-def read_categories(db: Session = Depends(get_db)):
+def read_categories(request: Request, db: Session = Depends(get_read_db)):
     """
     Obtiene la lista de todas las categorías disponibles.
+    Se sirve desde la caché del proceso con un ETag; si la cabecera
+    If-None-Match coincide, responde 304 sin cuerpo.
     """
-    return crud.get_categories(db=db)
\ No newline at end of file
+    body, etag = category_cache.serialized(db)
+    return categories_response(request, body, etag)
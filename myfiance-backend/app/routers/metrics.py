@@ -0,0 +1,110 @@
+import ipaddress
+import os
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
+
+from app.database import all_pool_metrics
+from app.hashing import password_hasher
+from app.instrumentation import REQUEST_HISTOGRAMS
+from app.ratelimit import LIMITS
+
+# --- Configuración ---
+# Las métricas exponen el estado interno del servicio. Con METRICS_TOKEN hay que
+# enviar "Authorization: Bearer <token>"; sin él solo se sirven a clientes de la
+# propia máquina (loopback). METRICS_ENABLED=false no registra los endpoints.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+METRICS_TOKEN = os.getenv("METRICS_TOKEN") or None
+
+
+def _is_loopback(host: Optional[str]) -> bool:
+    try:
+        return host is not None and ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def require_metrics_access(request: Request):
+    """Dependencia de los endpoints de métricas: exige el token o un cliente local."""
+    if METRICS_TOKEN is None:
+        if not _is_loopback(request.client.host if request.client else None):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Las métricas solo están disponibles desde la propia máquina",
+            )
+        return
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), METRICS_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token de métricas no válido",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Metrics"],
+    dependencies=[Depends(require_metrics_access)]
+)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _pool_lines(snapshot: dict):
+    """Métricas de un pool de conexiones en formato Prometheus."""
+    labels = f'pool="{snapshot["pool"]}"'
+    wait = snapshot["wait_seconds"]
+    lines = [f'db_pool_wait_seconds_bucket{{{labels},le="{le}"}} {count}'
+             for le, count in wait["buckets"].items()]
+    lines += [f"db_pool_wait_seconds_sum{{{labels}}} {wait['sum']}",
+              f"db_pool_wait_seconds_count{{{labels}}} {wait['count']}",
+              f"db_pool_timeouts_total{{{labels}}} {snapshot['timeouts']}"]
+    for key in ("size", "checked_out", "checked_in", "overflow"):
+        if snapshot[key] is not None:
+            lines.append(f"db_pool_{key}{{{labels}}} {snapshot[key]}")
+    return lines
+
+
+@router.get("", response_class=PlainTextResponse)
+def read_prometheus_metrics():
+    """
+    Métricas del proceso en el formato de texto de Prometheus: histogramas por
+    ruta del tiempo de las peticiones, del tiempo y número de sentencias en la
+    base de datos y de la serialización, el estado de los pools de
+    conexiones y de hashing y las peticiones rechazadas por los límites.
+    """
+    blocks = [histogram.render() for histogram in REQUEST_HISTOGRAMS]
+
+    snapshots = [metrics.snapshot() for metrics in all_pool_metrics()]
+    pool_lines = ["# TYPE db_pool_wait_seconds histogram"]
+    for snapshot in snapshots:
+        pool_lines += _pool_lines(snapshot)
+    blocks.append("\n".join(pool_lines))
+
+    hashing = password_hasher.metrics()
+    blocks.append("\n".join(
+        f"password_hash_{key} {hashing[key]}" for key in ("pending", "queued", "completed", "rejected")
+    ))
+    blocks.append("\n".join(
+        f'rate_limit_rejected_total{{limit="{limit.name}"}} {limit.rejected}' for limit in LIMITS
+    ))
+    return PlainTextResponse("\n".join(blocks) + "\n", media_type=PROMETHEUS_CONTENT_TYPE)
+
+@router.get("/db-pool")
+def read_db_pool_metrics():
+    """
+    Devuelve el estado de los pools de conexiones (en uso, overflow, timeouts)
+    y el histograma acumulado del tiempo de espera para obtener una conexión.
+    """
+    pools = [metrics.snapshot() for metrics in all_pool_metrics()]
+    return {"pools": pools}
+
+@router.get("/password-hashing")
+def read_password_hashing_metrics():
+    """
+    Devuelve el estado del pool de hashing de contraseñas (en curso, en cola y rechazadas).
+    """
+    return password_hasher.metrics()
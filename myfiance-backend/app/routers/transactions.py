@@ -1,9 +1,19 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+import base64
+import codecs
+import csv
+import io
+import json
+from datetime import date
+from enum import Enum
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app import crud, models, schemas, auth
-from app.database import get_db
+from app import conditional, crud, models, schemas, auth
+from app.category_cache import category_cache
+from app.responses import FastJSONResponse
+from app.database import get_db, read_session
 
 router = APIRouter(
     prefix="/transactions",
@@ -11,32 +21,361 @@ router = APIRouter(
     dependencies=[Depends(auth.get_current_user)] # Protege todas las rutas de este router
 )
 
+# --- Paginación ---
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# --- Cambios incrementales ---
+MAX_CHANGES = 1000
+
+# --- Búsqueda ---
+MAX_SEARCH_QUERY_LENGTH = 200
+
+# --- Importación en bloque ---
+MAX_BULK_ITEMS = 10000
+MAX_BATCH_OPERATIONS = 1000
+IMPORT_CSV_COLUMNS = ["amount", "transaction_date", "description", "category_id", "type"]
+
+# --- Exportación ---
+EXPORT_CHUNK_ROWS = 1000
+EXPORT_CSV_COLUMNS = ["transaction_id", "transaction_date", "amount", "description",
+                      "type", "category_id", "category_name"]
+
+
+class ExportFormat(str, Enum):
+    """Formatos disponibles para la exportación de transacciones."""
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+def encode_cursor(transaction) -> str:
+    """Codifica la clave (fecha, id) de una transacción como cursor opaco."""
+    raw = f"{transaction.transaction_date.isoformat()}|{transaction.transaction_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    """Decodifica un cursor generado por encode_cursor. Lanza 400 si no es válido."""
+    try:
+        raw_date, raw_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return date.fromisoformat(raw_date), int(raw_id)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Cursor de paginación no válido")
+
+
+def check_utf8(file, chunk_size: int = 64 * 1024):
+    """
+    Comprueba que el fichero subido está en UTF-8 antes de importarlo: la
+    importación confirma lote a lote, y un error de codificación a mitad del
+    fichero dejaría importada solo una parte. Lanza 400 si no lo está y deja
+    el fichero al principio.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    offset = 0
+    try:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            decoder.decode(chunk)
+            offset += len(chunk)
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"El fichero no está en UTF-8 (byte no válido en la posición {offset + exc.start})")
+    finally:
+        file.seek(0)
+
+
+def transaction_rows_to_dicts(db: Session, rows) -> List[dict]:
+    """
+    Convierte las tuplas de columnas del listado en dicts con el mismo formato
+    que schemas.TransactionRead (importe como cadena decimal, fecha ISO), resolviendo
+    la categoría desde la caché de categorías, sin JOIN ni modelos Pydantic.
+    """
+    return [
+        {
+            "transaction_id": row.transaction_id,
+            "amount": str(row.amount),
+            "transaction_date": row.transaction_date.isoformat(),
+            "description": row.description,
+            "type": row.type,
+            "category": category_cache.resolve_dict(db, row.category_id),
+        }
+        for row in rows
+    ]
+
+
+def batch_result_to_dict(db: Session, result: dict) -> dict:
+    """Serializa en el sitio las transacciones de un resultado de crud.apply_transaction_batch."""
+    for entry in result["results"]:
+        entry["op"] = entry["op"].value
+        if entry["transaction"] is not None:
+            entry["transaction"] = transaction_rows_to_dicts(db, [entry["transaction"]])[0]
+    return result
+
+
+def changes_to_dict(db: Session, changes: dict) -> dict:
+    """Serializa en el sitio las filas de un resultado de crud.get_transaction_changes."""
+    changes["changed"] = transaction_rows_to_dicts(db, changes["changed"])
+    return changes
+
+
 @router.post("/", response_model=schemas.TransactionRead)
 def create_transaction(
     transaction: schemas.TransactionCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: schemas.AuthenticatedUser = Depends(auth.get_current_user)
 ):
     """
     Crea una nueva transacción para el usuario autenticado.
     """
     return crud.create_user_transaction(db=db, transaction=transaction, user_id=current_user.user_id)
 
+@router.post("/bulk", response_model=schemas.BulkImportResult)
+def bulk_create_transactions(
+    rows: List[Dict[str, Any]],
+    db: Session = Depends(get_db),
+    current_user: schemas.AuthenticatedUser = Depends(auth.get_current_user)
+):
+    """
+    Crea varias transacciones a partir de un array JSON de objetos con los campos
+    de TransactionCreate. Las filas inválidas se devuelven como errores sin
+    impedir la creación del resto.
+    """
+    if len(rows) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"Máximo {MAX_BULK_ITEMS} transacciones por petición. Usa /transactions/import para ficheros grandes.")
+    return crud.bulk_create_user_transactions(db=db, rows=rows, user_id=current_user.user_id)
+
+@router.post("/batch", response_model=schemas.BatchResult)
+def batch_transactions(
+    operations: List[schemas.BatchOperation],
+    db: Session = Depends(get_db),
+    current_user: schemas.AuthenticatedUser = Depends(auth.get_current_user)
+):
+    """
+    Aplica una lista de operaciones (create, update, delete) sobre las
+    transacciones del usuario autenticado en una única transacción de base de
+    datos. Devuelve el resultado de cada operación, en el mismo orden; las que
+    fallan (404, 403, categoría inexistente) no impiden aplicar el resto.
+    """
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"Máximo {MAX_BATCH_OPERATIONS} operaciones por petición.")
+    result = crud.apply_transaction_batch(db=db, operations=operations, user_id=current_user.user_id)
+    return FastJSONResponse(batch_result_to_dict(db, result))
+
+@router.post("/import", response_model=schemas.BulkImportResult)
+def import_transactions_csv(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: schemas.AuthenticatedUser = Depends(auth.get_current_user)
+):
+    """
+    Importa transacciones desde un fichero CSV con cabecera
+    (amount, transaction_date, description, category_id, type).
+    El fichero se lee en streaming y se inserta por lotes, así que la memoria
+    usada no depende de su tamaño. Si no está en UTF-8 responde 400 sin
+    importar nada; las filas con campos de más se informan como errores.
+    """
+    check_utf8(file.file)
+    reader = csv.DictReader(codecs.iterdecode(file.file, "utf-8-sig"))
+    missing = set(IMPORT_CSV_COLUMNS) - set(reader.fieldnames or [])
+    if missing:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Faltan columnas en el CSV: {', '.join(sorted(missing))}")
+    return crud.bulk_create_user_transactions(db=db, rows=reader, user_id=current_user.user_id)
+
 @router.get("/", response_model=List[schemas.TransactionRead])
 def read_transactions(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    type: Optional[schemas.TransactionType] = None,
+    category_id: Optional[int] = None,
+    db: Session = Depends(auth.get_read_db),
+    current_user: schemas.AuthenticatedUser = Depends(auth.get_current_user)
+):
+    """
+    Obtiene una página de transacciones del usuario autenticado, de la más reciente
+    a la más antigua. Si hay más resultados, el cursor de la siguiente página se
+    devuelve en la cabecera 'X-Next-Cursor'.
+
+    La respuesta se construye desde tuplas de columnas y se codifica directamente
+    (ver FastJSONResponse), con el mismo formato que List[TransactionRead].
+
+    Lleva ETag y Last-Modified de la versión de los datos del usuario: si no ha
+    cambiado desde la copia del cliente, responde 304 sin consultar las transacciones.
+    """
+    # La versión se lee antes que los datos: si una escritura se cuela entre ambas
+    # lecturas, el ETag queda desfasado y el cliente simplemente vuelve a pedirlos
+    validators = conditional.validators(current_user.user_id, *crud.get_data_version(db, current_user.user_id))
+    if conditional.is_not_modified(request, validators):
+        return conditional.not_modified(validators)
+
+    after = decode_cursor(cursor) if cursor else None
+    rows = crud.get_transactions_by_user(
+        db=db,
+        user_id=current_user.user_id,
+        limit=limit + 1,  # Una fila extra para saber si hay página siguiente
+        after=after,
+        date_from=date_from,
+        date_to=date_to,
+        type=type,
+        category_id=category_id,
+        as_rows=True
+    )
+    headers = dict(validators)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1])
+    return FastJSONResponse(transaction_rows_to_dicts(db, rows), headers=headers)
+
+@router.get("/changes", response_model=schemas.TransactionChanges)
+def read_transaction_changes(
+    since: Optional[int] = Query(None, ge=0),
+    db: Session = Depends(auth.get_read_db),
+    current_user: schemas.AuthenticatedUser = Depends(auth.get_current_user)
+):
+    """
+    Devuelve las transacciones creadas o modificadas y los IDs de las borradas
+    desde el cursor 'since', para mantener una copia local sin volver a
+    descargar el listado. Cada respuesta trae el cursor de la siguiente llamada.
+
+    Sin 'since', o si el cursor ya no sirve (demasiados cambios, datos
+    reiniciados o tombstones purgados), responde con 'reset': el cliente debe
+    recargar el listado y continuar desde el cursor devuelto.
+    """
+    changes = crud.get_transaction_changes(db, user_id=current_user.user_id, since=since,
+                                           max_changes=MAX_CHANGES)
+    return FastJSONResponse(changes_to_dict(db, changes))
+
+@router.get("/search", response_model=List[schemas.TransactionRead])
+def search_transactions(
+    q: str = Query(..., min_length=1, max_length=MAX_SEARCH_QUERY_LENGTH),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    type: Optional[schemas.TransactionType] = None,
+    category_id: Optional[int] = None,
+    db: Session = Depends(auth.get_read_db),
+    current_user: schemas.AuthenticatedUser = Depends(auth.get_current_user)
+):
+    """
+    Busca en las descripciones de las transacciones del usuario autenticado.
+    Cada palabra se compara por prefijo y deben aparecer todas; los resultados
+    van ordenados por relevancia. Si hay más, el offset de la siguiente página
+    se devuelve en la cabecera 'X-Next-Offset'.
+    """
+    rows = crud.search_transactions(
+        db=db,
+        user_id=current_user.user_id,
+        query=q,
+        limit=limit + 1,  # Una fila extra para saber si hay página siguiente
+        offset=offset,
+        date_from=date_from,
+        date_to=date_to,
+        type=type,
+        category_id=category_id
+    )
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Offset"] = str(offset + limit)
+    return FastJSONResponse(transaction_rows_to_dicts(db, rows), headers=headers)
+
+def _export_rows(user_id: int, export_format: ExportFormat,
+                 date_from: Optional[date], date_to: Optional[date]):
+    """
+    Genera el contenido de la exportación en trozos de EXPORT_CHUNK_ROWS filas.
+    Abre su propia sesión (de solo lectura, ver database.read_session) porque
+    se consume después de que el endpoint haya devuelto la respuesta.
+    """
+    db = read_session(user_id)
+    try:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if export_format == ExportFormat.CSV:
+            writer.writerow(EXPORT_CSV_COLUMNS)
+
+        pending = 0
+        for row in crud.iter_transactions_for_export(
+            db, user_id=user_id, date_from=date_from, date_to=date_to, batch_size=EXPORT_CHUNK_ROWS
+        ):
+            transaction_id, transaction_date, amount, description, type_, category_id, category_name = row
+            if export_format == ExportFormat.CSV:
+                writer.writerow(row)
+            else:
+                buffer.write(json.dumps({
+                    "transaction_id": transaction_id,
+                    "amount": str(amount),
+                    "transaction_date": transaction_date.isoformat(),
+                    "description": description,
+                    "type": type_,
+                    "category": {"category_id": category_id, "category_name": category_name},
+                }, ensure_ascii=False))
+                buffer.write("\n")
+
+            pending += 1
+            if pending >= EXPORT_CHUNK_ROWS:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        db.close()
+
+@router.get("/export")
+def export_transactions(
+    format: ExportFormat = ExportFormat.CSV,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    current_user: schemas.AuthenticatedUser = Depends(auth.get_current_user)
+):
+    """
+    Exporta todas las transacciones del usuario autenticado en CSV o NDJSON.
+    Las filas se envían a medida que se leen de la base de datos, sin cargar
+    el historial completo en memoria.
+    """
+    media_type = "text/csv" if format == ExportFormat.CSV else "application/x-ndjson"
+    return StreamingResponse(
+        _export_rows(current_user.user_id, format, date_from, date_to),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="transacciones.{format.value}"'}
+    )
+
+@router.get("/summary", response_model=schemas.TransactionSummary)
+def read_transaction_summary(
+    request: Request,
+    response: Response,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: Session = Depends(auth.get_read_db),
+    current_user: schemas.AuthenticatedUser = Depends(auth.get_current_user)
 ):
     """
-    Obtiene todas las transacciones del usuario autenticado.
+    Obtiene el balance, los totales mensuales y los totales por categoría
+    del usuario autenticado, calculados en la base de datos.
+    Admite peticiones condicionales, como el listado.
     """
-    return crud.get_transactions_by_user(db=db, user_id=current_user.user_id)
+    validators = conditional.validators(current_user.user_id, *crud.get_data_version(db, current_user.user_id))
+    if conditional.is_not_modified(request, validators):
+        return conditional.not_modified(validators)
+    response.headers.update(validators)
+    return crud.get_transaction_summary(
+        db=db, user_id=current_user.user_id, date_from=date_from, date_to=date_to
+    )
 
 @router.delete("/{transaction_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_transaction_endpoint(
     transaction_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: schemas.AuthenticatedUser = Depends(auth.get_current_user)
 ):
     """
     Elimina una transacción del usuario autenticado
@@ -50,14 +389,15 @@ def update_transaction_endpoint(
     transaction_id: int,
     transaction_data: schemas.TransactionCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: schemas.AuthenticatedUser = Depends(auth.get_current_user)
 ):
     """
     Actualiza una transacción existente del usuario autenticado.
     """
-    return crud.update_transaction(
+    row = crud.update_transaction(
         db=db,
         transaction_id=transaction_id,
         transaction_data=transaction_data,
         user_id=current_user.user_id
-    )
\ No newline at end of file
+    )
+    return FastJSONResponse(transaction_rows_to_dicts(db, [row])[0])
\ No newline at end of file
@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
-from app import auth, crud, schemas
+from app import auth, crud, demo, schemas
 from ..database import get_db
 
 # APIRouter nos permite agrupar endpoints y luego incluirlos en la app principal
@@ -43,7 +43,8 @@ def login_for_access_token_endpoint(
     """
     Autentica a un usuario y devuelve un token de acceso JWT.
     Verifica las credenciales del usuario. Si el usuario es 'demo@example.com',
-    reinicia sus datos para proporcionar una experiencia de demostración limpia.
+    sus datos se reinician como mucho una vez cada DEMO_RESET_INTERVAL_SECONDS
+    (ver app.demo), de modo que un login de la demo cuesta lo mismo que uno normal.
     
     Args:
         db (Session): Dependencia de la sesión de la base de datos.
@@ -54,32 +55,45 @@ def login_for_access_token_endpoint(
     """
 
     user = auth.get_user_by_email(db, email=form_data.username)
+    is_demo = form_data.username == demo.DEMO_EMAIL
 
-    if form_data.username == "demo@example.com":
-        if not user:
-            hashed_password = auth.get_password_hash("demopassword")
-            demo_user_schema = schemas.UserCreate(email="demo@example.com", password=hashed_password)
-            user = crud.create_user(db=db, user=demo_user_schema, hashed_password=hashed_password)
-        
-        if not auth.verify_password("demopassword", user.password_hash):
-            hashed_password = auth.get_password_hash("demopassword")
-            user.password_hash = hashed_password
-            db.commit()
-            user = crud.get_user(db=db, user_id=user.user_id)
-            
-    if not user or not auth.verify_password(form_data.password, user.password_hash):
+    if is_demo and not user:
+        hashed_password = auth.get_password_hash(demo.DEMO_PASSWORD)
+        demo_user_schema = schemas.UserCreate(email=demo.DEMO_EMAIL, password=demo.DEMO_PASSWORD)
+        user = crud.get_or_create_user(db=db, user=demo_user_schema, hashed_password=hashed_password)
+
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email o contraseña incorrectos",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    if user.email == "demo@example.com":
-        crud.reset_demo_user_data(db=db, user_id=user.user_id)
+    is_valid, new_hash = auth.verify_and_update_password(form_data.password, user.password_hash)
+
+    # Si la contraseña de la demo se ha cambiado, se restaura (solo entonces se hashea de nuevo)
+    if not is_valid and is_demo and form_data.password == demo.DEMO_PASSWORD:
+        is_valid, new_hash = True, auth.get_password_hash(demo.DEMO_PASSWORD)
+
+    if not is_valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Email o contraseña incorrectos",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # Si el hash usa un coste o esquema obsoleto, se guarda el nuevo
+    if new_hash:
+        user.password_hash = new_hash
+        db.commit()
+        auth.invalidate_user_cache(user.user_id)
+
+    if is_demo:
+        demo.demo_reset.maybe_reset(db, user.user_id)
 
     access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = auth.create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email, "uid": user.user_id}, expires_delta=access_token_expires
     )
 
     return {"access_token": access_token, "token_type": "bearer"}
@@ -1,7 +1,8 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from datetime import date, datetime
 from enum import Enum
 from decimal import Decimal
+from typing import List, Optional
 
 # --- Modelos de Datos para la API (Esquemas Pydantic) ---
 
@@ -80,6 +81,161 @@ class TransactionRead(BaseModel):
         """
         from_attributes = True
 
+class BulkImportError(BaseModel):
+    """
+    Error de validación de una fila concreta de una importación en bloque.
+    'row' es la posición de la fila entre los datos importados, empezando en 1.
+    """
+    row: int
+    detail: str
+
+class BulkImportResult(BaseModel):
+    """
+    Esquema de respuesta de una importación en bloque de transacciones.
+    'errors' puede estar truncado; 'failed' es siempre el número total de filas rechazadas.
+    """
+    inserted: int
+    failed: int
+    errors: List[BulkImportError]
+
+class BatchOperationType(str, Enum):
+    """
+    Operaciones admitidas en una petición de /transactions/batch.
+    """
+    CREATE = 'create'
+    UPDATE = 'update'
+    DELETE = 'delete'
+
+class BatchOperation(BaseModel):
+    """
+    Una operación de un lote. 'create' necesita 'data'; 'update' necesita
+    'transaction_id' y 'data'; 'delete' solo 'transaction_id'.
+    """
+    op: BatchOperationType
+    transaction_id: Optional[int] = None
+    data: Optional[TransactionCreate] = None
+
+    @model_validator(mode="after")
+    def check_fields(self):
+        if self.op != BatchOperationType.CREATE and self.transaction_id is None:
+            raise ValueError(f"'transaction_id' es obligatorio para '{self.op.value}'")
+        if self.op != BatchOperationType.DELETE and self.data is None:
+            raise ValueError(f"'data' es obligatorio para '{self.op.value}'")
+        return self
+
+class BatchOperationResult(BaseModel):
+    """
+    Resultado de una operación del lote. 'index' es su posición en la petición
+    (empezando en 0) y 'status' el código HTTP que habría devuelto por separado.
+    'transaction' es la transacción tal como queda al terminar el lote.
+    """
+    index: int
+    op: BatchOperationType
+    status: int
+    transaction_id: Optional[int] = None
+    transaction: Optional[TransactionRead] = None
+    detail: Optional[str] = None
+
+class BatchResult(BaseModel):
+    """
+    Esquema de respuesta de /transactions/batch.
+    """
+    applied: int
+    failed: int
+    results: List[BatchOperationResult]
+
+class TransactionChanges(BaseModel):
+    """
+    Esquema de respuesta de /transactions/changes. Si 'reset' es True, el cliente
+    debe descartar su copia, recargar el listado y continuar desde 'cursor'.
+    """
+    cursor: int
+    reset: bool
+    changed: List[TransactionRead]
+    deleted: List[int]
+
+class MonthlyTotal(BaseModel):
+    """
+    Totales de ingresos y gastos de un mes concreto.
+    """
+    year: int
+    month: int
+    income: Decimal
+    expense: Decimal
+
+class CategoryTotal(BaseModel):
+    """
+    Total y número de transacciones de una categoría para un tipo (ingreso o gasto).
+    """
+    category_id: int
+    category_name: str
+    type: TransactionType
+    total: Decimal
+    count: int
+
+class TransactionSummary(BaseModel):
+    """
+    Esquema de respuesta del resumen de transacciones de un usuario.
+    Los totales se calculan en la base de datos, por lo que el tamaño de la
+    respuesta depende del número de meses y categorías, no del de transacciones.
+    """
+    total_income: Decimal
+    total_expense: Decimal
+    balance: Decimal
+    monthly: List[MonthlyTotal]
+    by_category: List[CategoryTotal]
+
+class BalancePoint(BaseModel):
+    """
+    Saldo acumulado al final de un día.
+    """
+    date: date
+    balance: Decimal
+
+class CategorySpendSeries(BaseModel):
+    """
+    Gasto móvil de una categoría: un valor por cada fecha de RollingSpend.dates.
+    """
+    category_id: int
+    category_name: str
+    values: List[Decimal]
+
+class RollingSpend(BaseModel):
+    """
+    Esquema de respuesta de /analytics/rolling-spend, en formato columnar: las
+    fechas una sola vez y, por categoría, el gasto de la ventana que termina en cada una.
+    """
+    window_days: int
+    dates: List[date]
+    categories: List[CategorySpendSeries]
+
+class RecurringTransaction(BaseModel):
+    """
+    Transacción recurrente detectada (misma descripción, categoría y tipo a intervalos regulares).
+    """
+    description: str
+    category_id: int
+    category_name: str
+    type: TransactionType
+    period: str
+    interval_days: float
+    occurrences: int
+    average_amount: Decimal
+    last_date: date
+    next_date: date
+
+class CashFlowForecast(BaseModel):
+    """
+    Esquema de respuesta de /analytics/forecast: el saldo previsto para cada día
+    del horizonte a partir del saldo actual, las transacciones recurrentes y la
+    media diaria del resto de movimientos.
+    """
+    as_of: date
+    starting_balance: Decimal
+    baseline_daily: Decimal
+    recurring: List[RecurringTransaction]
+    projection: List[BalancePoint]
+
 class UserRead(BaseModel):
     """
     Esquema para devolver la información de un usuario sin exponer la contraseña.
@@ -92,6 +248,16 @@ class UserRead(BaseModel):
     class Config:
         from_attributes = True
 
+class AuthenticatedUser(BaseModel):
+    """
+    Identidad del usuario autenticado que devuelve auth.get_current_user.
+    Es un objeto ligero e independiente de la sesión de base de datos,
+    por lo que puede cachearse entre peticiones.
+    """
+    user_id: int
+    email: str
+    username: str
+
 class Token(BaseModel):
     """
     Esquema para la respuesta del token de acceso.
@@ -0,0 +1,208 @@
+"""
+Compara las funciones vectorizadas de app.analytics con una implementación de
+referencia en Python puro que recorre las transacciones fila a fila, sobre
+transacciones sintéticas de un único usuario (1 millón por defecto). Comprueba
+que ambas dan el mismo resultado y devuelve los tiempos en JSON.
+
+No necesita base de datos: genera directamente las tuplas que devuelve
+crud.get_transaction_columns.
+
+Uso (desde la carpeta del backend):
+    python -m benchmarks.analytics [--rows 1000000] [--repeat 3]
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+
+from app import analytics
+from benchmarks.seed import DATE_RANGE_DAYS, DESCRIPTIONS, EXPENSE_CATEGORY_IDS, INCOME_CATEGORY_IDS
+
+# Recurrentes sembrados: (descripción, categoría, tipo, intervalo en días, céntimos)
+RECURRING = [("Nómina empresa", 1, analytics.INCOME, 30, 250000), ("Alquiler piso", 3, analytics.EXPENSE, 30, 90000)]
+RECURRING += [(f"Suscripción {i}", 9, analytics.EXPENSE, 30 if i % 2 else 7, 499 + 100 * i) for i in range(20)]
+
+
+def synthetic_rows(count: int, seed: int = 42, today_day: int = 20000):
+    """Tuplas (día, céntimos, category_id, tipo, descripción) ordenadas por día."""
+    rng = random.Random(seed)
+    first_day = today_day - DATE_RANGE_DAYS
+    rows = []
+    for description, category_id, type_, interval, cents in RECURRING:
+        rows += [(day, cents + rng.randint(-cents // 50, cents // 50), category_id, type_, description)
+                 for day in range(first_day + rng.randrange(interval), today_day + 1, interval)]
+    for _ in range(count - len(rows)):
+        is_income = rng.random() < 0.15
+        rows.append((
+            today_day - rng.randrange(DATE_RANGE_DAYS),
+            rng.randint(100, 200000),
+            rng.choice(INCOME_CATEGORY_IDS if is_income else EXPENSE_CATEGORY_IDS),
+            analytics.INCOME if is_income else analytics.EXPENSE,
+            rng.choice(DESCRIPTIONS),
+        ))
+    rows.sort(key=lambda row: row[0])
+    return rows
+
+
+# --- Referencia en Python puro (una iteración por fila) ---
+
+def py_running_balance(rows):
+    balance, by_day = 0, {}
+    for day, cents, _, type_, _ in rows:
+        balance += cents if type_ == analytics.INCOME else -cents
+        by_day[day] = balance
+    return list(by_day), list(by_day.values())
+
+
+def py_rolling_spend(rows, window_days, start_day, end_day):
+    first_day = start_day - window_days + 1
+    daily = defaultdict(lambda: defaultdict(int))
+    for day, cents, category_id, type_, _ in rows:
+        if type_ == analytics.EXPENSE:
+            daily[category_id][day] += cents if first_day <= day <= end_day else 0
+    result = {}
+    for category_id, by_day in sorted(daily.items()):
+        window, values = 0, []
+        for day in range(first_day, end_day + 1):
+            window += by_day.get(day, 0) - by_day.get(day - window_days, 0)
+            if day >= start_day:
+                values.append(window)
+        result[category_id] = values
+    return result
+
+
+def py_detect_recurring(rows, as_of_day, min_occurrences=3):
+    groups = defaultdict(list)
+    for day, cents, category_id, type_, description in rows:
+        groups[(description, category_id, type_)].append((day, cents))
+    result = {}
+    for key, items in groups.items():
+        if len(items) < min_occurrences:
+            continue
+        intervals = [b[0] - a[0] for a, b in zip(items, items[1:])]
+        mean_interval = sum(intervals) / len(intervals)
+        interval_std = (sum((x - mean_interval) ** 2 for x in intervals) / len(intervals)) ** 0.5
+        amounts = [cents for _, cents in items]
+        mean_cents = sum(amounts) / len(amounts)
+        cents_std = (sum((x - mean_cents) ** 2 for x in amounts) / len(amounts)) ** 0.5
+        name, period = min(analytics.RECURRING_PERIODS, key=lambda item: abs(mean_interval - item[1]))
+        if (abs(mean_interval - period) <= analytics.PERIOD_TOLERANCE * period
+                and interval_std <= analytics.PERIOD_TOLERANCE * period
+                and cents_std <= analytics.AMOUNT_TOLERANCE * mean_cents
+                and items[-1][0] + 1.5 * period >= as_of_day):
+            result[key] = (name, items[-1][0] + round(mean_interval), round(mean_cents))
+    return result
+
+
+def py_project_cash_flow(rows, as_of_day, horizon_days, lookback_days=90):
+    recurring = py_detect_recurring(rows, as_of_day)
+    starting, lookback = 0, 0
+    for day, cents, category_id, type_, description in rows:
+        signed = cents if type_ == analytics.INCOME else -cents
+        if day <= as_of_day:
+            starting += signed
+            if day > as_of_day - lookback_days and (description, category_id, type_) not in recurring:
+                lookback += signed
+    delta = [lookback / lookback_days] * horizon_days
+    for key, (next_day, step, cents) in _recurring_steps(rows, recurring).items():
+        sign = 1 if key[2] == analytics.INCOME else -1
+        while next_day <= as_of_day:
+            next_day += step
+        while next_day <= as_of_day + horizon_days:
+            delta[next_day - as_of_day - 1] += sign * cents
+            next_day += step
+    balance, result = starting, []
+    for value in delta:
+        balance += value
+        result.append(round(balance))
+    return result
+
+
+def _recurring_steps(rows, recurring):
+    """Siguiente fecha, intervalo medio redondeado e importe medio de cada recurrente."""
+    days = defaultdict(list)
+    for day, _, category_id, type_, description in rows:
+        if (description, category_id, type_) in recurring:
+            days[(description, category_id, type_)].append(day)
+    steps = {}
+    for key, (_, next_day, cents) in recurring.items():
+        group_days = days[key]
+        interval = round((group_days[-1] - group_days[0]) / (len(group_days) - 1), 1)
+        steps[key] = (next_day, max(1, round(interval)), cents)
+    return steps
+
+
+# --- Medición ---
+
+def best_of(repeat: int, function, *args):
+    """Mejor tiempo (ms) de 'repeat' ejecuciones y el resultado de la última."""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 1), result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.analytics", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    today_day = 20000
+    rows = synthetic_rows(args.rows, args.seed, today_day)
+    load_ms, arrays = best_of(args.repeat, analytics.from_rows, rows)
+    start_day = today_day - 89
+    cases = {
+        "running_balance": (
+            lambda: analytics.running_balance(arrays),
+            lambda: py_running_balance(rows),
+            lambda fast, slow: fast[0].tolist() == slow[0] and fast[1].tolist() == slow[1],
+        ),
+        "rolling_spend_30": (
+            lambda: analytics.rolling_spend(arrays, 30, start_day, today_day),
+            lambda: py_rolling_spend(rows, 30, start_day, today_day),
+            lambda fast, slow: {int(c): col.tolist() for c, col in zip(fast[0], fast[1].T)} == slow,
+        ),
+        "rolling_spend_90": (
+            lambda: analytics.rolling_spend(arrays, 90, start_day, today_day),
+            lambda: py_rolling_spend(rows, 90, start_day, today_day),
+            lambda fast, slow: {int(c): col.tolist() for c, col in zip(fast[0], fast[1].T)} == slow,
+        ),
+        "detect_recurring": (
+            lambda: analytics.detect_recurring(arrays, today_day),
+            lambda: py_detect_recurring(rows, today_day),
+            lambda fast, slow: {analytics.describe_group(arrays, item["key"])[:2] + (item["period"],)
+                                for item in fast} == {(d, c, value[0]) for (d, c, _), value in slow.items()},
+        ),
+        "project_cash_flow": (
+            lambda: analytics.project_cash_flow(arrays, today_day, 90),
+            lambda: py_project_cash_flow(rows, today_day, 90),
+            lambda fast, slow: max(abs(a - b) for a, b in zip(fast["balance_cents"].tolist(), slow)) <= 1,
+        ),
+    }
+
+    result = {"rows": len(rows), "repeat": args.repeat, "from_rows_ms": load_ms, "operations": {}}
+    all_match = True
+    for name, (fast, slow, same) in cases.items():
+        numpy_ms, fast_result = best_of(args.repeat, fast)
+        python_ms, slow_result = best_of(args.repeat, slow)
+        match = bool(same(fast_result, slow_result))
+        all_match &= match
+        result["operations"][name] = {
+            "numpy_ms": numpy_ms,
+            "python_ms": python_ms,
+            "speedup": round(python_ms / numpy_ms, 1) if numpy_ms else None,
+            "results_match": match,
+        }
+    print(json.dumps(result, indent=2))
+    return 0 if all_match else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Mide el arranque en frío del backend: el tiempo de importar app.main en un
+proceso nuevo y el tiempo desde que se lanza uvicorn hasta la primera
+respuesta correcta de la API. Devuelve los resultados en JSON.
+
+Uso (desde la carpeta del backend, con la base de datos ya migrada):
+    python -m benchmarks.cold_start [--runs 5] [--budget-ms 1500]
+
+Con --budget-ms termina con código 1 si la mediana del arranque hasta la
+primera respuesta supera el presupuesto.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks.server import BACKEND_DIR, free_port
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+
+
+def measure_import() -> float:
+    """Segundos que tarda 'import app.main' en un intérprete nuevo."""
+    output = subprocess.check_output([sys.executable, "-c", IMPORT_SNIPPET], cwd=BACKEND_DIR)
+    return float(output.decode().strip().splitlines()[-1])
+
+
+def measure_first_request(path: str, timeout: float) -> float:
+    """Segundos desde que se lanza uvicorn hasta la primera respuesta 200 en 'path'."""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}{path}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn terminó con código {server.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        raise TimeoutError(f"Sin respuesta de {url} en {timeout} s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def _summary(samples):
+    return {
+        "runs": len(samples),
+        "median_ms": round(statistics.median(samples) * 1000, 1),
+        "min_ms": round(min(samples) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.cold_start", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/categories/", help="Endpoint de la primera petición")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    imports = [measure_import() for _ in range(args.runs)]
+    first_requests = [measure_first_request(args.path, args.timeout) for _ in range(args.runs)]
+
+    result = {
+        "import": _summary(imports),
+        "first_request": {**_summary(first_requests), "path": args.path},
+        "budget_ms": args.budget_ms,
+    }
+    over_budget = args.budget_ms is not None and result["first_request"]["median_ms"] > args.budget_ms
+    result["within_budget"] = None if args.budget_ms is None else not over_budget
+    print(json.dumps(result, indent=2))
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Memoria de la exportación en streaming (GET /transactions/export): recorre el
+generador del endpoint para un usuario con muchas transacciones (1 millón por
+defecto), en CSV y NDJSON, y mide el pico de memoria de Python (tracemalloc),
+el crecimiento del RSS del proceso y las filas por segundo. Devuelve los
+resultados en JSON.
+
+Con --max-peak-mb termina con código 1 si el pico de tracemalloc de algún
+formato supera el presupuesto: la exportación lee y envía trozos de
+EXPORT_CHUNK_ROWS filas, así que el pico no debe depender del número de filas.
+
+Migra la base de datos y siembra con benchmarks.seed un único usuario
+(bench-user-0) con --rows transacciones; conviene usar una base de datos
+propia, p. ej. DATABASE_URL=sqlite:///export.db.
+
+Uso (desde la carpeta del backend):
+    python -m benchmarks.export [--rows 1000000] [--max-peak-mb 16]
+"""
+import argparse
+import contextlib
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from benchmarks.seed import seed
+
+
+def _status_mb(field: str):
+    """Campo de /proc/self/status (VmRSS, VmHWM) en MB, o None fuera de Linux."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss() -> bool:
+    """Reinicia VmHWM (el pico de RSS) para medir solo la exportación. Solo Linux."""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def consume(user_id: int, export_format) -> tuple:
+    """Recorre la exportación completa. Devuelve (filas, caracteres)."""
+    from app.routers.transactions import ExportFormat, _export_rows
+
+    lines = characters = 0
+    for chunk in _export_rows(user_id, export_format, None, None):
+        lines += chunk.count("\n")
+        characters += len(chunk)
+    return lines - (1 if export_format == ExportFormat.CSV else 0), characters
+
+
+def measure(user_id: int, export_format) -> dict:
+    """Una pasada sin instrumentar (throughput y RSS) y otra con tracemalloc (pico de Python)."""
+    gc.collect()
+    rss_before = _status_mb("VmRSS")
+    peak_reset = _reset_peak_rss()
+    start = time.perf_counter()
+    rows, characters = consume(user_id, export_format)
+    elapsed = time.perf_counter() - start
+    peak_rss = _status_mb("VmHWM") if peak_reset else None
+
+    tracemalloc.start()
+    try:
+        consume(user_id, export_format)
+        traced_peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "rows": rows,
+        "output_mb": round(characters / 2 ** 20, 1),
+        "seconds": round(elapsed, 2),
+        "rows_per_s": round(rows / elapsed) if elapsed > 0 else None,
+        "tracemalloc_peak_mb": round(traced_peak / 2 ** 20, 2),
+        "rss_growth_mb": round(peak_rss - rss_before, 1) if peak_rss is not None and rss_before is not None else None,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.export",
+                                     description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Transacciones del usuario exportado")
+    parser.add_argument("--max-peak-mb", type=float, default=None,
+                        help="Presupuesto del pico de tracemalloc por formato")
+    args = parser.parse_args(argv)
+
+    from app.cli import init_db
+    from app.routers.transactions import EXPORT_CHUNK_ROWS, ExportFormat
+
+    log = lambda message: print(message, file=sys.stderr)  # noqa: E731
+    with contextlib.redirect_stdout(sys.stderr):  # stdout queda solo para el JSON
+        init_db()
+    # Idempotente: si el usuario ya tiene las filas, no inserta nada
+    [user_id] = seed(1, args.rows, log=log)["user_ids"]
+
+    result = {"rows": args.rows, "chunk_rows": EXPORT_CHUNK_ROWS, "formats": {}}
+    for export_format in ExportFormat:
+        log(f"Exportando en {export_format.value}...")
+        result["formats"][export_format.value] = measure(user_id, export_format)
+
+    exit_code = 0
+    if args.max_peak_mb is not None:
+        result["max_peak_mb"] = args.max_peak_mb
+        exit_code = 1 if any(entry["tracemalloc_peak_mb"] > args.max_peak_mb
+                             for entry in result["formats"].values()) else 0
+    print(json.dumps(result, indent=2))
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
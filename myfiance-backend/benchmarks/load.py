@@ -0,0 +1,591 @@
+"""
+Prueba de carga de la API: migra y puebla la base de datos (benchmarks.seed),
+lanza app.main:app con uvicorn (benchmarks.server) y ataca los endpoints
+reales con clientes concurrentes. Para cada endpoint informa del throughput,
+las latencias p50/p95/p99 y las sentencias SQL por petición, en JSON.
+
+Uso (desde la carpeta del backend):
+    python -m benchmarks.load --users 10 --transactions 100000 --concurrency 8 \\
+        --duration 10 --output resultado.json [--baseline base.json]
+
+Cada escenario se lanza con --concurrency clientes, o con N si se indica como
+'escenario:N' en --scenarios. Por defecto los escenarios se ejecutan uno tras
+otro; con --mixed se ejecutan todos a la vez (carga mixta), cada uno con sus
+propios clientes, y se informa de cada uno por separado.
+
+La base de datos es la de DATABASE_URL (PostgreSQL local o un fichero SQLite,
+p. ej. DATABASE_URL=sqlite:///bench.db). Con --baseline compara el resultado
+con uno anterior y termina con código 1 si algún endpoint empeora más de
+--max-regression (por defecto, un 20 %) en throughput o en p95. Con
+--server-env se cambia la configuración del servidor entre dos ejecuciones
+(p. ej. USER_CACHE_ENABLED=false) para comparar con y sin una optimización.
+"""
+import argparse
+import contextlib
+import csv
+import http.client
+import io
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from datetime import date, datetime, timezone
+
+from benchmarks.seed import BENCH_PASSWORD, bench_email, seed
+from benchmarks.server import BACKEND_DIR, server_environment, start_server, statements_from_server_timing
+
+DEFAULT_SCENARIOS = ("categories", "login", "list", "list_deep", "list_gzip", "list_conditional", "search",
+                     "summary", "export", "create", "update", "batch", "delete")
+BATCH_CREATES = 10  # Altas por petición del escenario batch (y bajas de las del lote anterior)
+
+
+class Worker:
+    """Cliente HTTP con conexión persistente y el estado de un usuario de benchmark."""
+
+    def __init__(self, host: str, port: int, index: int, email: str, token: str,
+                 deep_pages: int = 0, bulk_rows: int = 0):
+        self.host, self.port = host, port
+        self.index = index
+        self.email = email
+        self.auth = {"Authorization": f"Bearer {token}"}
+        self.created_ids = []
+        self.etags = {}  # Último ETag recibido por ruta, para las peticiones condicionales
+        self.next_cursor = None  # X-Next-Cursor de la última respuesta
+        self.deep_pages = deep_pages
+        self.deep_cursor = None
+        self.bulk_rows = bulk_rows
+        self.bulk_bodies = {}  # Cuerpos de bulk e import, generados una vez por worker
+        self.rng = random.Random(index)
+        self.conn = http.client.HTTPConnection(host, port, timeout=60)
+
+    def request(self, method: str, path: str, body=None, headers=None):
+        """Devuelve (código, segundos, sentencias SQL o None, cuerpo). Código 0 = error de conexión."""
+        start = time.perf_counter()
+        try:
+            self.conn.request(method, path, body=body, headers=headers or {})
+            response = self.conn.getresponse()
+            data = response.read()
+        except (http.client.HTTPException, OSError):
+            self.conn.close()
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            return 0, time.perf_counter() - start, None, b""
+        statements = statements_from_server_timing(response.getheader("Server-Timing"))
+        if response.getheader("ETag"):
+            self.etags[path] = response.getheader("ETag")
+        self.next_cursor = response.getheader("X-Next-Cursor")
+        return response.status, time.perf_counter() - start, statements, data
+
+
+def _transaction_body(worker: Worker) -> str:
+    rng = worker.rng
+    return json.dumps({
+        "amount": f"{rng.randint(100, 50000) / 100:.2f}",
+        "transaction_date": date.today().replace(day=rng.randint(1, 28)).isoformat(),
+        "description": "Benchmark",
+        "category_id": rng.randint(3, 9),
+        "type": "expense",
+    })
+
+
+def _json_headers(worker: Worker) -> dict:
+    return {**worker.auth, "Content-Type": "application/json"}
+
+
+# Cada escenario recibe el worker y devuelve (método, ruta, cuerpo, cabeceras),
+# una función sin argumentos que hace varias peticiones y devuelve lo mismo que
+# Worker.request (se mide como una sola), o None si ya no queda trabajo
+# (p. ej. no quedan transacciones que borrar)
+def _categories(worker):
+    return "GET", "/categories/", None, {}
+
+
+def _login(worker):
+    body = urllib.parse.urlencode({"username": worker.email, "password": BENCH_PASSWORD})
+    return "POST", "/users/token", body, {"Content-Type": "application/x-www-form-urlencoded"}
+
+
+def _login_demo(worker):
+    # Todos los clientes entran como el usuario de la demo (app.demo)
+    from app.demo import DEMO_EMAIL, DEMO_PASSWORD
+
+    body = urllib.parse.urlencode({"username": DEMO_EMAIL, "password": DEMO_PASSWORD})
+    return "POST", "/users/token", body, {"Content-Type": "application/x-www-form-urlencoded"}
+
+
+def _list(worker):
+    return "GET", "/transactions/", None, worker.auth
+
+
+def _walk_pages(worker, pages: int) -> str:
+    """Recorre 'pages' páginas del listado y devuelve el cursor de la siguiente ('' si no hay más)."""
+    cursor = ""
+    for _ in range(pages):
+        code, _, _, _ = worker.request("GET", f"/transactions/?{urllib.parse.urlencode({'cursor': cursor})}"
+                                       if cursor else "/transactions/", headers=worker.auth)
+        if code != 200 or not worker.next_cursor:
+            break
+        cursor = worker.next_cursor
+    return cursor
+
+
+def _fetch_all_pages(worker):
+    """Descarga el listado completo con páginas de MAX_PAGE_SIZE. Suma tiempos, sentencias y bytes."""
+    from app.routers.transactions import MAX_PAGE_SIZE
+
+    cursor, total_seconds, total_statements, pages = None, 0.0, 0, []
+    while True:
+        query = {"limit": MAX_PAGE_SIZE, **({"cursor": cursor} if cursor else {})}
+        code, seconds, statements, data = worker.request(
+            "GET", f"/transactions/?{urllib.parse.urlencode(query)}", headers=worker.auth)
+        total_seconds += seconds
+        total_statements += statements or 0
+        pages.append(data)
+        cursor = worker.next_cursor
+        if code != 200 or not cursor:
+            return code, total_seconds, total_statements, b"".join(pages)
+
+
+def _list_all(worker):
+    # Lo que hacía el dashboard antes de /transactions/summary: descargar todo y agregar en el cliente
+    return lambda: _fetch_all_pages(worker)
+
+
+def _find_deep_cursor(worker):
+    worker.deep_cursor = _walk_pages(worker, worker.deep_pages)
+
+
+def _list_deep(worker):
+    # La página siguiente a las --deep-pages primeras (o la última, si hay menos):
+    # con paginación por keyset no debería costar más que la primera
+    if not worker.deep_cursor:
+        return "GET", "/transactions/", None, worker.auth
+    return "GET", f"/transactions/?{urllib.parse.urlencode({'cursor': worker.deep_cursor})}", None, worker.auth
+
+
+def _list_gzip(worker):
+    return "GET", "/transactions/", None, {**worker.auth, "Accept-Encoding": "gzip"}
+
+
+def _list_conditional(worker):
+    # Recarga sin cambios: tras la primera respuesta, todas deberían ser 304
+    etag = worker.etags.get("/transactions/")
+    return "GET", "/transactions/", None, {**worker.auth, **({"If-None-Match": etag} if etag else {})}
+
+
+def _search(worker):
+    # Prefijos de las descripciones de benchmarks.seed
+    query = worker.rng.choice(("super", "alqui", "gasol", "restaur", "transfer ahorro"))
+    return "GET", f"/transactions/search?{urllib.parse.urlencode({'q': query})}", None, worker.auth
+
+
+def _summary(worker):
+    return "GET", "/transactions/summary", None, worker.auth
+
+
+def _create(worker):
+    return "POST", "/transactions/", _transaction_body(worker), _json_headers(worker)
+
+
+def _update(worker):
+    if not worker.created_ids:
+        return None
+    transaction_id = worker.rng.choice(worker.created_ids)
+    return "PUT", f"/transactions/{transaction_id}", _transaction_body(worker), _json_headers(worker)
+
+
+def _delete(worker):
+    if not worker.created_ids:
+        return None
+    return "DELETE", f"/transactions/{worker.created_ids.pop()}", None, worker.auth
+
+
+def _bulk_rows(worker):
+    return [json.loads(_transaction_body(worker)) for _ in range(worker.bulk_rows)]
+
+
+def _bulk(worker):
+    if "bulk" not in worker.bulk_bodies:
+        worker.bulk_bodies["bulk"] = json.dumps(_bulk_rows(worker))
+    return "POST", "/transactions/bulk", worker.bulk_bodies["bulk"], _json_headers(worker)
+
+
+def _import(worker):
+    boundary = "benchmark-boundary"
+    if "import" not in worker.bulk_bodies:
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=["amount", "transaction_date", "description", "category_id", "type"],
+                                lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(_bulk_rows(worker))
+        worker.bulk_bodies["import"] = (
+            f"--{boundary}\r\n"
+            'Content-Disposition: form-data; name="file"; filename="import.csv"\r\n'
+            "Content-Type: text/csv\r\n\r\n"
+            f"{output.getvalue()}\r\n--{boundary}--\r\n"
+        ).encode()
+    headers = {**worker.auth, "Content-Type": f"multipart/form-data; boundary={boundary}"}
+    return "POST", "/transactions/import", worker.bulk_bodies["import"], headers
+
+
+def _export(worker):
+    # Todas las transacciones del usuario; el cliente lee la respuesta completa
+    return "GET", "/transactions/export?format=csv", None, worker.auth
+
+
+def _batch(worker):
+    # Borra las altas del lote anterior y crea otras tantas: el volumen no crece
+    deletes = [{"op": "delete", "transaction_id": worker.created_ids.pop()}
+               for _ in range(min(BATCH_CREATES, len(worker.created_ids)))]
+    creates = [{"op": "create", "data": json.loads(_transaction_body(worker))} for _ in range(BATCH_CREATES)]
+    return "POST", "/transactions/batch", json.dumps(deletes + creates), _json_headers(worker)
+
+
+SCENARIOS = {
+    "categories": ("GET /categories/", _categories),
+    "login": ("POST /users/token", _login),
+    "login_demo": ("POST /users/token (demo)", _login_demo),
+    "list": ("GET /transactions/", _list),
+    "list_deep": ("GET /transactions/?cursor= (página profunda)", _list_deep),
+    "list_all": ("GET /transactions/ (todas las páginas)", _list_all),
+    "list_gzip": ("GET /transactions/ (gzip)", _list_gzip),
+    "list_conditional": ("GET /transactions/ (If-None-Match)", _list_conditional),
+    "search": ("GET /transactions/search", _search),
+    "summary": ("GET /transactions/summary", _summary),
+    "create": ("POST /transactions/", _create),
+    "update": ("PUT /transactions/{id}", _update),
+    "delete": ("DELETE /transactions/{id}", _delete),
+    "export": ("GET /transactions/export", _export),
+    "batch": ("POST /transactions/batch", _batch),
+    "bulk": ("POST /transactions/bulk", _bulk),
+    "import": ("POST /transactions/import (CSV)", _import),
+}
+
+# Transacciones creadas por petición, para informar de las filas por segundo
+ROWS_PER_REQUEST = {
+    "create": lambda args: 1,
+    "bulk": lambda args: args.bulk_rows,
+    "import": lambda args: args.bulk_rows,
+}
+
+
+# Preparación de cada worker antes de empezar a medir el escenario
+SETUP = {
+    "list_deep": _find_deep_cursor,
+}
+
+
+def _setup(name: str, workers):
+    for worker in workers if name in SETUP else ():
+        SETUP[name](worker)
+
+
+def _record_created(worker: Worker, method: str, path: str, code: int, data: bytes):
+    """Guarda los IDs de las transacciones creadas, para los escenarios update, delete y batch."""
+    if method != "POST" or code != 200:
+        return
+    if path == "/transactions/":
+        worker.created_ids.append(json.loads(data)["transaction_id"])
+    elif path == "/transactions/batch":
+        worker.created_ids.extend(result["transaction_id"] for result in json.loads(data)["results"]
+                                  if result["op"] == "create" and result["status"] == 201)
+
+
+def percentile(sorted_values, p: float):
+    """Percentil por rango más cercano de una lista ya ordenada."""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def summarize(samples, elapsed: float) -> dict:
+    """Resume las muestras (código, segundos, sentencias, bytes) de un escenario."""
+    latencies = sorted(seconds * 1000 for _, seconds, _, _ in samples)
+    statements = [count for _, _, count, _ in samples if count is not None]
+    status_codes = {}
+    for code, _, _, _ in samples:
+        status_codes[str(code)] = status_codes.get(str(code), 0) + 1
+
+    def ms(value):
+        return round(value, 2) if value is not None else None
+
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for code, _, _, _ in samples if code == 0 or code >= 400),
+        "status_codes": status_codes,
+        # Rechazos por saturación (pool de bcrypt o límites de peticiones), sobre el total
+        "rejected_429_rate": round(status_codes.get("429", 0) / len(samples), 3) if samples else None,
+        "throughput_rps": round(len(samples) / elapsed, 1) if elapsed > 0 else None,
+        "latency_ms": {
+            "mean": ms(sum(latencies) / len(latencies)) if latencies else None,
+            "p50": ms(percentile(latencies, 50)),
+            "p95": ms(percentile(latencies, 95)),
+            "p99": ms(percentile(latencies, 99)),
+            "max": ms(latencies[-1]) if latencies else None,
+        },
+        "db_statements": {
+            "mean": round(sum(statements) / len(statements), 2) if statements else None,
+            "max": max(statements) if statements else None,
+        },
+        "response_kb_mean": round(sum(size for _, _, _, size in samples) / len(samples) / 1024, 1) if samples else None,
+    }
+
+
+def run_scenario(workers, build_request, duration: float, max_requests: int = None) -> dict:
+    """Ejecuta un escenario con un hilo por worker durante 'duration' segundos."""
+    samples = []
+    lock = threading.Lock()
+    issued = [0]
+    deadline = time.perf_counter() + duration
+
+    def loop(worker: Worker):
+        local = []
+        while time.perf_counter() < deadline:
+            if max_requests is not None:
+                with lock:
+                    if issued[0] >= max_requests:
+                        break
+                    issued[0] += 1
+            request = build_request(worker)
+            if request is None:
+                break
+            if callable(request):
+                code, seconds, statements, data = request()
+            else:
+                method, path, body, headers = request
+                code, seconds, statements, data = worker.request(method, path, body, headers)
+                _record_created(worker, method, path, code, data)
+            local.append((code, seconds, statements, len(data)))
+        with lock:
+            samples.extend(local)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=loop, args=(worker,)) for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(samples, time.perf_counter() - start)
+
+
+def run_mixed(groups, duration: float, max_requests: int = None) -> dict:
+    """
+    Ejecuta a la vez varios escenarios, cada uno con sus workers: recibe
+    {nombre: (workers, build_request)} y devuelve {nombre: resumen}.
+    """
+    results = {}
+
+    def run(name, workers, build_request):
+        results[name] = run_scenario(workers, build_request, duration, max_requests)
+
+    threads = [threading.Thread(target=run, args=(name, workers, build_request))
+               for name, (workers, build_request) in groups.items()]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {name: results[name] for name in groups}
+
+
+def compare(result: dict, baseline: dict, max_regression: float) -> dict:
+    """
+    Compara throughput y latencias de cada endpoint con la línea base. Los
+    cambios son relativos (0.1 = un 10 % más); 'regression' marca los que
+    empeoran más de 'max_regression' en throughput o en p95.
+    """
+    comparison = {}
+    for name, current in result["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if not previous:
+            continue
+        entry = {}
+        for key, value, old in (
+            ("throughput_change", current["throughput_rps"], previous["throughput_rps"]),
+            ("p50_change", current["latency_ms"]["p50"], previous["latency_ms"]["p50"]),
+            ("p95_change", current["latency_ms"]["p95"], previous["latency_ms"]["p95"]),
+            ("p99_change", current["latency_ms"]["p99"], previous["latency_ms"]["p99"]),
+        ):
+            entry[key] = round(value / old - 1, 3) if value is not None and old else None
+        entry["db_statements_mean"] = [previous["db_statements"]["mean"], current["db_statements"]["mean"]]
+        entry["regression"] = bool(
+            (entry["throughput_change"] is not None and entry["throughput_change"] < -max_regression)
+            or (entry["p95_change"] is not None and entry["p95_change"] > max_regression)
+        )
+        comparison[name] = entry
+    return comparison
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_scenarios(spec: str, concurrency: int):
+    """Convierte 'list,login:64' en [('list', concurrency, False), ('login', 64, True)]."""
+    scenarios = []
+    for item in filter(None, (item.strip() for item in spec.split(","))):
+        name, _, clients = item.partition(":")
+        if clients and not (clients.isdigit() and int(clients) > 0):
+            raise ValueError(f"Número de clientes no válido en '{item}'")
+        scenarios.append((name, int(clients) if clients else concurrency, bool(clients)))
+    return scenarios
+
+
+class WorkerFactory:
+    """
+    Crea workers con sesión iniciada. Cada usuario de benchmark inicia sesión
+    una sola vez y su token se reparte entre los workers que lo usan, así que
+    lanzar muchos clientes no cuesta un bcrypt por cliente.
+    """
+
+    def __init__(self, host: str, port: int, users: int, **worker_settings):
+        self.host, self.port = host, port
+        self.users = users
+        self.worker_settings = worker_settings
+        self.tokens = {}
+        self.next_index = 0
+
+    def _token(self, email: str) -> str:
+        if email not in self.tokens:
+            worker = Worker(self.host, self.port, -1, email, token="")
+            code, _, _, data = worker.request(*_login(worker))
+            worker.conn.close()
+            if code != 200:
+                raise RuntimeError(f"No se pudo iniciar sesión como {email}: HTTP {code}")
+            self.tokens[email] = json.loads(data)["access_token"]
+        return self.tokens[email]
+
+    def create(self, count: int):
+        workers = []
+        for _ in range(count):
+            index, self.next_index = self.next_index, self.next_index + 1
+            email = bench_email(index % self.users)
+            workers.append(Worker(self.host, self.port, index, email, self._token(email), **self.worker_settings))
+        return workers
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load",
+                                     description="Prueba de carga de la API de MyFiance")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--transactions", type=int, default=10000, help="Total sembrado, repartido entre los usuarios")
+    parser.add_argument("--concurrency", type=int, default=8, help="Clientes concurrentes")
+    parser.add_argument("--duration", type=float, default=10.0, help="Segundos por escenario")
+    parser.add_argument("--requests", type=int, default=None, help="Máximo de peticiones por escenario")
+    parser.add_argument("--scenarios", default=",".join(DEFAULT_SCENARIOS),
+                        help=f"Lista separada por comas de: {', '.join(SCENARIOS)}; "
+                             "con 'escenario:N', N clientes en lugar de --concurrency")
+    parser.add_argument("--mixed", action="store_true", help="Ejecuta todos los escenarios a la vez")
+    parser.add_argument("--deep-pages", type=int, default=100,
+                        help="Páginas que se saltan antes de medir el escenario list_deep")
+    parser.add_argument("--bulk-rows", type=int, default=1000, help="Transacciones por petición de bulk e import")
+    parser.add_argument("--server-workers", type=int, default=1)
+    parser.add_argument("--server-env", action="append", default=[], metavar="VARIABLE=VALOR",
+                        help="Variable de entorno del servidor (repetible), p. ej. USER_CACHE_ENABLED=false")
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--output", default=None, help="Fichero JSON de resultados (por defecto, stdout)")
+    parser.add_argument("--baseline", default=None, help="Resultado anterior con el que comparar")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    try:
+        scenarios = parse_scenarios(args.scenarios, args.concurrency)
+    except ValueError as exc:
+        parser.error(str(exc))
+    server_env = dict(item.split("=", 1) for item in args.server_env if "=" in item)
+    if len(server_env) != len(args.server_env):
+        parser.error("--server-env espera VARIABLE=VALOR")
+    unknown = {name for name, _, _ in scenarios} - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Escenarios desconocidos: {', '.join(sorted(unknown))}")
+
+    from sqlalchemy.engine import make_url
+
+    from app.cli import init_db
+    from app.database import DATABASE_URL
+
+    log = lambda message: print(message, file=sys.stderr)  # noqa: E731
+    if not args.skip_seed:
+        with contextlib.redirect_stdout(sys.stderr):  # stdout queda solo para el JSON
+            init_db()
+        seed(args.users, args.transactions, log=log)
+
+    result = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": _git_revision(),
+            "database": make_url(DATABASE_URL).get_backend_name(),
+            # El modo lo decide el entorno del servidor (incluido --server-env), no el de este proceso
+            "async": server_environment(server_env).get("DATABASE_ASYNC", "false").lower() in ("1", "true", "yes"),
+            "users": args.users,
+            "transactions": args.transactions,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "server_workers": args.server_workers,
+            "server_env": server_env,
+            "scenarios": args.scenarios,
+            "deep_pages": args.deep_pages,
+            "bulk_rows": args.bulk_rows,
+            "mixed": args.mixed,
+        },
+        "endpoints": {},
+    }
+
+    with start_server(env=server_env, workers=args.server_workers) as (host, port):
+        factory = WorkerFactory(host, port, args.users, deep_pages=args.deep_pages, bulk_rows=args.bulk_rows)
+        shared_workers = None  # Los escenarios sin ':N' comparten workers (y los IDs que crean)
+        groups = {}
+        for name, clients, explicit in scenarios:
+            label, build_request = SCENARIOS[name]
+            if explicit:
+                label = f"{label} [clientes: {clients}]"
+                workers = factory.create(clients)
+            elif args.mixed or shared_workers is None:
+                workers = factory.create(clients)
+                shared_workers = shared_workers or workers
+            else:
+                workers = shared_workers
+            groups[label] = (name, workers, build_request)
+        if args.mixed:
+            for name, workers, _ in groups.values():
+                _setup(name, workers)
+            for _, workers, _ in groups.values():
+                for worker in workers:
+                    worker.conn.close()  # Se reabre en la siguiente petición, sin esperar al keep-alive
+            log(f"Carga mixta: {', '.join(groups)}...")
+            result["endpoints"] = run_mixed({label: (workers, build_request)
+                                             for label, (_, workers, build_request) in groups.items()},
+                                            args.duration, args.requests)
+        else:
+            for label, (name, workers, build_request) in groups.items():
+                log(f"{label}...")
+                _setup(name, workers)
+                result["endpoints"][label] = run_scenario(workers, build_request, args.duration, args.requests)
+        for label, (name, _, _) in groups.items():
+            summary = result["endpoints"][label]
+            if name in ROWS_PER_REQUEST and summary["throughput_rps"] is not None:
+                summary["rows_per_s"] = round(summary["throughput_rps"] * ROWS_PER_REQUEST[name](args))
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            result["comparison"] = compare(result, json.load(baseline_file), args.max_regression)
+        exit_code = 1 if any(entry["regression"] for entry in result["comparison"].values()) else 0
+
+    output = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(output + "\n")
+    print(output)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+Compara, a escala, la tabla de transacciones sin particionar con las dos
+formas de particionado de app/partitioning.py (por año de transaction_date y
+por hash de user_id): latencia de las altas (una fila por transacción y lotes
+de 1000), de las consultas de un intervalo reciente (la primera página del
+listado de un usuario en los últimos 30 días y el gasto total de los últimos
+30 días) y coste de retirar el año más antiguo (DELETE frente a borrar su
+partición), además del tamaño de tabla e índices. Devuelve los resultados en JSON.
+
+Solo PostgreSQL. Trabaja sobre tablas propias (bench_tx_plain, bench_tx_range
+y bench_tx_hash) con las columnas e índices B-tree de 'transactions' y los
+mismos datos, en la base de datos de DATABASE_URL, y las borra al terminar.
+
+Uso (desde la carpeta del backend):
+    python -m benchmarks.partitioning [--rows 5000000] [--users 1000] [--years 5]
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, text
+
+from benchmarks.load import percentile
+from benchmarks.seed import DESCRIPTIONS
+
+LAYOUTS = ("plain", "range", "hash")
+COLUMNS = """
+    transaction_id serial NOT NULL,
+    user_id integer NOT NULL,
+    amount numeric(10, 2) NOT NULL,
+    transaction_date date NOT NULL,
+    description text,
+    category_id integer NOT NULL,
+    type varchar(10) NOT NULL,
+    created_at timestamptz DEFAULT now(),
+    change_version integer NOT NULL DEFAULT 0,
+    updated_at timestamptz
+"""
+INDEXES = ("(user_id, transaction_date, transaction_id)", "(transaction_date)", "(user_id, change_version)")
+LIST_QUERY = (
+    "SELECT transaction_id, amount, transaction_date, description, type, category_id FROM {table} "
+    "WHERE user_id = :user_id AND transaction_date >= :since "
+    "ORDER BY transaction_date DESC, transaction_id DESC LIMIT 50"
+)
+TOTAL_QUERY = "SELECT sum(amount) FROM {table} WHERE transaction_date >= :since AND type = 'expense'"
+INSERT_ROW = (
+    "INSERT INTO {table} (user_id, amount, transaction_date, description, category_id, type, updated_at) "
+    "VALUES (:user_id, :amount, :transaction_date, 'Supermercado', 3, 'expense', now()) RETURNING transaction_id"
+)
+INSERT_BATCH = (
+    "INSERT INTO {table} (user_id, amount, transaction_date, description, category_id, type, updated_at) "
+    "SELECT 1 + (i * 7919) % :users, 12.34, :transaction_date, 'Supermercado', 3, 'expense', now() "
+    "FROM generate_series(1, 1000) AS i"
+)
+
+
+def table_name(layout: str) -> str:
+    return f"bench_tx_{layout}"
+
+
+def create_tables(conn, first_year: int, last_year: int, hash_partitions: int):
+    """Crea las tres tablas vacías (con sus particiones, sin índices)."""
+    drop_tables(conn)
+    conn.execute(text(f"CREATE TABLE bench_tx_plain ({COLUMNS}, PRIMARY KEY (transaction_id))"))
+    conn.execute(text(f"CREATE TABLE bench_tx_range ({COLUMNS}) PARTITION BY RANGE (transaction_date)"))
+    conn.execute(text("CREATE TABLE bench_tx_range_default PARTITION OF bench_tx_range DEFAULT"))
+    for year in range(first_year, last_year + 1):
+        conn.execute(text(f"CREATE TABLE bench_tx_range_y{year} PARTITION OF bench_tx_range "
+                          f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"))
+    conn.execute(text(f"CREATE TABLE bench_tx_hash ({COLUMNS}) PARTITION BY HASH (user_id)"))
+    for remainder in range(hash_partitions):
+        conn.execute(text(f"CREATE TABLE bench_tx_hash_h{remainder:02d} PARTITION OF bench_tx_hash "
+                          f"FOR VALUES WITH (MODULUS {hash_partitions}, REMAINDER {remainder})"))
+
+
+def drop_tables(conn):
+    for layout in LAYOUTS:
+        conn.execute(text(f"DROP TABLE IF EXISTS {table_name(layout)}"))
+
+
+def load_data(conn, rows: int, users: int, days: int, log):
+    """Siembra las filas en la tabla sin particionar y las copia a las otras dos; después crea los índices."""
+    start = time.perf_counter()
+    descriptions = "ARRAY[" + ", ".join(f"'{d}'" for d in DESCRIPTIONS) + "]"
+    conn.execute(text("SELECT setseed(0.42)"))
+    conn.execute(text(
+        f"INSERT INTO bench_tx_plain (user_id, amount, transaction_date, description, category_id, type, updated_at) "
+        f"SELECT 1 + (i::bigint * 7919) % :users, round((1 + random() * 2000)::numeric, 2), "
+        f"current_date - (random() * :days)::integer, ({descriptions})[1 + i % {len(DESCRIPTIONS)}], "
+        f"CASE WHEN i % 7 = 0 THEN 1 ELSE 3 + i % 7 END, "
+        f"CASE WHEN i % 7 = 0 THEN 'income' ELSE 'expense' END, now() "
+        f"FROM generate_series(1, :rows) AS i"
+    ), {"users": users, "days": days, "rows": rows})
+    for layout in ("range", "hash"):
+        conn.execute(text(f"INSERT INTO {table_name(layout)} SELECT * FROM bench_tx_plain"))
+        conn.execute(text(f"SELECT setval(pg_get_serial_sequence('{table_name(layout)}', 'transaction_id'), "
+                          f"(SELECT max(transaction_id) FROM bench_tx_plain))"))
+    log(f"{rows} filas sembradas en {time.perf_counter() - start:.1f} s")
+
+    start = time.perf_counter()
+    conn.execute(text("ALTER TABLE bench_tx_range ADD PRIMARY KEY (transaction_id, transaction_date)"))
+    conn.execute(text("ALTER TABLE bench_tx_hash ADD PRIMARY KEY (transaction_id, user_id)"))
+    for layout in LAYOUTS:
+        for number, columns in enumerate(INDEXES):
+            conn.execute(text(f"CREATE INDEX {table_name(layout)}_idx{number} ON {table_name(layout)} {columns}"))
+        conn.execute(text(f"VACUUM ANALYZE {table_name(layout)}"))
+    log(f"Índices creados en {time.perf_counter() - start:.1f} s")
+
+
+def timed(conn, statement: str, params_list) -> dict:
+    """Ejecuta la sentencia con cada juego de parámetros (cada una es su propia transacción) y resume las latencias."""
+    latencies = []
+    for params in params_list:
+        start = time.perf_counter()
+        rows = conn.execute(text(statement), params)
+        if rows.returns_rows:
+            rows.all()
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "count": len(latencies),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+    }
+
+
+def sizes(conn, layout: str) -> dict:
+    """Tamaño total (tablas e índices, en MB) y del índice más grande (el que más pesa en cada inserción)."""
+    relations = (f"SELECT relid FROM pg_partition_tree('{table_name(layout)}') WHERE isleaf"
+                 if layout != "plain" else f"SELECT '{table_name(layout)}'::regclass AS relid")
+    total, largest_index = conn.execute(text(
+        f"SELECT sum(pg_total_relation_size(r.relid)), "
+        f"(SELECT max(pg_relation_size(i.indexrelid)) FROM pg_index i WHERE i.indrelid IN ({relations})) "
+        f"FROM ({relations}) AS r"
+    )).one()
+    return {"total_mb": round(int(total) / 2 ** 20, 1), "largest_index_mb": round(int(largest_index) / 2 ** 20, 1)}
+
+
+def retire_year(conn, layout: str, year: int) -> float:
+    """Milisegundos en borrar todas las filas de 'year' (en 'range', borrando su partición)."""
+    start = time.perf_counter()
+    if layout == "range":
+        conn.execute(text(f"DROP TABLE bench_tx_range_y{year}"))
+    else:
+        conn.execute(text(f"DELETE FROM {table_name(layout)} "
+                          f"WHERE transaction_date >= '{year}-01-01' AND transaction_date < '{year + 1}-01-01'"))
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.partitioning",
+                                     description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--years", type=int, default=5, help="Años de historia sembrados")
+    parser.add_argument("--hash-partitions", type=int, default=16)
+    parser.add_argument("--samples", type=int, default=1000, help="Mediciones por operación")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    from app.database import DATABASE_URL
+
+    engine = create_engine(DATABASE_URL, isolation_level="AUTOCOMMIT")
+    if engine.dialect.name != "postgresql":
+        print("Este benchmark necesita PostgreSQL (DATABASE_URL).", file=sys.stderr)
+        return 2
+
+    log = lambda message: print(message, file=sys.stderr)  # noqa: E731
+    rng = random.Random(args.seed)
+    today = date.today()
+    since = today - timedelta(days=30)
+    oldest_year = today.year - args.years
+    result = {"rows": args.rows, "users": args.users, "years": args.years,
+              "hash_partitions": args.hash_partitions, "layouts": {}}
+    with engine.connect() as conn:
+        create_tables(conn, oldest_year, today.year + 1, args.hash_partitions)
+        try:
+            load_data(conn, args.rows, args.users, args.years * 365, log)
+            user_ids = [rng.randint(1, args.users) for _ in range(args.samples)]
+            for layout in LAYOUTS:
+                table = table_name(layout)
+                log(f"Midiendo {layout}...")
+                result["layouts"][layout] = {
+                    **sizes(conn, layout),
+                    "recent_list": timed(conn, LIST_QUERY.format(table=table),
+                                         [{"user_id": user_id, "since": since} for user_id in user_ids]),
+                    "recent_total": timed(conn, TOTAL_QUERY.format(table=table),
+                                          [{"since": since}] * max(5, args.samples // 20)),
+                    "insert_row": timed(conn, INSERT_ROW.format(table=table),
+                                        [{"user_id": user_id, "amount": "12.34", "transaction_date": today}
+                                         for user_id in user_ids]),
+                    "insert_batch_1000": timed(conn, INSERT_BATCH.format(table=table),
+                                               [{"users": args.users, "transaction_date": today}]
+                                               * max(1, args.samples // 20)),
+                    "retire_oldest_year_ms": retire_year(conn, layout, oldest_year),
+                }
+        finally:
+            drop_tables(conn)
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
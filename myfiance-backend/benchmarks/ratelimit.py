@@ -0,0 +1,120 @@
+"""
+Microbenchmark de los límites de peticiones (app.ratelimit): el coste de
+MemoryBackend.take() con uno y varios hilos, el de RateLimit.hit() (lo que
+añade la dependencia a cada petición) y, como referencia, el tiempo por
+petición de una aplicación FastAPI mínima (sin base de datos) con y sin la
+dependencia by_ip. Devuelve los resultados en JSON.
+
+Uso (desde la carpeta del backend):
+    python -m benchmarks.ratelimit [--calls 200000] [--threads 8] [--requests 5000]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+
+from app.ratelimit import MemoryBackend, RateLimit, by_ip, set_backend
+
+# Límite que no se alcanza: se mide el camino habitual, en el que se concede el token
+UNREACHABLE_LIMIT = "1000000000/second"
+
+
+def measure_take(calls: int, threads: int, keys: int) -> float:
+    """Nanosegundos por llamada a take() (tiempo total / llamadas) repartidas entre 'threads' hilos."""
+    backend = MemoryBackend(max_keys=keys * 2)
+    per_thread = calls // threads
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(offset):
+        names = [f"bench:{(offset + i) % keys}" for i in range(per_thread)]
+        barrier.wait()
+        for name in names:
+            backend.take(name, 1e9, 1_000_000_000)
+
+    workers = [threading.Thread(target=worker, args=(i * 7919,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    return (time.perf_counter() - start) / (per_thread * threads) * 1e9
+
+
+async def measure_hit(calls: int, keys: int) -> float:
+    """Microsegundos por llamada a RateLimit.hit() en el bucle de eventos."""
+    limit = RateLimit("bench", UNREACHABLE_LIMIT)
+    names = [f"10.0.{i // 256 % 256}.{i % 256}" for i in range(keys)]
+    start = time.perf_counter()
+    for i in range(calls):
+        await limit.hit(names[i % keys])
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    limit = by_ip(RateLimit("bench", UNREACHABLE_LIMIT))
+
+    @app.get("/plain")
+    async def plain():
+        return {}
+
+    @app.get("/limited", dependencies=[Depends(limit)])
+    async def limited():
+        return {}
+
+    return app
+
+
+async def measure_requests(app: FastAPI, path: str, requests: int) -> float:
+    """Microsegundos por petición en proceso (transporte ASGI de httpx, sin red)."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(200):  # Calentamiento
+            await client.get(path)
+        start = time.perf_counter()
+        for _ in range(requests):
+            response = await client.get(path)
+        assert response.status_code == 200
+        return (time.perf_counter() - start) / requests * 1e6
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.ratelimit", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--keys", type=int, default=10_000, help="Claves (usuarios o IPs) distintas")
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    result = {
+        "take_ns": {
+            "1_thread": round(measure_take(args.calls, 1, args.keys)),
+            f"{args.threads}_threads": round(measure_take(args.calls, args.threads, args.keys)),
+        },
+    }
+
+    set_backend(MemoryBackend())
+    result["hit_us"] = round(asyncio.run(measure_hit(args.calls, args.keys)), 2)
+
+    app = build_app()
+    # Se alternan para repartir el ruido entre ambas rutas y se toma el mejor de cada una
+    plain, limited = [], []
+    for _ in range(3):
+        plain.append(asyncio.run(measure_requests(app, "/plain", args.requests)))
+        limited.append(asyncio.run(measure_requests(app, "/limited", args.requests)))
+    result["request_us"] = {
+        "without_limit": round(min(plain), 1),
+        "with_limit": round(min(limited), 1),
+    }
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
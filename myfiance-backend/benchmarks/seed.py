@@ -0,0 +1,119 @@
+"""
+Puebla la base de datos con usuarios y transacciones sintéticos para los
+benchmarks. Es idempotente: crea solo los usuarios que falten y completa sus
+transacciones hasta el objetivo, así que repetirlo con la misma escala no
+añade nada. Los datos son deterministas para una misma semilla.
+
+Uso (desde la carpeta del backend, con la base de datos ya migrada):
+    python -m benchmarks.seed --users 10 --transactions 100000
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import func, insert, select
+
+BENCH_EMAIL = "bench-user-{}@example.com"
+BENCH_PASSWORD = "benchpassword"
+INCOME_CATEGORY_IDS = (1, 2)
+EXPENSE_CATEGORY_IDS = (3, 4, 5, 6, 7, 8, 9)
+DESCRIPTIONS = ("Supermercado", "Alquiler", "Gasolina", "Cine", "Farmacia", "Curso online",
+                "Nómina", "Dividendos", "Restaurante", "Transferencia a ahorro", "Luz", "Agua")
+DATE_RANGE_DAYS = 3 * 365
+
+
+def bench_email(index: int) -> str:
+    return BENCH_EMAIL.format(index)
+
+
+def _synthetic_rows(rng: random.Random, user_id: int, count: int, today: date):
+    for _ in range(count):
+        is_income = rng.random() < 0.15
+        yield {
+            "user_id": user_id,
+            "amount": Decimal(rng.randint(100, 200000)) / 100,
+            "transaction_date": today - timedelta(days=rng.randrange(DATE_RANGE_DAYS)),
+            "description": rng.choice(DESCRIPTIONS),
+            "category_id": rng.choice(INCOME_CATEGORY_IDS if is_income else EXPENSE_CATEGORY_IDS),
+            "type": "income" if is_income else "expense",
+        }
+
+
+def seed(users: int, transactions: int, batch_size: int = 10000, random_seed: int = 42, log=print) -> dict:
+    """
+    Asegura 'users' usuarios de benchmark con 'transactions' transacciones en
+    total, repartidas a partes iguales. Devuelve los IDs de los usuarios.
+    """
+    from app import crud, models
+    from app.database import SessionLocal
+    from app.hashing import pwd_context
+
+    db = SessionLocal()
+    try:
+        emails = [bench_email(i) for i in range(users)]
+        existing = dict(db.execute(
+            select(models.User.email, models.User.user_id).where(models.User.email.in_(emails))
+        ).all())
+        missing = [email for email in emails if email not in existing]
+        if missing:
+            # Un único hash para todos: bcrypt es deliberadamente lento
+            password_hash = pwd_context.hash(BENCH_PASSWORD)
+            db.execute(insert(models.User), [
+                {"email": email, "username": email, "password_hash": password_hash} for email in missing
+            ])
+            db.commit()
+            existing = dict(db.execute(
+                select(models.User.email, models.User.user_id).where(models.User.email.in_(emails))
+            ).all())
+        user_ids = [existing[email] for email in emails]
+
+        counts = dict(db.execute(
+            select(models.Transaction.user_id, func.count())
+            .where(models.Transaction.user_id.in_(user_ids))
+            .group_by(models.Transaction.user_id)
+        ).all())
+
+        start = time.perf_counter()
+        inserted = 0
+        today = date.today()
+        for index, user_id in enumerate(user_ids):
+            target = transactions // users + (1 if index < transactions % users else 0)
+            pending = target - counts.get(user_id, 0)
+            if pending <= 0:
+                continue
+            rng = random.Random(f"{random_seed}-{user_id}-{counts.get(user_id, 0)}")
+            rows = _synthetic_rows(rng, user_id, pending, today)
+            while pending > 0:
+                batch = [next(rows) for _ in range(min(batch_size, pending))]
+                db.execute(insert(models.Transaction), batch)
+                db.commit()
+                pending -= len(batch)
+                inserted += len(batch)
+            crud.rebuild_rollups(db, user_id=user_id)
+            db.commit()
+            log(f"usuario {user_id}: {target} transacciones")
+
+        elapsed = time.perf_counter() - start
+        if inserted:
+            log(f"{inserted} transacciones insertadas en {elapsed:.1f} s ({inserted / elapsed:.0f} filas/s)")
+        return {"user_ids": user_ids, "inserted": inserted}
+    finally:
+        db.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.seed", description="Datos sintéticos para benchmarks")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--transactions", type=int, default=10000, help="Total, repartido entre los usuarios")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+    seed(args.users, args.transactions, batch_size=args.batch_size, random_seed=args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
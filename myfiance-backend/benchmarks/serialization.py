@@ -0,0 +1,105 @@
+"""
+Serialización del listado de transacciones: compara la vía con Pydantic
+(objetos ORM validados como List[TransactionRead] y codificados con
+dump_json, lo que hacía el endpoint con response_model) con la vía rápida
+(tuplas de columnas, transaction_rows_to_dicts y FastJSONResponse), esta con
+orjson y con el módulo json estándar. Comprueba que todas producen los mismos
+bytes y devuelve en JSON los microsegundos por fila.
+
+Solo mide la serialización: las filas se leen una vez antes de medir. Migra la
+base de datos y siembra con benchmarks.seed un único usuario (bench-user-0)
+con --rows transacciones.
+
+Uso (desde la carpeta del backend):
+    python -m benchmarks.serialization [--rows 10000] [--repeat 5]
+"""
+import argparse
+import contextlib
+import json
+import sys
+import time
+from typing import List
+
+from benchmarks.seed import seed
+
+
+def best_seconds(function, repeat: int) -> float:
+    """Mejor tiempo de 'repeat' llamadas a 'function'."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+@contextlib.contextmanager
+def json_encoder(responses, encoder):
+    """Sustituye app.responses.orjson por 'encoder' (None = módulo json estándar)."""
+    saved = responses.orjson
+    responses.orjson = encoder
+    try:
+        yield
+    finally:
+        responses.orjson = saved
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.serialization",
+                                     description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000, help="Transacciones serializadas en cada pasada")
+    parser.add_argument("--repeat", type=int, default=5, help="Pasadas por vía (se toma la mejor)")
+    args = parser.parse_args(argv)
+
+    from pydantic import TypeAdapter
+
+    from app import crud, responses, schemas
+    from app.cli import init_db
+    from app.database import SessionLocal
+    from app.responses import FastJSONResponse
+    from app.routers.transactions import transaction_rows_to_dicts
+
+    log = lambda message: print(message, file=sys.stderr)  # noqa: E731
+    with contextlib.redirect_stdout(sys.stderr):  # stdout queda solo para el JSON
+        init_db()
+    [user_id] = seed(1, args.rows, log=log)["user_ids"]
+
+    adapter = TypeAdapter(List[schemas.TransactionRead])
+    db = SessionLocal()
+    try:
+        rows = crud.get_transactions_by_user(db, user_id, limit=args.rows, as_rows=True)
+        objects = crud.get_transactions_by_user(db, user_id, limit=args.rows)
+
+        def fast_path(encoder):
+            def serialize():
+                with json_encoder(responses, encoder):
+                    return FastJSONResponse(transaction_rows_to_dicts(db, rows)).body
+            return serialize
+
+        paths = {"pydantic": lambda: adapter.dump_json(adapter.validate_python(objects))}
+        if responses.orjson is not None:
+            paths["fast_orjson"] = fast_path(responses.orjson)
+        paths["fast_json"] = fast_path(None)
+
+        reference = paths["pydantic"]()
+        result = {"rows": len(rows), "repeat": args.repeat, "paths": {}}
+        for name, path in paths.items():
+            log(f"Serializando por la vía {name}...")
+            seconds = best_seconds(path, args.repeat)
+            result["paths"][name] = {
+                "us_per_row": round(seconds * 1e6 / len(rows), 3),
+                "seconds": round(seconds, 4),
+                "same_bytes": path() == reference,
+            }
+    finally:
+        db.close()
+
+    pydantic_us = result["paths"]["pydantic"]["us_per_row"]
+    for entry in result["paths"].values():
+        entry["speedup"] = round(pydantic_us / entry["us_per_row"], 2) if entry["us_per_row"] else None
+    print(json.dumps(result, indent=2))
+    return 0 if all(entry["same_bytes"] for entry in result["paths"].values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+Arranque de la API para los benchmarks: lanza app.main:app con uvicorn en un
+proceso aparte y espera a que responda. Las sentencias SQL de cada petición se
+leen de la cabecera Server-Timing que añade app.instrumentation.
+"""
+import contextlib
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_STATEMENTS_RE = re.compile(r'db-statements;desc="(\d+)"')
+
+
+def statements_from_server_timing(header):
+    """Número de sentencias SQL de la cabecera Server-Timing, o None si no viene."""
+    match = _STATEMENTS_RE.search(header or "")
+    return int(match.group(1)) if match else None
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_environment(env: dict = None) -> dict:
+    """Entorno con el que start_server lanza la API: el del proceso más 'env'."""
+    return {"RATE_LIMIT_ENABLED": "false", **os.environ, **(env or {})}
+
+
+@contextlib.contextmanager
+def start_server(env: dict = None, workers: int = 1, timeout: float = 30.0):
+    """
+    Lanza la API con uvicorn y espera a que responda.
+    Devuelve (host, puerto) y para el servidor al salir del bloque.
+    Los límites de peticiones (app.ratelimit) se desactivan salvo que el
+    entorno indique RATE_LIMIT_ENABLED: la carga viene de pocos usuarios y una IP.
+    """
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app",
+         "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=server_environment(env), stdout=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn terminó con código {server.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1):
+                    break
+            except (urllib.error.URLError, ConnectionError):
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"El servidor no respondió en {timeout} s")
+                time.sleep(0.05)
+        yield "127.0.0.1", port
+    finally:
+        server.terminate()
+        server.wait()
@@ -0,0 +1,55 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+from app import models  # noqa: F401  (registra las tablas en Base.metadata)
+from app.database import DATABASE_URL, Base
+from app.partitioning import is_partition_name
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Objetos de búsqueda de texto que solo existen en las migraciones (dependen del
+# dialecto) y que 'alembic check' / autogenerate no debe proponer borrar
+UNMANAGED_INDEXES = {"idx_transactions_description_fts"}
+UNMANAGED_TABLE_PREFIX = "transactions_fts"
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    if type_ == "table" and name.startswith(UNMANAGED_TABLE_PREFIX):
+        return False
+    # Las particiones de 'transactions' (si está particionada) no son tablas del modelo
+    if type_ == "table" and is_partition_name(name):
+        return False
+    if type_ == "index" and name in UNMANAGED_INDEXES:
+        return False
+    return True
+
+
+def run_migrations_offline():
+    """Genera el SQL de las migraciones sin conectarse ('alembic upgrade head --sql')."""
+    context.configure(url=DATABASE_URL, target_metadata=target_metadata, literal_binds=True,
+                      include_object=include_object)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Aplica las migraciones con una conexión propia, fuera del pool de la aplicación."""
+    connectable = create_engine(DATABASE_URL, poolclass=NullPool)
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata,
+                          include_object=include_object)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
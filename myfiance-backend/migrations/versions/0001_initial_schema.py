@@ -0,0 +1,135 @@
+"""Esquema inicial (equivalente a schema.sql) y categorías iniciales
+
+Es idempotente: sobre una base de datos creada antes con schema.sql o con
+Base.metadata.create_all solo crea lo que falte, así que puede aplicarse
+directamente sin 'alembic stamp'. En modo offline ('--sql') genera el esquema
+completo, como si la base de datos estuviera vacía.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INITIAL_CATEGORIES = [
+    "Ingreso - Salario",
+    "Ingreso - Inversiones",
+    "Gasto - Alimentos",
+    "Gasto - Vivienda",
+    "Gasto - Transporte",
+    "Gasto - Ocio",
+    "Gasto - Salud",
+    "Gasto - Educación",
+    "Gasto - Ahorro",
+]
+
+# Índices que creaba Base.metadata.create_all con los modelos anteriores y que
+# duplican la clave primaria o idx_transactions_date; 'idx_transactions_user_id'
+# (schema.sql anterior) lo sustituye idx_transactions_user_date_id
+REDUNDANT_INDEXES = {
+    "users": ["ix_users_user_id"],
+    "categories": ["ix_categories_category_id"],
+    "transactions": ["ix_transactions_transaction_id", "ix_transactions_transaction_date",
+                     "idx_transactions_user_id"],
+}
+
+
+def _existing_tables():
+    if context.is_offline_mode():
+        return set()
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def _existing_indexes(table):
+    if context.is_offline_mode():
+        return set()
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    dialect = op.get_context().dialect.name
+    tables = _existing_tables()
+
+    if "users" not in tables:
+        op.create_table(
+            "users",
+            sa.Column("user_id", sa.Integer, primary_key=True),
+            sa.Column("username", sa.String(50), nullable=False, unique=True),
+            sa.Column("email", sa.String(100), nullable=False, unique=True),
+            sa.Column("password_hash", sa.String(255), nullable=False),
+            sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.func.now()),
+        )
+
+    if "categories" not in tables:
+        op.create_table(
+            "categories",
+            sa.Column("category_id", sa.Integer, primary_key=True),
+            sa.Column("category_name", sa.String(50), nullable=False, unique=True),
+        )
+
+    if "transactions" not in tables:
+        op.create_table(
+            "transactions",
+            sa.Column("transaction_id", sa.Integer, primary_key=True),
+            sa.Column("user_id", sa.Integer, sa.ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False),
+            sa.Column("amount", sa.Numeric(10, 2), nullable=False),
+            sa.Column("transaction_date", sa.Date, nullable=False),
+            sa.Column("description", sa.Text),
+            sa.Column("category_id", sa.Integer, sa.ForeignKey("categories.category_id"), nullable=False),
+            sa.Column("type", sa.String(10), nullable=False),
+            sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.func.now()),
+            sa.CheckConstraint("type IN ('income', 'expense')", name="transactions_type_check"),
+        )
+
+    indexes = _existing_indexes("transactions")
+    if "idx_transactions_user_date_id" not in indexes:
+        op.create_index("idx_transactions_user_date_id", "transactions",
+                        ["user_id", "transaction_date", "transaction_id"])
+    if "idx_transactions_date" not in indexes:
+        op.create_index("idx_transactions_date", "transactions", ["transaction_date"])
+
+    for table, names in REDUNDANT_INDEXES.items():
+        for name in set(names) & _existing_indexes(table):
+            op.drop_index(name, table_name=table)
+
+    if "monthly_rollups" not in tables:
+        op.create_table(
+            "monthly_rollups",
+            sa.Column("user_id", sa.Integer, sa.ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("year_month", sa.String(7), primary_key=True),
+            sa.Column("category_id", sa.Integer, sa.ForeignKey("categories.category_id"), primary_key=True),
+            sa.Column("type", sa.String(10), primary_key=True),
+            sa.Column("total", sa.Numeric(14, 2), nullable=False, server_default="0"),
+            sa.Column("count", sa.Integer, nullable=False, server_default="0"),
+            sa.CheckConstraint("type IN ('income', 'expense')", name="monthly_rollups_type_check"),
+        )
+        # Calcula los totales de las transacciones que ya existieran
+        year_month = ("strftime('%Y-%m', transaction_date)" if dialect == "sqlite"
+                      else "to_char(transaction_date, 'YYYY-MM')")
+        op.execute(
+            "INSERT INTO monthly_rollups (user_id, year_month, category_id, type, total, count) "
+            f"SELECT user_id, {year_month}, category_id, type, SUM(amount), COUNT(*) "
+            f"FROM transactions GROUP BY user_id, {year_month}, category_id, type"
+        )
+
+    # Categorías iniciales: solo las que falten
+    categories = sa.table("categories", sa.column("category_name", sa.String))
+    existing = set() if context.is_offline_mode() else {
+        name for (name,) in op.get_bind().execute(sa.select(categories.c.category_name))
+    }
+    missing = [{"category_name": name} for name in INITIAL_CATEGORIES if name not in existing]
+    if missing:
+        op.bulk_insert(categories, missing)
+
+
+def downgrade():
+    op.drop_table("monthly_rollups")
+    op.drop_table("transactions")
+    op.drop_table("categories")
+    op.drop_table("users")
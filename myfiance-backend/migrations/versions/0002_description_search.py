@@ -0,0 +1,65 @@
+"""Índice de búsqueda de texto sobre la descripción de las transacciones
+
+PostgreSQL: índice GIN sobre to_tsvector('spanish', description). Es un índice
+de expresión en lugar de una columna tsvector almacenada: la consulta usa la
+misma expresión (ver crud.search_transactions) y no añade una columna que
+mantener en cada escritura.
+
+SQLite: tabla virtual FTS5 con contenido externo ('transactions'), mantenida
+por triggers, para que las escrituras de la aplicación no tengan que hacer nada.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+SQLITE_STATEMENTS = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+        description, content='transactions', content_rowid='transaction_id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_insert AFTER INSERT ON transactions BEGIN
+        INSERT INTO transactions_fts (rowid, description) VALUES (new.transaction_id, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_delete AFTER DELETE ON transactions BEGIN
+        INSERT INTO transactions_fts (transactions_fts, rowid, description)
+        VALUES ('delete', old.transaction_id, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_update AFTER UPDATE OF description ON transactions BEGIN
+        INSERT INTO transactions_fts (transactions_fts, rowid, description)
+        VALUES ('delete', old.transaction_id, old.description);
+        INSERT INTO transactions_fts (rowid, description) VALUES (new.transaction_id, new.description);
+    END""",
+    # Indexa las transacciones que ya existieran
+    "INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade():
+    if op.get_context().dialect.name == "sqlite":
+        for statement in SQLITE_STATEMENTS:
+            op.execute(statement)
+        return
+
+    # CONCURRENTLY no bloquea las escrituras, pero no puede ir dentro de una transacción
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transactions_description_fts ON transactions "
+            "USING gin (to_tsvector('spanish'::regconfig, coalesce(description, '')))"
+        )
+
+
+def downgrade():
+    if op.get_context().dialect.name == "sqlite":
+        for trigger in ("transactions_fts_insert", "transactions_fts_delete", "transactions_fts_update"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS transactions_fts")
+        return
+
+    op.execute("DROP INDEX IF EXISTS idx_transactions_description_fts")
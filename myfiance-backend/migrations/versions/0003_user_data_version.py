@@ -0,0 +1,27 @@
+"""Versión de los datos de cada usuario (ETag / Last-Modified del listado)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("users", sa.Column("data_version", sa.Integer(), nullable=False, server_default="0"))
+    # Sin valor por defecto en la base de datos: SQLite no admite CURRENT_TIMESTAMP
+    # en ADD COLUMN. Lo rellena la aplicación al crear el usuario y en cada escritura
+    op.add_column("users", sa.Column("data_updated_at", sa.TIMESTAMP(timezone=True), nullable=True))
+    op.execute("UPDATE users SET data_updated_at = created_at")
+
+
+def downgrade():
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("data_updated_at")
+        batch_op.drop_column("data_version")
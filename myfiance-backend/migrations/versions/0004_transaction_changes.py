@@ -0,0 +1,52 @@
+"""Cambios incrementales: versión y fecha de modificación de cada transacción y tombstones
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("users", sa.Column("sync_floor_version", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("transactions", sa.Column("change_version", sa.Integer(), nullable=False, server_default="0"))
+    # Como users.data_updated_at: sin valor por defecto en la base de datos (SQLite no lo
+    # admite en ADD COLUMN), lo rellena la aplicación en cada escritura
+    op.add_column("transactions", sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=True))
+    op.execute("UPDATE transactions SET updated_at = created_at")
+
+    op.create_table(
+        "transaction_tombstones",
+        sa.Column("transaction_id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("change_version", sa.Integer(), nullable=False),
+        sa.Column("deleted_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.user_id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("transaction_id"),
+    )
+    op.create_index("idx_transaction_tombstones_user_change", "transaction_tombstones",
+                    ["user_id", "change_version"])
+
+    if op.get_context().dialect.name == "postgresql":
+        # CONCURRENTLY no bloquea las escrituras, pero no puede ir dentro de una transacción
+        with op.get_context().autocommit_block():
+            op.create_index("idx_transactions_user_change", "transactions", ["user_id", "change_version"],
+                            postgresql_concurrently=True, if_not_exists=True)
+    else:
+        op.create_index("idx_transactions_user_change", "transactions", ["user_id", "change_version"])
+
+
+def downgrade():
+    op.drop_index("idx_transactions_user_change", table_name="transactions")
+    op.drop_table("transaction_tombstones")
+    with op.batch_alter_table("transactions") as batch_op:
+        batch_op.drop_column("updated_at")
+        batch_op.drop_column("change_version")
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("sync_floor_version")
@@ -0,0 +1,54 @@
+"""Totales de las transacciones archivadas y particionado opcional de 'transactions'
+
+Crea archived_monthly_totals (ver crud.archive_transactions). En PostgreSQL,
+si TRANSACTIONS_PARTITION_BY está definida ('range' o 'hash'), convierte además
+'transactions' en una tabla particionada conservando sus filas (ver
+app/partitioning.py); el downgrade la vuelve a convertir en una tabla normal.
+Para particionar una base de datos que ya está en esta versión:
+'alembic downgrade 0004' y 'alembic upgrade head' con la variable definida.
+En modo offline ('--sql') no se genera el particionado.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+from app import partitioning
+from app.database import TRANSACTIONS_HASH_PARTITIONS, TRANSACTIONS_PARTITION_BY
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "archived_monthly_totals",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("year_month", sa.String(7), nullable=False),
+        sa.Column("category_id", sa.Integer(), nullable=False),
+        sa.Column("type", sa.String(10), nullable=False),
+        sa.Column("total", sa.Numeric(14, 2), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.CheckConstraint("type IN ('income', 'expense')", name="archived_monthly_totals_type_check"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.user_id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["category_id"], ["categories.category_id"]),
+        sa.PrimaryKeyConstraint("user_id", "year_month", "category_id", "type"),
+    )
+
+    if context.is_offline_mode() or op.get_context().dialect.name != "postgresql":
+        return
+    connection = op.get_bind()
+    if TRANSACTIONS_PARTITION_BY and partitioning.partition_method(connection) is None:
+        partitioning.partition_transactions(connection, TRANSACTIONS_PARTITION_BY, TRANSACTIONS_HASH_PARTITIONS)
+
+
+def downgrade():
+    if not context.is_offline_mode() and op.get_context().dialect.name == "postgresql":
+        connection = op.get_bind()
+        if partitioning.partition_method(connection) is not None:
+            partitioning.unpartition_transactions(connection)
+    op.drop_table("archived_monthly_totals")
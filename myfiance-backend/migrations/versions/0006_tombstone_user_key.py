@@ -0,0 +1,54 @@
+"""Clave de los tombstones: (transaction_id, user_id)
+
+SQLite reutiliza el ID de la última transacción borrada, también para otro
+usuario: con transaction_id como única clave, el tombstone de un usuario se
+sobrescribía con el del siguiente que borrase ese ID y el primero dejaba de
+recibir el borrado en GET /transactions/changes.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+PRIMARY_KEY = "transaction_tombstones_pkey"
+
+
+def _set_primary_key(columns):
+    if op.get_context().dialect.name == "postgresql":
+        op.drop_constraint(PRIMARY_KEY, "transaction_tombstones", type_="primary")
+        op.create_primary_key(PRIMARY_KEY, "transaction_tombstones", columns)
+        return
+    # SQLite no puede cambiar la clave primaria: batch recrea la tabla con esta definición
+    table = sa.Table(
+        "transaction_tombstones", sa.MetaData(),
+        sa.Column("transaction_id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False),
+        sa.Column("change_version", sa.Integer(), nullable=False),
+        sa.Column("deleted_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint(*columns, name=PRIMARY_KEY),
+        sa.Index("idx_transaction_tombstones_user_change", "user_id", "change_version"),
+    )
+    with op.batch_alter_table("transaction_tombstones", copy_from=table, recreate="always"):
+        pass
+
+
+def upgrade():
+    _set_primary_key(["transaction_id", "user_id"])
+
+
+def downgrade():
+    # De cada ID se conserva el borrado más reciente, el que habría guardado la clave anterior
+    op.execute(
+        "DELETE FROM transaction_tombstones WHERE EXISTS ("
+        "SELECT 1 FROM transaction_tombstones newer "
+        "WHERE newer.transaction_id = transaction_tombstones.transaction_id "
+        "AND (newer.deleted_at, newer.user_id) > (transaction_tombstones.deleted_at, transaction_tombstones.user_id))"
+    )
+    _set_primary_key(["transaction_id"])
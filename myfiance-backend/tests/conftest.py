@@ -0,0 +1,145 @@
+"""
+Fixtures de los tests: una base de datos temporal migrada con Alembic, un
+TestClient de la aplicación, usuarios con su token y un contador de las
+sentencias SQL que se envían a la base de datos.
+
+Por defecto se usa un fichero SQLite nuevo en cada ejecución; con
+TEST_DATABASE_URL se puede apuntar a otra base de datos (p. ej. PostgreSQL),
+que debe estar vacía o ser desechable.
+"""
+import itertools
+import os
+import tempfile
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, List
+
+# La configuración se lee al importar app.database: se fija antes de importar la aplicación
+_tmpdir = tempfile.mkdtemp(prefix="myfiance-tests-")
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL") or f"sqlite:///{os.path.join(_tmpdir, 'test.db')}"
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ.pop("DATABASE_REPLICA_URLS", None)
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event, select  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+
+from app import auth, cli, crud, models, schemas  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+
+# Hash bcrypt fijo: crear usuarios en los tests no debe pagar el coste del hashing
+PASSWORD = "testpassword"
+PASSWORD_HASH = auth.get_password_hash(PASSWORD)
+EXPENSE_CATEGORY_ID = 3
+
+# Únicos entre ejecuciones, por si TEST_DATABASE_URL apunta a una base de datos ya usada
+_run_id = uuid.uuid4().hex[:8]
+_emails = (f"test-user-{_run_id}-{n}@example.com" for n in itertools.count(1))
+
+
+@dataclass
+class TestUser:
+    __test__ = False  # No es una clase de tests
+
+    user_id: int
+    email: str
+    headers: Dict[str, str]
+
+
+def transaction_payload(**overrides) -> dict:
+    """Cuerpo de una transacción válida (un gasto de este mes)."""
+    return {"amount": "12.50", "transaction_date": date.today().replace(day=1).isoformat(),
+            "description": "Supermercado", "category_id": EXPENSE_CATEGORY_ID, "type": "expense", **overrides}
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    cli.init_db()
+    yield
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_user(db):
+    """Crea usuarios nuevos (sin pasar por /users/register) y devuelve su token en 'headers'."""
+    def make() -> TestUser:
+        email = next(_emails)
+        user = crud.create_user(db, schemas.UserCreate(email=email, password=PASSWORD), PASSWORD_HASH)
+        token = auth.create_access_token({"sub": email, "uid": user.user_id}, expires_delta=timedelta(hours=1))
+        return TestUser(user.user_id, email, {"Authorization": f"Bearer {token}"})
+    return make
+
+
+@pytest.fixture
+def user(make_user) -> TestUser:
+    return make_user()
+
+
+@pytest.fixture
+def add_transactions(db):
+    """
+    Crea 'count' transacciones del usuario con crud.bulk_create_user_transactions
+    (con sus totales mensuales) y devuelve sus IDs. Todas caen en el mismo
+    mes, categoría y tipo salvo que se indique otra cosa en 'overrides'.
+    """
+    def add(user: TestUser, count: int, **overrides) -> List[int]:
+        result = crud.bulk_create_user_transactions(
+            db, (transaction_payload(**overrides) for _ in range(count)), user.user_id
+        )
+        assert result["inserted"] == count, result["errors"]
+        return list(db.execute(
+            select(models.Transaction.transaction_id)
+            .where(models.Transaction.user_id == user.user_id)
+            .order_by(models.Transaction.transaction_id)
+        ).scalars())
+    return add
+
+
+class StatementCounter:
+    """Sentencias enviadas a la base de datos (un executemany cuenta como una)."""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@pytest.fixture
+def count_statements():
+    """
+    Context manager que cuenta las sentencias de todos los engines (incluida la
+    sesión propia de la exportación) con el evento before_cursor_execute.
+    """
+    @contextmanager
+    def counting():
+        counter = StatementCounter()
+        event.listen(Engine, "before_cursor_execute", counter)
+        try:
+            yield counter
+        finally:
+            event.remove(Engine, "before_cursor_execute", counter)
+    return counting
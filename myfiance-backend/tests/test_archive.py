@@ -0,0 +1,46 @@
+"""Archivo de años cerrados (crud.archive_transactions y 'python -m app.cli archive-years')."""
+from sqlalchemy import select
+
+from app import cli, models, partitioning
+
+ARCHIVED_YEAR = 2020
+
+
+def _versions(db, user):
+    db.expire_all()
+    return db.execute(select(models.User.data_version, models.User.sync_floor_version)
+                      .where(models.User.user_id == user.user_id)).one()
+
+
+def test_archive_years_keeps_summary_and_balance(client, db, user, add_transactions):
+    add_transactions(user, 3, transaction_date=f"{ARCHIVED_YEAR}-03-01", amount="100.00", type="income",
+                     category_id=1)
+    add_transactions(user, 2, transaction_date=f"{ARCHIVED_YEAR}-05-10", amount="30.00")
+    live_ids = add_transactions(user, 2)[-2:]  # 12.50 de gasto cada una, este mes
+    summary = client.get("/transactions/summary", headers=user.headers).json()
+    since = client.get("/transactions/changes", headers=user.headers).json()["cursor"]
+    version, floor = _versions(db, user)
+
+    assert cli.archive_years(ARCHIVED_YEAR + 1, user_id=user.user_id) == 0
+
+    assert client.get("/transactions/summary", headers=user.headers).json() == summary
+    listed = client.get("/transactions/", headers=user.headers).json()
+    assert [row["transaction_id"] for row in listed] == sorted(live_ids, reverse=True)
+    assert _versions(db, user) == (version + 1, version + 1) and floor < version + 1
+    assert client.get(f"/transactions/changes?since={since}", headers=user.headers).json()["reset"]
+
+    # 300 de ingresos y 60 de gastos archivados, más los 25 de gasto vivos
+    assert client.get("/analytics/balance", headers=user.headers).json()[-1]["balance"] == "215.00"
+    forecast = client.get("/analytics/forecast?horizon_days=1", headers=user.headers).json()
+    assert forecast["starting_balance"] == "215.00"
+
+
+def test_archive_years_rejects_open_years(user):
+    assert cli.archive_years(9999, user_id=user.user_id) == 2
+
+
+def test_partition_names():
+    assert partitioning.is_partition_name(partitioning.year_partition_name(ARCHIVED_YEAR))
+    assert partitioning.is_partition_name("transactions_h3")
+    assert partitioning.is_partition_name(partitioning.DEFAULT_PARTITION)
+    assert not partitioning.is_partition_name("transactions_old")
@@ -0,0 +1,54 @@
+"""
+Prueba de humo del modo DATABASE_ASYNC: la configuración se lee al importar la
+aplicación, así que se lanza en otro proceso (uvicorn, como en los benchmarks)
+contra la misma base de datos de los tests.
+"""
+import json
+import os
+import urllib.request
+
+import pytest
+from sqlalchemy.engine import make_url
+
+from app.database import ASYNC_DRIVERS, DATABASE_URL
+from benchmarks.server import start_server
+from conftest import transaction_payload
+
+pytest.importorskip("greenlet")
+pytest.importorskip(ASYNC_DRIVERS.get(make_url(DATABASE_URL).get_backend_name(), "async_driver_desconocido"))
+
+
+@pytest.fixture(scope="module")
+def async_server():
+    env = {"DATABASE_ASYNC": "true", "DATABASE_URL": os.environ["DATABASE_URL"]}
+    with start_server(env=env) as (host, port):
+        yield f"http://{host}:{port}"
+
+
+def _request(url: str, headers: dict, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(url, data=data, headers={**headers, "Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return response.status, json.loads(response.read())
+
+
+def test_async_routers_list_create_and_summary(async_server, user, add_transactions):
+    [existing_id] = add_transactions(user, 1)
+
+    status, pools = _request(f"{async_server}/metrics/db-pool", {})
+    assert "async" in [pool["pool"] for pool in pools["pools"]]
+
+    status, listed = _request(f"{async_server}/transactions/", user.headers)
+    assert status == 200 and [row["transaction_id"] for row in listed] == [existing_id]
+
+    status, created = _request(f"{async_server}/transactions/", user.headers,
+                               transaction_payload(amount="7.50", description="Café asíncrono"))
+    assert status == 200
+    assert (created["amount"], created["description"]) == ("7.50", "Café asíncrono")
+
+    status, listed = _request(f"{async_server}/transactions/", user.headers)
+    assert [row["transaction_id"] for row in listed] == [created["transaction_id"], existing_id]
+
+    status, summary = _request(f"{async_server}/transactions/summary", user.headers)
+    assert status == 200
+    assert summary["total_expense"] == "20.00"
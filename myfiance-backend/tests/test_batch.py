@@ -0,0 +1,96 @@
+"""Lotes de altas, modificaciones y borrados (POST /transactions/batch)."""
+import pytest
+from sqlalchemy import event, select
+
+from app import models
+from app.database import get_engine
+from conftest import transaction_payload
+
+MISSING_CATEGORY_ID = 999999
+MISSING_TRANSACTION_ID = 999999999
+
+
+def _data_version(db, user):
+    db.expire_all()
+    return db.execute(select(models.User.data_version).where(models.User.user_id == user.user_id)).scalar_one()
+
+
+def test_mixed_batch_reports_each_operation_and_commits_once(client, db, user, make_user, add_transactions):
+    own_id, deleted_id = add_transactions(user, 2)
+    other = make_user()
+    [other_id] = add_transactions(other, 1)
+    version = _data_version(db, user)
+    operations = [
+        {"op": "create", "data": transaction_payload(amount="7.25")},
+        {"op": "update", "transaction_id": own_id, "data": transaction_payload(amount="20.00")},
+        {"op": "delete", "transaction_id": deleted_id},
+        {"op": "update", "transaction_id": other_id, "data": transaction_payload(amount="1.00")},
+        {"op": "delete", "transaction_id": other_id},
+        {"op": "delete", "transaction_id": MISSING_TRANSACTION_ID},
+        {"op": "create", "data": transaction_payload(category_id=MISSING_CATEGORY_ID)},
+        {"op": "update", "transaction_id": deleted_id, "data": transaction_payload()},  # Ya borrada en el lote
+    ]
+
+    commits = []
+    listener = lambda conn: commits.append(conn)  # noqa: E731
+    event.listen(get_engine(), "commit", listener)
+    try:
+        response = client.post("/transactions/batch", headers=user.headers, json=operations)
+    finally:
+        event.remove(get_engine(), "commit", listener)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["applied"], body["failed"]) == (3, 5)
+    assert [(r["status"], r["detail"]) for r in body["results"]] == [
+        (201, None),
+        (200, None),
+        (204, None),
+        (403, "No tienes permisos para editar esta transacción"),
+        (403, "No tienes permiso para eliminar esta transacción"),
+        (404, "Transacción no encontrada"),
+        (422, f"category_id: la categoría {MISSING_CATEGORY_ID} no existe"),
+        (404, "Transacción no encontrada"),
+    ]
+    created_id = body["results"][0]["transaction_id"]
+    assert body["results"][1]["transaction"]["amount"] == "20.00"
+
+    # Las tres operaciones válidas, en una sola transacción y con un único incremento de versión
+    assert len(commits) == 1
+    assert _data_version(db, user) == version + 1
+    changes = client.get(f"/transactions/changes?since={version}", headers=user.headers).json()
+    assert changes["cursor"] == version + 1
+    assert sorted(row["transaction_id"] for row in changes["changed"]) == sorted([own_id, created_id])
+    assert changes["deleted"] == [deleted_id]
+    other_rows = client.get("/transactions/", headers=other.headers).json()
+    assert [(row["transaction_id"], row["amount"]) for row in other_rows] == [(other_id, "12.50")]
+
+
+def test_batch_without_valid_operations_changes_nothing(client, db, user):
+    version = _data_version(db, user)
+    response = client.post("/transactions/batch", headers=user.headers, json=[
+        {"op": "delete", "transaction_id": MISSING_TRANSACTION_ID},
+        {"op": "create", "data": transaction_payload(category_id=MISSING_CATEGORY_ID)},
+    ])
+
+    assert response.status_code == 200
+    assert (response.json()["applied"], response.json()["failed"]) == (0, 2)
+    assert _data_version(db, user) == version
+
+
+@pytest.mark.parametrize("operation, message", [
+    ({"op": "create"}, "'data' es obligatorio para 'create'"),
+    ({"op": "update", "data": transaction_payload()}, "'transaction_id' es obligatorio para 'update'"),
+    ({"op": "update", "transaction_id": 1}, "'data' es obligatorio para 'update'"),
+    ({"op": "delete"}, "'transaction_id' es obligatorio para 'delete'"),
+])
+def test_incomplete_operation_rejects_the_whole_batch(client, db, user, operation, message):
+    version = _data_version(db, user)
+    response = client.post("/transactions/batch", headers=user.headers,
+                           json=[{"op": "create", "data": transaction_payload()}, operation])
+
+    assert response.status_code == 422
+    [error] = response.json()["detail"]
+    assert error["loc"][:2] == ["body", 1] and message in error["msg"]
+    assert _data_version(db, user) == version
+    assert client.get("/transactions/", headers=user.headers).json() == []
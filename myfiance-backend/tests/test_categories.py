@@ -0,0 +1,64 @@
+"""Categorías (GET /categories/) y su caché."""
+from conftest import EXPENSE_CATEGORY_ID, transaction_payload
+
+from app.category_cache import category_cache
+from app.routers.categories import CATEGORIES_CACHE_CONTROL
+
+MISSING_CATEGORY_ID = 999999
+
+
+def _category_queries(counter):
+    return [statement for statement in counter.statements if "FROM categories" in statement]
+
+
+def test_categories_have_etag_and_cache_control(client):
+    response = client.get("/categories/")
+
+    assert response.status_code == 200
+    assert response.headers["ETag"].startswith('"')
+    assert response.headers["Cache-Control"] == CATEGORIES_CACHE_CONTROL
+    assert EXPENSE_CATEGORY_ID in [category["category_id"] for category in response.json()]
+
+
+def test_matching_if_none_match_is_304(client):
+    etag = client.get("/categories/").headers["ETag"]
+    response = client.get("/categories/", headers={"If-None-Match": f'"otra", W/{etag}'})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    assert response.headers["Cache-Control"] == CATEGORIES_CACHE_CONTROL
+    assert client.get("/categories/", headers={"If-None-Match": '"otra"'}).status_code == 200
+
+
+def test_categories_are_served_from_cache(client, count_statements):
+    client.get("/categories/")
+    with count_statements() as counter:
+        client.get("/categories/")
+    assert _category_queries(counter) == []
+
+
+def test_invalidate_reloads_on_next_access(client, count_statements):
+    category_cache.invalidate()
+    with count_statements() as counter:
+        client.get("/categories/")
+    assert len(_category_queries(counter)) == 1
+
+
+def test_unknown_category_does_not_reload_the_table(client, user, count_statements, monkeypatch):
+    client.get("/categories/")
+    monkeypatch.setattr(category_cache, "miss_reload_seconds", 3600)
+    with count_statements() as counter:
+        for _ in range(3):
+            response = client.post("/transactions/", headers=user.headers,
+                                   json=transaction_payload(category_id=MISSING_CATEGORY_ID))
+            assert response.status_code == 422
+    assert _category_queries(counter) == []
+
+
+def test_unknown_category_reloads_once_the_interval_has_passed(client, user, count_statements, monkeypatch):
+    client.get("/categories/")
+    monkeypatch.setattr(category_cache, "miss_reload_seconds", 0)
+    with count_statements() as counter:
+        client.post("/transactions/", headers=user.headers, json=transaction_payload(category_id=MISSING_CATEGORY_ID))
+    assert len(_category_queries(counter)) == 1
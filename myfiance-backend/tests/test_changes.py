@@ -0,0 +1,35 @@
+"""Cambios incrementales (GET /transactions/changes)."""
+from conftest import transaction_payload
+
+
+def _cursor(client, user):
+    return client.get("/transactions/changes", headers=user.headers).json()["cursor"]
+
+
+def test_changes_report_created_and_deleted(client, user, add_transactions):
+    kept, deleted = add_transactions(user, 2)
+    since = _cursor(client, user)
+    client.put(f"/transactions/{kept}", headers=user.headers, json=transaction_payload(amount="20.00"))
+    client.delete(f"/transactions/{deleted}", headers=user.headers)
+
+    changes = client.get(f"/transactions/changes?since={since}", headers=user.headers).json()
+    assert not changes["reset"]
+    assert [row["transaction_id"] for row in changes["changed"]] == [kept]
+    assert changes["deleted"] == [deleted]
+
+
+def test_deleted_id_reused_by_another_user_keeps_both_tombstones(client, make_user):
+    first, second = make_user(), make_user()
+    first_id = client.post("/transactions/", headers=first.headers, json=transaction_payload()).json()["transaction_id"]
+    since = _cursor(client, first)
+    client.delete(f"/transactions/{first_id}", headers=first.headers)
+
+    # SQLite reutiliza el ID de la última fila borrada (PostgreSQL no, y el test sigue valiendo)
+    second_id = client.post("/transactions/", headers=second.headers,
+                            json=transaction_payload()).json()["transaction_id"]
+    second_since = _cursor(client, second)
+    client.delete(f"/transactions/{second_id}", headers=second.headers)
+
+    assert client.get(f"/transactions/changes?since={since}", headers=first.headers).json()["deleted"] == [first_id]
+    assert client.get(f"/transactions/changes?since={second_since}",
+                      headers=second.headers).json()["deleted"] == [second_id]
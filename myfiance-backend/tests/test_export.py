@@ -0,0 +1,34 @@
+"""Exportación en streaming (GET /transactions/export)."""
+import tracemalloc
+
+import pytest
+
+from app.routers.transactions import EXPORT_CHUNK_ROWS, ExportFormat, _export_rows
+
+SMALL = 2 * EXPORT_CHUNK_ROWS
+LARGE = 20 * EXPORT_CHUNK_ROWS
+
+
+def _traced_export(user_id: int, export_format: ExportFormat):
+    """Recorre la exportación completa. Devuelve (líneas, pico de tracemalloc en bytes)."""
+    tracemalloc.start()
+    try:
+        lines = sum(chunk.count("\n") for chunk in _export_rows(user_id, export_format, None, None))
+        return lines, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize("export_format", list(ExportFormat))
+def test_export_memory_does_not_grow_with_rows(user, add_transactions, export_format):
+    # TestClient acumula la respuesta entera: se mide el generador que la produce
+    header = 1 if export_format == ExportFormat.CSV else 0
+    add_transactions(user, SMALL)
+    _traced_export(user.user_id, export_format)  # Calienta cachés e imports
+    small_lines, small_peak = _traced_export(user.user_id, export_format)
+    add_transactions(user, LARGE - SMALL)
+    large_lines, large_peak = _traced_export(user.user_id, export_format)
+
+    assert (small_lines, large_lines) == (SMALL + header, LARGE + header)
+    # Diez veces más filas: el pico sigue siendo el de un trozo de EXPORT_CHUNK_ROWS filas
+    assert large_peak < 1.5 * small_peak
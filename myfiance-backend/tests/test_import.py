@@ -0,0 +1,46 @@
+"""Importación CSV: filas mal formadas y ficheros que no están en UTF-8."""
+from sqlalchemy import func, select
+
+from app import models
+
+HEADER = "amount,transaction_date,description,category_id,type\n"
+ROW = "12.50,2026-01-15,Supermercado,3,expense\n"
+
+
+def _import(client, user, content: bytes):
+    return client.post("/transactions/import", headers=user.headers,
+                       files={"file": ("transacciones.csv", content, "text/csv")})
+
+
+def _count(db, user):
+    return db.execute(
+        select(func.count()).select_from(models.Transaction).where(models.Transaction.user_id == user.user_id)
+    ).scalar()
+
+
+def test_import_reports_rows_with_extra_fields(client, db, user):
+    content = HEADER + ROW + "12.50,2026-01-15,Cena,bar,3,expense\n" + ROW
+    response = _import(client, user, content.encode())
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["inserted"], body["failed"]) == (2, 1)
+    assert body["errors"][0]["row"] == 2
+    assert _count(db, user) == 2
+
+
+def test_import_rejects_non_utf8_before_inserting(client, db, user):
+    # El byte no válido está después del primer lote (1000 filas), que ya se habría confirmado
+    content = (HEADER + ROW * 1500).encode() + "12.50,2026-01-15,Cañas,3,expense\n".encode("latin-1")
+    response = _import(client, user, content)
+
+    assert response.status_code == 400
+    assert "UTF-8" in response.json()["detail"]
+    assert _count(db, user) == 0
+
+
+def test_import_accepts_utf8_with_bom(client, db, user):
+    response = _import(client, user, (HEADER + ROW.replace("Supermercado", "Cañas")).encode("utf-8-sig"))
+
+    assert response.status_code == 200
+    assert response.json()["inserted"] == 1
@@ -0,0 +1,36 @@
+"""Eventos de SQLAlchemy de app.instrumentation (consultas lentas y errores)."""
+import logging
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import instrumentation
+from app.database import get_engine
+
+SECRET = "dato-personal@example.com"
+
+
+def test_failed_statement_does_not_leave_its_start_behind():
+    with get_engine().connect() as conn:
+        for _ in range(3):
+            with pytest.raises(SQLAlchemyError):
+                conn.execute(text("SELECT * FROM tabla_que_no_existe"))
+            conn.rollback()
+        assert conn.info["query_start"] == []
+        conn.execute(text("SELECT 1"))
+        assert conn.info["query_start"] == []
+
+
+@pytest.mark.parametrize("log_params", [False, True])
+def test_slow_query_parameters_are_opt_in(monkeypatch, caplog, log_params):
+    monkeypatch.setattr(instrumentation, "SLOW_QUERY_THRESHOLD_MS", 1e-9)
+    monkeypatch.setattr(instrumentation, "SLOW_QUERY_LOG_PARAMS", log_params)
+    # La configuración de logging de Alembic (init_db en conftest) desactiva los loggers existentes
+    monkeypatch.setattr(instrumentation.slow_query_logger, "disabled", False)
+    with caplog.at_level(logging.WARNING, logger=instrumentation.slow_query_logger.name):
+        with get_engine().connect() as conn:
+            conn.execute(text("SELECT :email"), {"email": SECRET})
+
+    [message] = [record.getMessage() for record in caplog.records if "SELECT" in record.getMessage()]
+    assert (SECRET in message) is log_params
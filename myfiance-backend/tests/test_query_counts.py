@@ -0,0 +1,70 @@
+"""
+El número de sentencias SQL de cada endpoint no debe crecer con el número de
+filas (sin N+1): se mide con pocas y con muchas transacciones y se compara.
+"""
+import pytest
+
+from conftest import transaction_payload
+
+SMALL, LARGE = 5, 2500
+
+
+def _statements_for(client, count_statements, user, method, path, **kwargs):
+    with count_statements() as counter:
+        response = client.request(method, path, headers=user.headers, **kwargs)
+    assert response.status_code < 300, response.text
+    return counter.count
+
+
+@pytest.mark.parametrize("path", [
+    "/transactions/?limit=500",
+    "/transactions/summary",
+    "/transactions/export",
+    "/transactions/export?format=ndjson",
+])
+def test_read_statements_do_not_grow_with_rows(client, make_user, add_transactions, count_statements, path):
+    counts = []
+    for rows in (SMALL, LARGE):
+        user = make_user()
+        add_transactions(user, rows)
+        # Primera petición: carga la caché de usuarios y la de categorías
+        client.get(path, headers=user.headers)
+        counts.append(_statements_for(client, count_statements, user, "GET", path))
+    assert counts[0] == counts[1]
+
+
+def test_list_statements_do_not_grow_with_page_size(client, user, add_transactions, count_statements):
+    add_transactions(user, 600)
+    client.get("/transactions/?limit=1", headers=user.headers)
+    counts = [_statements_for(client, count_statements, user, "GET", f"/transactions/?limit={limit}")
+              for limit in (1, 500)]
+    assert counts[0] == counts[1]
+
+
+def test_bulk_statements_do_not_grow_with_rows(client, make_user, count_statements):
+    # Un lote de crud.bulk_create_user_transactions (1000 filas) cuesta lo mismo con
+    # 10 filas que con 1000; más filas solo añaden lotes
+    counts = []
+    for rows in (10, 1000):
+        user = make_user()
+        client.get("/transactions/?limit=1", headers=user.headers)
+        counts.append(_statements_for(client, count_statements, user, "POST", "/transactions/bulk",
+                                      json=[transaction_payload() for _ in range(rows)]))
+    assert counts[0] == counts[1]
+
+
+def test_batch_statements_do_not_grow_with_operations(client, make_user, add_transactions, count_statements):
+    counts = []
+    for size in (3, 300):
+        user = make_user()
+        ids = add_transactions(user, 2 * size)
+        operations = (
+            [{"op": "create", "data": transaction_payload()} for _ in range(size)]
+            + [{"op": "update", "transaction_id": transaction_id, "data": transaction_payload(amount="99.99")}
+               for transaction_id in ids[:size]]
+            + [{"op": "delete", "transaction_id": transaction_id} for transaction_id in ids[size:]]
+        )
+        client.get("/transactions/?limit=1", headers=user.headers)
+        counts.append(_statements_for(client, count_statements, user, "POST", "/transactions/batch",
+                                      json=operations))
+    assert counts[0] == counts[1]
@@ -0,0 +1,103 @@
+"""Enrutado de lecturas a las réplicas (database.read_session y stick_to_primary)."""
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, event, insert, select
+
+from app import cache, crud, database, demo, models
+from app.cache import TTLCache
+from conftest import transaction_payload
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch, db):
+    """
+    Una réplica en otro fichero SQLite, con el esquema pero sin transacciones
+    (como una réplica con retraso), y un contador de sentencias por engine.
+    El reloj de las escrituras recientes se controla con 'clock.now'.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    models.Base.metadata.create_all(engine)
+    clock = SimpleNamespace(now=0.0)
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    monkeypatch.setattr(database, "DATABASE_REPLICA_URLS", [str(engine.url)])
+    monkeypatch.setattr(database, "_replica_engines_list", [engine])
+    monkeypatch.setattr(database, "_recent_writers", TTLCache(max_size=100, ttl_seconds=database.REPLICA_STICKY_SECONDS))
+
+    statements = {"primary": [], "replica": []}
+    for name, target in (("primary", database.get_engine()), ("replica", engine)):
+        event.listen(target, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args, name=name: statements[name].append(statement))
+
+    def replicate_user(user_id: int):
+        row = db.execute(select(models.User.__table__).where(models.User.user_id == user_id)).mappings().one()
+        with engine.begin() as conn:
+            conn.execute(insert(models.User.__table__).values(**row))
+        statements["replica"].clear()
+
+    yield SimpleNamespace(statements=statements, clock=clock, replicate_user=replicate_user)
+    engine.dispose()
+
+
+def _listed_ids(client, user):
+    return [row["transaction_id"] for row in client.get("/transactions/", headers=user.headers).json()]
+
+
+def test_reads_go_to_the_replica(client, user, add_transactions, replica):
+    add_transactions(user, 2)
+    replica.replicate_user(user.user_id)
+    replica.clock.now += database.REPLICA_STICKY_SECONDS  # Las escrituras de add_transactions ya han caducado
+    primary_before = len(replica.statements["primary"])
+
+    assert _listed_ids(client, user) == []  # La réplica aún no tiene las transacciones
+    assert client.get("/transactions/summary", headers=user.headers).json()["monthly"] == []
+    assert replica.statements["replica"]
+    assert not any("transactions" in statement for statement in replica.statements["primary"][primary_before:])
+
+
+def test_writes_go_to_the_primary_and_reads_stick_to_it(client, user, replica):
+    replica.replicate_user(user.user_id)
+    created = client.post("/transactions/", headers=user.headers, json=transaction_payload())
+    assert created.status_code == 200
+    assert not any(statement.lstrip().upper().startswith(("INSERT", "UPDATE"))
+                   for statement in replica.statements["replica"])
+
+    # Dentro de REPLICA_STICKY_SECONDS el usuario lee del primario y ve su escritura
+    replica.clock.now += database.REPLICA_STICKY_SECONDS / 2
+    assert _listed_ids(client, user) == [created.json()["transaction_id"]]
+    assert replica.statements["replica"] == []
+
+    # Un rollback posterior del mismo usuario no le devuelve a la réplica antes de tiempo
+    db = database.SessionLocal()
+    try:
+        crud._bump_data_version(db, user.user_id)
+        db.rollback()
+    finally:
+        db.close()
+    assert _listed_ids(client, user) == [created.json()["transaction_id"]]
+    assert replica.statements["replica"] == []
+
+    replica.clock.now += database.REPLICA_STICKY_SECONDS
+    assert _listed_ids(client, user) == []
+    assert replica.statements["replica"]
+
+
+def test_rolled_back_write_does_not_stick(user, replica):
+    db = database.SessionLocal()
+    try:
+        crud._bump_data_version(db, user.user_id)
+        db.rollback()
+    finally:
+        db.close()
+    assert database.use_replica(user.user_id)
+
+
+def test_demo_reset_goes_to_the_primary(client, replica, monkeypatch):
+    monkeypatch.setattr(demo.demo_reset, "_last_reset", None)
+    response = client.post("/users/token", data={"username": demo.DEMO_EMAIL, "password": demo.DEMO_PASSWORD})
+
+    assert response.status_code == 200
+    assert demo.demo_reset._last_reset is not None
+    assert replica.statements["replica"] == []
+    assert any(statement.lstrip().upper().startswith("INSERT INTO TRANSACTIONS")
+               for statement in replica.statements["primary"])
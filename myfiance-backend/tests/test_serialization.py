@@ -0,0 +1,37 @@
+"""La vía rápida del listado produce los mismos bytes que la serialización con Pydantic."""
+import json
+from typing import List
+
+import pytest
+from pydantic import TypeAdapter
+
+from app import crud, responses, schemas
+from app.responses import FastJSONResponse
+from app.routers.transactions import transaction_rows_to_dicts
+
+TRANSACTION_LIST = TypeAdapter(List[schemas.TransactionRead])
+CASES = [
+    {"amount": "10.50", "description": "Café con churros"},
+    {"amount": "0.01", "description": "Ñandú «peluche» — 50 % dto. 😀"},
+    {"amount": "1234.00", "description": "日本語のメモ \"entre comillas\" \\ y \t tabulador",
+     "type": "income", "category_id": 1},
+]
+
+
+@pytest.mark.parametrize("encoder", [
+    pytest.param(responses.orjson, id="orjson",
+                 marks=pytest.mark.skipif(responses.orjson is None, reason="orjson no está instalado")),
+    pytest.param(None, id="json"),
+])
+def test_fast_path_matches_pydantic_bytes(db, user, add_transactions, monkeypatch, encoder):
+    for case in CASES:
+        add_transactions(user, 1, **case)
+    monkeypatch.setattr(responses, "orjson", encoder)
+
+    rows = crud.get_transactions_by_user(db, user.user_id, as_rows=True)
+    objects = crud.get_transactions_by_user(db, user.user_id)
+    body = FastJSONResponse(transaction_rows_to_dicts(db, rows)).body
+
+    assert body == TRANSACTION_LIST.dump_json(TRANSACTION_LIST.validate_python(objects))
+    # Mismo orden (la más reciente primero) e importes con sus dos decimales
+    assert [row["amount"] for row in json.loads(body)] == [case["amount"] for case in reversed(CASES)]
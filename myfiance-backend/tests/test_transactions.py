@@ -0,0 +1,32 @@
+"""Altas y modificaciones de transacciones."""
+from conftest import EXPENSE_CATEGORY_ID, transaction_payload
+
+MISSING_CATEGORY_ID = 999999
+
+
+def test_create_with_unknown_category_is_422(client, user):
+    response = client.post("/transactions/", headers=user.headers,
+                           json=transaction_payload(category_id=MISSING_CATEGORY_ID))
+
+    assert response.status_code == 422
+    assert client.get("/transactions/", headers=user.headers).json() == []
+
+
+def test_update_with_unknown_category_is_422(client, user, add_transactions):
+    [transaction_id] = add_transactions(user, 1)
+    response = client.put(f"/transactions/{transaction_id}", headers=user.headers,
+                          json=transaction_payload(category_id=MISSING_CATEGORY_ID, amount="99.00"))
+
+    assert response.status_code == 422
+    [transaction] = client.get("/transactions/", headers=user.headers).json()
+    assert transaction["amount"] == "12.50"
+    assert transaction["category"]["category_id"] == EXPENSE_CATEGORY_ID
+
+
+def test_update_moves_transaction_to_another_category(client, user, add_transactions):
+    [transaction_id] = add_transactions(user, 1)
+    response = client.put(f"/transactions/{transaction_id}", headers=user.headers,
+                          json=transaction_payload(category_id=EXPENSE_CATEGORY_ID + 1))
+
+    assert response.status_code == 200
+    assert response.json()["category"]["category_id"] == EXPENSE_CATEGORY_ID + 1
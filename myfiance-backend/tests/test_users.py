@@ -0,0 +1,12 @@
+"""Usuarios y login."""
+from conftest import PASSWORD, PASSWORD_HASH
+
+from app import crud, schemas
+
+
+def test_get_or_create_user_returns_user_created_concurrently(db, make_user):
+    # Lo que ve el segundo de dos primeros logins simultáneos de la demo: el usuario ya existe
+    existing = make_user()
+    user = crud.get_or_create_user(db, schemas.UserCreate(email=existing.email, password=PASSWORD), PASSWORD_HASH)
+
+    assert user.user_id == existing.user_id
@@ -1,8 +1,8 @@
 'use client';
 
-import { useEffect, useState, useCallback } from "react";
+import { useEffect, useState, useCallback, useRef } from "react";
 import withAuth from "@/components/auth/withAuth";
-import { getTransactions, createTransaction, updateTransaction, deleteTransaction } from "@/services/api";
+import { getTransactions, getTransactionChanges, createTransaction, updateTransaction, deleteTransaction } from "@/services/api";
 import TransactionForm from "@/components/forms/TransactionForm";
 import Modal from "@/components/ui/Modal";
 import Header from "@/components/layout/Header";
@@ -71,10 +71,16 @@ function DashboardPage() {
     const [isEditModalOpen, setIsEditModalOpen] = useState(false);
     const [editingTransaction, setEditingTransaction] = useState<Transaction | null>(null);
 
+    // Cursor de /transactions/changes correspondiente a la lista cargada
+    const changesCursor = useRef<number | undefined>(undefined);
+
     const fetchTransactions = useCallback(async () => {
         try {
             // No es necesario volver a poner isLoading a true si ya lo está
+            // El cursor se pide antes que la lista: lo que cambie entretanto llegará en la próxima sincronización
+            const { cursor } = await getTransactionChanges();
             const data = await getTransactions();
+            changesCursor.current = cursor;
             setTransactions(data);
         } catch (err) {
             const error = err as Error;
@@ -88,6 +94,27 @@ function DashboardPage() {
         fetchTransactions();
     }, [fetchTransactions]);
 
+    // Tras crear o editar, descarga solo lo que ha cambiado en lugar de la lista completa
+    const syncTransactions = useCallback(async () => {
+        if (changesCursor.current === undefined) return fetchTransactions();
+        try {
+            const changes = await getTransactionChanges(changesCursor.current);
+            if (changes.reset) return fetchTransactions();
+            changesCursor.current = changes.cursor;
+            setTransactions(current => {
+                const byId = new Map(current.map(tx => [tx.transaction_id, tx]));
+                changes.deleted.forEach(id => byId.delete(id));
+                changes.changed.forEach(tx => byId.set(tx.transaction_id, tx));
+                // Mismo orden que el listado: de la más reciente a la más antigua
+                return [...byId.values()].sort((a, b) =>
+                    b.transaction_date.localeCompare(a.transaction_date) || b.transaction_id - a.transaction_id);
+            });
+        } catch (err) {
+            const error = err as Error;
+            setError(error.message || 'Ocurrió un error inesperado.');
+        }
+    }, [fetchTransactions]);
+
     const handleDelete = async (transactionId: number) => {
         if (!window.confirm('¿Estás seguro de que quieres eliminar esta transacción?')) {
             return;
@@ -104,7 +131,7 @@ function DashboardPage() {
     const handleCreateSubmit = async (formData: TransactionFormData) => {
         try {
             await createTransaction(formData);
-            fetchTransactions();
+            syncTransactions();
             setIsCreateModalOpen(false);
         } catch (err) {
             const error = err as Error;
@@ -116,7 +143,7 @@ function DashboardPage() {
         if (!editingTransaction) return;
         try {
             await updateTransaction(editingTransaction.transaction_id, formData);
-            fetchTransactions();
+            syncTransactions();
             setIsEditModalOpen(false);
         } catch (err) {
             const error = err as Error;
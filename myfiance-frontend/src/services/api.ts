@@ -18,6 +18,12 @@ type TransactionSubmitData = {
   category_id: number;
   type: 'income' | 'expense';
 }
+interface TransactionChanges {
+  cursor: number;
+  reset: boolean;
+  changed: Transaction[];
+  deleted: number[];
+}
 interface UserData {
     email: string;
     password?: string;
@@ -106,6 +112,11 @@ export const getCategories = (): Promise<Category[]> => apiFetch('/categories/')
 
 export const getTransactions = (): Promise<Transaction[]> => apiFetch('/transactions/');
 
+// Cambios desde el cursor de la sincronización anterior. Sin cursor (o si
+// 'reset' es true) hay que recargar el listado completo.
+export const getTransactionChanges = (since?: number): Promise<TransactionChanges> =>
+  apiFetch(since === undefined ? '/transactions/changes' : `/transactions/changes?since=${since}`);
+
 export const createTransaction = (transactionData: TransactionSubmitData): Promise<Transaction> => {
   return apiFetch('/transactions/', {
     method: 'POST',
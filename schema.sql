@@ -1,10 +1,19 @@
+-- Referencia del esquema de la base de datos. Se aplica con las migraciones de
+-- Alembic del backend (myfiance-backend/migrations, 'alembic upgrade head'):
+-- cualquier cambio aquí debe ir también en una migración, y viceversa.
+
 -- Tabla para almacenar la información de los usuarios
 CREATE TABLE users (
     user_id SERIAL PRIMARY KEY,
     username VARCHAR(50) UNIQUE NOT NULL,
     email VARCHAR(100) UNIQUE NOT NULL,
     password_hash VARCHAR(255) NOT NULL,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    -- Versión de los datos del usuario (ETag / Last-Modified), la mantiene la aplicación
+    data_version INTEGER NOT NULL DEFAULT 0,
+    data_updated_at TIMESTAMP WITH TIME ZONE,
+    -- Cursor mínimo que admite GET /transactions/changes sin resincronizar
+    sync_floor_version INTEGER NOT NULL DEFAULT 0
 );
 
 -- Tabla para almacenar las categorías de gastos e ingresos
@@ -35,9 +44,60 @@ CREATE TABLE transactions (
     description TEXT,
     category_id INTEGER NOT NULL REFERENCES categories(category_id),
     type VARCHAR(10) NOT NULL CHECK (type IN ('income', 'expense')),
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE,
+    -- users.data_version de la última escritura sobre la fila
+    change_version INTEGER NOT NULL DEFAULT 0
 );
 
+-- Particionado opcional (PostgreSQL, TRANSACTIONS_PARTITION_BY, migración 0005): la
+-- tabla se crea con PARTITION BY RANGE (transaction_date) o PARTITION BY HASH (user_id)
+-- y la clave primaria pasa a ser (transaction_id, transaction_date) o
+-- (transaction_id, user_id). Con 'range', una partición por año y otra por defecto:
+--   CREATE TABLE transactions_y2026 PARTITION OF transactions
+--       FOR VALUES FROM ('2026-01-01') TO ('2027-01-01');
+--   CREATE TABLE transactions_default PARTITION OF transactions DEFAULT;
+
 -- Índices para mejorar el rendimiento de las consultas
-CREATE INDEX idx_transactions_user_id ON transactions (user_id);
-CREATE INDEX idx_transactions_date ON transactions (transaction_date);
\ No newline at end of file
+-- Cubre también las búsquedas por user_id y la paginación por cursor del listado
+CREATE INDEX idx_transactions_user_date_id ON transactions (user_id, transaction_date, transaction_id);
+CREATE INDEX idx_transactions_date ON transactions (transaction_date);
+-- Búsqueda de texto en las descripciones (GET /transactions/search)
+CREATE INDEX idx_transactions_description_fts ON transactions
+    USING gin (to_tsvector('spanish'::regconfig, coalesce(description, '')));
+-- Cambios incrementales de un usuario (GET /transactions/changes)
+CREATE INDEX idx_transactions_user_change ON transactions (user_id, change_version);
+
+-- Transacciones borradas, para informar de los borrados en los cambios incrementales
+CREATE TABLE transaction_tombstones (
+    transaction_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    change_version INTEGER NOT NULL,
+    deleted_at TIMESTAMP WITH TIME ZONE,
+    PRIMARY KEY (transaction_id, user_id)
+);
+CREATE INDEX idx_transaction_tombstones_user_change ON transaction_tombstones (user_id, change_version);
+
+-- Totales mensuales por usuario, categoría y tipo, mantenidos por la aplicación
+-- en la misma transacción que cada escritura sobre 'transactions'
+CREATE TABLE monthly_rollups (
+    user_id INTEGER NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    year_month VARCHAR(7) NOT NULL,
+    category_id INTEGER NOT NULL REFERENCES categories(category_id),
+    type VARCHAR(10) NOT NULL CHECK (type IN ('income', 'expense')),
+    total NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, year_month, category_id, type)
+);
+
+-- Totales mensuales de las transacciones archivadas (años cerrados, ver
+-- 'python -m app.cli archive-years'); el resumen los suma a los de monthly_rollups
+CREATE TABLE archived_monthly_totals (
+    user_id INTEGER NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    year_month VARCHAR(7) NOT NULL,
+    category_id INTEGER NOT NULL REFERENCES categories(category_id),
+    type VARCHAR(10) NOT NULL CHECK (type IN ('income', 'expense')),
+    total NUMERIC(14, 2) NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (user_id, year_month, category_id, type)
+);